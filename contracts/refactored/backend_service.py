@@ -11,15 +11,59 @@ This service provides:
 """
 
 import math
-import json
+import time
+import struct
 import asyncio
-from typing import List, Dict, Any, Tuple, Optional
+from collections import OrderedDict, deque
+from typing import List, Dict, Any, Tuple, Optional, Deque, Sequence
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 try:
     from .contract_client import SeltraContractClient, load_contract_config, PoolState, LiquidityRange
+    from .contract_client import PoolState as ContractPoolState
 except ImportError:
     from contract_client import SeltraContractClient, load_contract_config, PoolState, LiquidityRange
+    from contract_client import PoolState as ContractPoolState
+try:
+    from .rebalance_planner import RebalancePlanner, RebalancePlan
+except ImportError:
+    from rebalance_planner import RebalancePlanner, RebalancePlan
+
+import numpy as np
+
+# Longest EWMA scan chunk; bounds decay**-n so chunk rescaling stays finite
+MAX_EWMA_CHUNK = 4096
+
+# Minimum time between executed rebalances (RebalancingState DEFAULT_COOLDOWN)
+REBALANCE_COOLDOWN_SECONDS = 300
+
+# Volatility floor (percent) when scoring efficiency; a zero estimate would
+# make every range infinitely far from the price
+MIN_EFFICIENCY_VOLATILITY = 0.01
+
+# On-chain oracle encoding: the pool's swap math reads current_price as
+# asset_y per asset_x scaled by 1e6 (amount_out = amount_in * price // 1e6);
+# volatility uses the oracle's VOLATILITY_SCALE. Both are ABI uint64.
+PRICE_FIXED_POINT_SCALE = 1_000_000
+VOLATILITY_SCALE = 1_000_000
+UINT64_MAX = 2 ** 64 - 1
+
+# Fixed-width on-chain range encoding (RebalancingState RangeArray):
+# MAX_CONTRACT_RANGES big-endian uint64 (lower, upper, liquidity) triples
+MAX_CONTRACT_RANGES = 6
+RANGE_PRICE_SCALE = 10 ** 9
+RANGE_LIQUIDITY_SCALE = 10 ** 6
+RANGE_SLOT_FORMAT = ">QQQ"
+RANGE_SLOT_BYTES = struct.calcsize(RANGE_SLOT_FORMAT)
+RANGE_ARRAY_BYTES = MAX_CONTRACT_RANGES * RANGE_SLOT_BYTES
+
+# Contract state cache lifetime when no block follower pushes rounds (~one block)
+SYNC_CACHE_TTL_SECONDS = 2.8
+
+# Oracle publishing policy
+ORACLE_PRICE_DEVIATION = 0.001        # Publish when price moved 0.1% from the on-chain value
+ORACLE_VOLATILITY_DEVIATION = 0.25    # ... or volatility moved 0.25 percentage points
+ORACLE_HEARTBEAT_ROUNDS = 100         # ... or this many rounds passed since the last write
 
 
 @dataclass
@@ -40,6 +84,24 @@ class PoolState:
     range3_liquidity: float
 
 
+@dataclass
+class RangeGrid:
+    """Optimal ranges for many market states (row i = state i, unused slots hold NaN/0)"""
+    lower: np.ndarray
+    upper: np.ndarray
+    liquidity: np.ndarray
+    num_ranges: np.ndarray
+    regime_index: np.ndarray
+    
+    def to_ranges(self, index: int) -> List[Range]:
+        """Get the Range list for one market state"""
+        n = int(self.num_ranges[index])
+        return [
+            Range(float(self.lower[index, i]), float(self.upper[index, i]), float(self.liquidity[index, i]))
+            for i in range(n)
+        ]
+
+
 @dataclass
 class OracleState:
     """Represents current oracle state"""
@@ -50,6 +112,51 @@ class OracleState:
     price_history: List[float]
 
 
+def _ewma_scan(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """
+    Evaluate y[t] = alpha * x[t] + (1 - alpha) * y[t-1] over a whole array
+    
+    The series is split into chunks solved in closed form with a cumulative
+    sum of rescaled inputs (chunk length keeps decay**-n well inside float64
+    range); only the per-chunk carries are propagated sequentially.
+    
+    Args:
+        values: Input series x
+        alpha: Smoothing factor
+        initial: y before the first value
+    
+    Returns:
+        Series y, same length as values
+    """
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        return alpha * values
+    
+    if decay < 1.0:
+        chunk = max(1, min(MAX_EWMA_CHUNK, int(300 / -math.log(decay))))
+    else:
+        chunk = MAX_EWMA_CHUNK
+    chunk = max(1, min(chunk, values.size))
+    
+    steps = np.arange(chunk, dtype=np.float64)
+    growth = decay ** -steps
+    carry_decay = decay ** (steps + 1)
+    
+    # Zero-carry scan of every chunk at once
+    blocks = np.pad(values, (0, -values.size % chunk)).reshape(-1, chunk)
+    local = alpha * np.cumsum(blocks * growth, axis=1) / growth
+    
+    # Value carried into each chunk
+    chunk_decay = carry_decay[-1]
+    carries = np.empty(blocks.shape[0])
+    carry = initial
+    for i, chunk_end in enumerate(local[:, -1].tolist()):
+        carries[i] = carry
+        carry = chunk_end + chunk_decay * carry
+    
+    return (local + carry_decay * carries[:, None]).reshape(-1)[:values.size]
+
+
 class VolatilityCalculator:
     """Handles EWMA volatility calculations"""
     
@@ -58,7 +165,7 @@ class VolatilityCalculator:
         self.window_size = window_size
         self.ewma_mean = 0.0
         self.ewma_variance = 0.0
-        self.price_history: List[float] = []
+        self.price_history: Deque[float] = deque(maxlen=window_size)
     
     def update_price(self, new_price: float) -> Tuple[float, str]:
         """
@@ -85,16 +192,54 @@ class VolatilityCalculator:
         else:
             volatility = 3.0  # Default 3% volatility
         
-        # Add to history
+        # Add to history (ring buffer drops the oldest price)
         self.price_history.append(new_price)
-        if len(self.price_history) > self.window_size:
-            self.price_history.pop(0)
         
         # Classify regime
         regime = self._classify_regime(volatility)
         
         return volatility, regime
     
+    def update_prices(self, prices: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Update with a batch of prices in one vectorized pass
+        
+        Same results as calling update_price for each price in order, used to
+        backfill the oracle after restarts.
+        
+        Args:
+            prices: Price observations in chronological order
+        
+        Returns:
+            Tuple of (volatility series, regime series), one entry per price
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        volatility = np.empty(prices.size)
+        if prices.size == 0:
+            return volatility, self._classify_regimes(volatility)
+        
+        if len(self.price_history) > 0:
+            series = np.concatenate(([self.price_history[-1]], prices))
+            first = 0
+        else:
+            series = prices
+            volatility[0] = 3.0  # Default 3% volatility
+            first = 1
+        
+        returns = np.diff(series) / series[:-1]
+        if returns.size > 0:
+            # Mean recurrence first, then variance of deviations from it
+            means = _ewma_scan(returns, self.alpha, self.ewma_mean)
+            variances = _ewma_scan((returns - means) ** 2, self.alpha, self.ewma_variance)
+            
+            volatility[first:] = np.sqrt(variances) * 100  # Convert to percentage
+            self.ewma_mean = float(means[-1])
+            self.ewma_variance = float(variances[-1])
+        
+        self.price_history.extend(prices[-self.window_size:].tolist())
+        
+        return volatility, self._classify_regimes(volatility)
+    
     def _classify_regime(self, volatility: float) -> str:
         """Classify volatility regime"""
         if volatility < 2.0:
@@ -103,6 +248,11 @@ class VolatilityCalculator:
             return "high"
         else:
             return "medium"
+    
+    def _classify_regimes(self, volatility: np.ndarray) -> np.ndarray:
+        """Classify a volatility series (vectorized _classify_regime)"""
+        names = np.array(["low", "medium", "high"])
+        return names[(volatility >= 2.0).astype(np.intp) + (volatility > 5.0)]
 
 
 class RebalancingEngine:
@@ -128,6 +278,29 @@ class RebalancingEngine:
         self.MEDIUM_RANGES = 4
         self.HIGH_RANGES = 5
         self.EXTREME_RANGES = 6
+        
+        # Rebalance triggers (see should_rebalance)
+        self.EFFICIENCY_TRIGGER = 60.0          # Rebalance below this efficiency score
+        self.VOLATILITY_CHANGE_TRIGGER = 2.0    # Rebalance when volatility moved more than this
+        self.MAX_REBALANCE_INTERVAL = 3600      # Rebalance at least this often (seconds)
+    
+    @property
+    def regime_names(self) -> List[str]:
+        """Regime names indexed by RangeGrid.regime_index"""
+        return ["ultra_low", "low", "medium", "high", "extreme"]
+    
+    def _regime_tables(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Thresholds, concentration factors and range counts as arrays"""
+        thresholds = np.array([
+            self.ULTRA_LOW_THRESHOLD, self.LOW_THRESHOLD, self.MEDIUM_THRESHOLD, self.HIGH_THRESHOLD
+        ])
+        factors = np.array([
+            self.ULTRA_LOW_FACTOR, self.LOW_FACTOR, self.MEDIUM_FACTOR, self.HIGH_FACTOR, self.EXTREME_FACTOR
+        ])
+        counts = np.array([
+            self.ULTRA_LOW_RANGES, self.LOW_RANGES, self.MEDIUM_RANGES, self.HIGH_RANGES, self.EXTREME_RANGES
+        ])
+        return thresholds, factors, counts
     
     def classify_volatility_regime(self, volatility: float) -> Tuple[str, float, int]:
         """
@@ -209,6 +382,62 @@ class RebalancingEngine:
         
         return ranges
     
+    def calculate_optimal_ranges_batch(
+        self,
+        current_prices: np.ndarray,
+        volatilities: np.ndarray,
+        total_liquidity: Any
+    ) -> RangeGrid:
+        """
+        Vectorized calculate_optimal_ranges over many market states
+        
+        Args:
+            current_prices: Market prices, shape (N,)
+            volatilities: Volatility percentages, shape (N,)
+            total_liquidity: Liquidity to distribute, scalar or shape (N,)
+        
+        Returns:
+            RangeGrid with (N, max_ranges) bounds and allocations
+        """
+        prices = np.asarray(current_prices, dtype=np.float64).reshape(-1)
+        volatilities = np.broadcast_to(np.asarray(volatilities, dtype=np.float64), prices.shape)
+        liquidity_total = np.broadcast_to(np.asarray(total_liquidity, dtype=np.float64), prices.shape)
+        
+        # Decision tree as a lookup: index = number of thresholds <= volatility
+        thresholds, factors, counts = self._regime_tables()
+        regime_index = np.searchsorted(thresholds, volatilities, side="right")
+        num_ranges = counts[regime_index]
+        
+        # Price bounds (capped at 50%), with the same minimum-bound fallbacks
+        price_bound = np.minimum(factors[regime_index] * 100, 50) / 100
+        min_price = prices - prices * price_bound
+        max_price = prices + prices * price_bound
+        min_price = np.where(min_price <= 0, prices * 0.5, min_price)
+        max_price = np.where(max_price <= min_price, min_price + prices * 0.1, max_price)
+        
+        # Equal-width ranges, one column per range slot
+        slots = np.arange(counts.max())
+        range_size = ((max_price - min_price) / num_ranges)[:, None]
+        lower = min_price[:, None] + slots * range_size
+        upper = min_price[:, None] + (slots + 1) * range_size
+        
+        # Proximity-weighted allocation (up to 50% bonus near current price)
+        distance = np.abs((lower + upper) / 2 - prices[:, None])
+        max_distance = ((max_price - min_price) / 2)[:, None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            proximity = np.where(max_distance > 0, (max_distance - distance) / max_distance, 1.0)
+        base_allocation = (liquidity_total / num_ranges)[:, None]
+        liquidity = base_allocation + base_allocation * proximity * 0.5
+        
+        used = slots < num_ranges[:, None]
+        return RangeGrid(
+            lower=np.where(used, lower, np.nan),
+            upper=np.where(used, upper, np.nan),
+            liquidity=np.where(used, liquidity, 0.0),
+            num_ranges=num_ranges,
+            regime_index=regime_index
+        )
+    
     def validate_rebalancing_safety(
         self, 
         old_ranges: List[Range], 
@@ -280,6 +509,38 @@ class RebalancingEngine:
         
         return min(concentration_score, 100.0)
     
+    def calculate_efficiency_scores(
+        self,
+        grid: RangeGrid,
+        current_prices: np.ndarray,
+        volatilities: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized calculate_efficiency_score for every row of a RangeGrid
+        
+        Args:
+            grid: Range configurations, one row per market state
+            current_prices: Prices to score against, shape (N,)
+            volatilities: Volatility percentages, shape (N,)
+        
+        Returns:
+            Efficiency scores (0-100), shape (N,)
+        """
+        prices = np.asarray(current_prices, dtype=np.float64).reshape(-1, 1)
+        volatilities = np.asarray(volatilities, dtype=np.float64).reshape(-1, 1)
+        total_liquidity = grid.liquidity.sum(axis=1)
+        
+        distance = np.abs((grid.lower + grid.upper) / 2 - prices)
+        max_reasonable_distance = prices * (volatilities / 100) * 2  # 2σ movement
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = distance / max_reasonable_distance
+            proximity_score = np.where(ratio <= 1, 100 - ratio * 50, 50 / (1 + ratio))
+            weights = grid.liquidity / total_liquidity[:, None]
+            scores = np.where(grid.liquidity > 0, proximity_score * weights, 0.0).sum(axis=1)
+        
+        return np.where(total_liquidity == 0, 0.0, np.minimum(scores, 100.0))
+    
     def should_rebalance(
         self, 
         current_efficiency: float, 
@@ -298,38 +559,125 @@ class RebalancingEngine:
             True if rebalancing is recommended
         """
         # Check efficiency threshold (rebalance if efficiency < 60%)
-        if current_efficiency < 60:
+        if current_efficiency < self.EFFICIENCY_TRIGGER:
             return True
         
         # Check volatility change threshold (rebalance if change > 2%)
-        if volatility_change > 2.0:
+        if volatility_change > self.VOLATILITY_CHANGE_TRIGGER:
             return True
         
         # Check if it's been too long since last rebalance (1 hour)
-        if time_since_last > 3600:
+        if time_since_last > self.MAX_REBALANCE_INTERVAL:
             return True
         
         return False
 
 
+class RangeCache:
+    """
+    LRU memo for optimal-range computations
+    
+    Keyed on (regime, price bucket, liquidity). Range bounds scale linearly
+    with price within a regime, so entries store price-relative templates
+    that are rescaled to the exact requested price on every hit.
+    """
+    
+    def __init__(self, engine: RebalancingEngine, tick_size: float = 0.01, max_entries: int = 1024):
+        self.engine = engine
+        self.tick_size = tick_size
+        self.max_entries = max_entries
+        self._templates: "OrderedDict[Tuple[str, int, float], List[Tuple[float, float, float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get_optimal_ranges(
+        self, 
+        current_price: float, 
+        volatility: float, 
+        total_liquidity: float
+    ) -> List[Range]:
+        """
+        Cached equivalent of RebalancingEngine.calculate_optimal_ranges
+        
+        Args:
+            current_price: Current market price
+            volatility: Current volatility percentage
+            total_liquidity: Total liquidity to distribute
+        
+        Returns:
+            List of optimal ranges at the exact current price
+        """
+        regime, _, _ = self.engine.classify_volatility_regime(volatility)
+        key = (regime, int(round(current_price / self.tick_size)), total_liquidity)
+        
+        template = self._templates.get(key)
+        if template is not None:
+            self.hits += 1
+            self._templates.move_to_end(key)
+        else:
+            self.misses += 1
+            ranges = self.engine.calculate_optimal_ranges(current_price, volatility, total_liquidity)
+            template = [(r.lower / current_price, r.upper / current_price, r.liquidity) for r in ranges]
+            
+            self._templates[key] = template
+            if len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+        
+        return [
+            Range(lower * current_price, upper * current_price, liquidity)
+            for lower, upper, liquidity in template
+        ]
+    
+    def clear(self):
+        """Drop cached templates (e.g. after changing engine thresholds)"""
+        self._templates.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._templates),
+            "tick_size": self.tick_size
+        }
+
+
 class SeltraBackendService:
     """Main backend service orchestrating all off-chain logic"""
     
     def __init__(self):
         self.volatility_calculator = VolatilityCalculator()
         self.rebalancing_engine = RebalancingEngine()
+        self.range_cache = RangeCache(self.rebalancing_engine)
         self.pool_state: Optional[PoolState] = None
         self.oracle_state: Optional[OracleState] = None
         
-        # Initialize contract client
-        try:
-            self.contract_config = load_contract_config()
-            self.contract_client = SeltraContractClient(self.contract_config)
-            self.contract_connected = True
-            print("✅ Connected to deployed contracts")
-        except Exception as e:
-            print(f"⚠️ Warning: Could not connect to contracts: {e}")
-            self.contract_connected = False
+        # Optional shared, round-cached pool state reader (see attach_pool_reader)
+        self.pool_reader = None
+        
+        # Contract state cache: one fetch per round, shared by concurrent callers
+        self._sync_round = 0          # Latest round pushed by the block follower
+        self._sync_cache: Optional[Tuple[int, float, Dict[str, Any]]] = None  # (round, fetched_at, state)
+        self._sync_inflight: Optional[asyncio.Task] = None
+        self._sync_demand = False     # State was requested since the last round
+        self.sync_stats = {"fetches": 0, "cache_hits": 0, "shared": 0, "prefetches": 0}
+        
+        # Minimal-diff range updates; on-chain slot layout cached after the first read
+        self.rebalance_planner = RebalancePlanner(max_slots=MAX_CONTRACT_RANGES)
+        self.onchain_range_slots: Optional[List[Optional[Range]]] = None
+        
+        # Tick-driven rebalancer (started by the simulation service)
+        self.rebalancer = RebalancingDaemon(self)
+        
+        # Round-driven chain tasks (see attach_block_follower)
+        self.oracle_publisher = OraclePublisher(self)
+        self.block_follower = None
+        
+        # Contract client, connected once an algod transport is attached (see attach_block_follower)
+        self.contract_client: Optional[SeltraContractClient] = None
+        self.contract_connected = False
     
     def update_oracle(self, new_price: float) -> Tuple[float, str]:
         """
@@ -344,12 +692,23 @@ class SeltraBackendService:
         volatility, regime = self.volatility_calculator.update_price(new_price)
         
         # Update oracle state
-        if self.oracle_state:
+        if self.oracle_state is None:
+            self.oracle_state = OracleState(
+                current_price=new_price,
+                current_volatility=volatility,
+                current_regime=regime,
+                last_update_time=int(datetime.now().timestamp()),
+                price_history=[]
+            )
+        else:
             self.oracle_state.current_price = new_price
             self.oracle_state.current_volatility = volatility
             self.oracle_state.current_regime = regime
             self.oracle_state.last_update_time = int(datetime.now().timestamp())
         
+        # Coalesced; written on chain at most once per round
+        self.oracle_publisher.submit(new_price, volatility, regime)
+        
         return volatility, regime
     
     def check_rebalancing(
@@ -375,8 +734,8 @@ class SeltraBackendService:
         if not should_rebalance:
             return False, [], "No rebalancing needed"
         
-        # Calculate optimal ranges
-        optimal_ranges = self.rebalancing_engine.calculate_optimal_ranges(
+        # Calculate optimal ranges (memoized per regime/price bucket/liquidity)
+        optimal_ranges = self.range_cache.get_optimal_ranges(
             current_price, current_volatility, total_liquidity
         )
         
@@ -418,63 +777,224 @@ class SeltraBackendService:
         
         return True, f"VALID: efficiency_gain={efficiency_gain:.2f}%", efficiency_gain
     
-    def format_ranges_for_contract(self, ranges: List[Range]) -> str:
+    def format_ranges_for_contract(self, ranges: List[Range]) -> bytes:
         """
         Format ranges for on-chain contract storage
         
+        Encodes the ARC-4 uint64[3][6] RangeArray: prices scaled by
+        RANGE_PRICE_SCALE, liquidity by RANGE_LIQUIDITY_SCALE, active ranges
+        first in price order, unused slots zero.
+        
         Args:
-            ranges: List of ranges to format
+            ranges: List of ranges to format (zero-liquidity ranges are left out)
             
         Returns:
-            JSON-like string for contract storage
+            RANGE_ARRAY_BYTES bytes for the contract
+        
+        Raises:
+            ValueError: If more than MAX_CONTRACT_RANGES ranges are active, or a
+                range is invalid or does not fit in uint64 once scaled
+        """
+        active = sorted((r for r in ranges if r.liquidity != 0), key=lambda r: r.lower)
+        if len(active) > MAX_CONTRACT_RANGES:
+            raise ValueError(f"At most {MAX_CONTRACT_RANGES} ranges fit on chain, got {len(active)}")
+        
+        slots = active + [None] * (MAX_CONTRACT_RANGES - len(active))
+        return b"".join(self.format_range_slot(r) for r in slots)
+    
+    def format_range_slot(self, range_obj: Optional[Range]) -> bytes:
+        """
+        Encode one RangeArray slot (uint64[3]); None encodes an empty slot
+        
+        Raises:
+            ValueError: If the bounds are not 0 < lower < upper, liquidity is not
+                positive, or a scaled value does not fit in uint64
+        """
+        if range_obj is None:
+            return bytes(RANGE_SLOT_BYTES)
+        if range_obj.lower <= 0 or range_obj.lower >= range_obj.upper:
+            raise ValueError(f"Invalid range {range_obj.lower} - {range_obj.upper}")
+        if not range_obj.liquidity > 0:
+            raise ValueError(f"Invalid range liquidity {range_obj.liquidity}")
+        
+        scaled = (
+            range_obj.lower * RANGE_PRICE_SCALE,
+            range_obj.upper * RANGE_PRICE_SCALE,
+            range_obj.liquidity * RANGE_LIQUIDITY_SCALE
+        )
+        if not all(math.isfinite(value) and value <= UINT64_MAX for value in scaled):
+            raise ValueError(f"Range {range_obj} does not fit in uint64")
+        
+        lower, upper, liquidity = (round(value) for value in scaled)
+        # Dust liquidity still marks the slot as used (zero means empty)
+        return struct.pack(RANGE_SLOT_FORMAT, lower, upper, max(1, liquidity))
+    
+    def parse_range_slots(self, ranges_data: bytes) -> List[Optional[Range]]:
+        """
+        Decode a RangeArray keeping slot positions
+        
+        Args:
+            ranges_data: RangeArray bytes from the contract
+        
+        Returns:
+            MAX_CONTRACT_RANGES entries, None for unused slots
         """
-        range_data = []
-        for r in ranges:
-            range_data.append({
-                "lower": r.lower,
-                "upper": r.upper,
-                "liquidity": r.liquidity
-            })
+        if len(ranges_data) != RANGE_ARRAY_BYTES:
+            raise ValueError(f"Expected {RANGE_ARRAY_BYTES} bytes, got {len(ranges_data)}")
         
-        return json.dumps(range_data)
+        slots: List[Optional[Range]] = []
+        for lower, upper, liquidity in struct.iter_unpack(RANGE_SLOT_FORMAT, ranges_data):
+            if liquidity == 0:
+                slots.append(None)
+            else:
+                slots.append(Range(
+                    lower=lower / RANGE_PRICE_SCALE,
+                    upper=upper / RANGE_PRICE_SCALE,
+                    liquidity=liquidity / RANGE_LIQUIDITY_SCALE
+                ))
+        return slots
     
-    def parse_ranges_from_contract(self, ranges_json: str) -> List[Range]:
+    def parse_ranges_from_contract(self, ranges_data: bytes) -> List[Range]:
         """
         Parse ranges from contract storage format
         
         Args:
-            ranges_json: JSON string from contract
+            ranges_data: RangeArray bytes from the contract
             
         Returns:
-            List of Range objects
+            List of Range objects (unused slots skipped)
         """
         try:
-            range_data = json.loads(ranges_json)
-            ranges = []
-            for r in range_data:
-                ranges.append(Range(
-                    lower=r["lower"],
-                    upper=r["upper"],
-                    liquidity=r["liquidity"]
-                ))
-            return ranges
-        except (json.JSONDecodeError, KeyError):
+            slots = self.parse_range_slots(ranges_data)
+        except ValueError:
             return []
+        return [r for r in slots if r is not None]
+    
+    def attach_pool_reader(self, pool_reader: Any):
+        """
+        Share a pool state reader with the backend
+        
+        Args:
+            pool_reader: Object with an async get_pool_info() returning a PoolInfo
+                (the simulation's SeltraPoolClient). Its cache is versioned by round,
+                so the backend, wallet manager and API share one read per block.
+        """
+        self.pool_reader = pool_reader
     
-    def sync_with_contracts(self) -> Dict[str, Any]:
+    def attach_block_follower(self, block_follower: Any) -> bool:
+        """
+        Connect to the deployed contracts through a block follower's algod client
+        and drive the round-based chain tasks from it
+        
+        Args:
+            block_follower: Object with the process-wide async algod transport as
+                algod_client and a subscribe(callback) that calls back with each
+                new round (the simulation's BlockFollower). The caller owns its
+                run()/stop() lifecycle.
+        
+        Returns:
+            True if the contracts are connected (the follower is only kept then)
+        """
+        try:
+            self.contract_config = load_contract_config()
+            self.contract_client = SeltraContractClient(self.contract_config, block_follower.algod_client)
+            self.contract_connected = True
+            print("✅ Connected to deployed contracts")
+        except Exception as e:
+            print(f"⚠️ Warning: Could not connect to contracts: {e}")
+            return False
+        
+        self.block_follower = block_follower
+        self.block_follower.subscribe(self.push_round)
+        self.block_follower.subscribe(self.oracle_publisher.on_round)
+        return True
+    
+    async def _read_pool_state(self) -> ContractPoolState:
+        """Read pool state through the shared reader, falling back to the contract client"""
+        if self.pool_reader is not None:
+            pool_info = await self.pool_reader.get_pool_info()
+            if pool_info:
+                return ContractPoolState(
+                    asset_x_id=pool_info.asset_x_id,
+                    asset_y_id=pool_info.asset_y_id,
+                    current_price=pool_info.current_price,
+                    total_liquidity=pool_info.total_liquidity,
+                    current_fee_rate=pool_info.current_fee_rate,
+                    last_rebalance_time=0
+                )
+        
+        if not self.contract_connected:
+            raise Exception("Pool state unavailable")
+        
+        return await self.contract_client.get_pool_state()
+    
+    async def sync_with_contracts(self, refresh: bool = False) -> Dict[str, Any]:
         """
         Sync backend state with deployed contracts
         
+        State is cached per round (pushed by the block follower, or for about
+        one block time without one) and concurrent callers share one fetch.
+        
+        Args:
+            refresh: Bypass the cache (still shares an in-flight fetch)
+        
         Returns:
             Dictionary with current contract state
         """
-        if not self.contract_connected:
+        if not self.contract_connected and self.pool_reader is None:
             return {"error": "Not connected to contracts"}
         
+        self._sync_demand = True
+        
+        if not refresh and self._sync_cache is not None:
+            cached_round, fetched_at, state = self._sync_cache
+            if cached_round == self._sync_round and (
+                self._sync_round > 0 or time.time() - fetched_at < SYNC_CACHE_TTL_SECONDS
+            ):
+                self.sync_stats["cache_hits"] += 1
+                return state
+        
+        if self._sync_inflight is not None and not self._sync_inflight.done():
+            self.sync_stats["shared"] += 1
+        else:
+            self._sync_inflight = asyncio.create_task(self._fetch_contract_state(self._sync_round))
+        
+        # Shielded: a cancelled caller must not cancel the fetch others wait on
+        return await asyncio.shield(self._sync_inflight)
+    
+    async def push_round(self, current_round: int):
+        """
+        Advance the contract state cache to a new round (BlockFollower callback)
+        
+        If the state was requested during the previous round, the new round's
+        state is prefetched so dashboard requests hit a warm cache.
+        """
+        if current_round <= self._sync_round:
+            return
+        self._sync_round = current_round
+        
+        if self.pool_reader is not None and hasattr(self.pool_reader, "observe_round"):
+            self.pool_reader.observe_round(current_round)
+        
+        if self._sync_demand and (self._sync_inflight is None or self._sync_inflight.done()):
+            self._sync_demand = False
+            self.sync_stats["prefetches"] += 1
+            self._sync_inflight = asyncio.create_task(self._fetch_contract_state(current_round))
+    
+    async def _fetch_contract_state(self, current_round: int) -> Dict[str, Any]:
+        """Read pool state and liquidity ranges concurrently; cache successful reads"""
+        self.sync_stats["fetches"] += 1
+        
+        async def read_ranges() -> List[LiquidityRange]:
+            if not self.contract_connected:
+                return []
+            return await self.contract_client.get_liquidity_ranges()
+        
         try:
-            # Get current pool state from contract
-            contract_pool_state = self.contract_client.get_pool_state()
-            contract_ranges = self.contract_client.get_liquidity_ranges()
+            # Pool state (shared per-round read when a reader is attached) and ranges in parallel
+            contract_pool_state, contract_ranges = await asyncio.gather(
+                self._read_pool_state(), read_ranges()
+            )
             
             # Update local state
             self.pool_state = PoolState(
@@ -485,7 +1005,7 @@ class SeltraBackendService:
                 range3_liquidity=contract_ranges[2].liquidity_amount / 1e6 if len(contract_ranges) > 2 else 0
             )
             
-            return {
+            state = {
                 "pool_state": {
                     "current_price": self.pool_state.current_price,
                     "total_liquidity": self.pool_state.total_liquidity,
@@ -503,10 +1023,14 @@ class SeltraBackendService:
                     }
                     for r in contract_ranges
                 ],
-                "status": "synced"
+                "status": "synced",
+                "round": current_round or None
             }
         except Exception as e:
             return {"error": f"Failed to sync with contracts: {e}"}
+        
+        self._sync_cache = (current_round, time.time(), state)
+        return state
     
     async def execute_rebalance_on_chain(self, new_ranges: List[Range]) -> str:
         """
@@ -522,15 +1046,74 @@ class SeltraBackendService:
             raise Exception("Not connected to contracts")
         
         try:
+            # Plan the range writes first so an invalid layout fails before
+            # anything executes on chain
+            plan = None
+            if self.contract_client.rebalancing_app_id:
+                plan = await self.plan_rebalance(new_ranges)
+            
             # Trigger rebalance on contract
-            tx_id = self.contract_client.trigger_rebalance()
+            tx_id = await self.contract_client.trigger_rebalance()
             print(f"✅ Rebalance executed: {tx_id}")
+            
+            # Record the new ranges in RebalancingState when it is deployed
+            if plan is not None:
+                await self.apply_range_plan(plan)
+            
             return tx_id
         except Exception as e:
             print(f"❌ Failed to execute rebalance: {e}")
             raise
     
-    def get_contract_metrics(self) -> Dict[str, Any]:
+    async def plan_rebalance(self, new_ranges: List[Range]) -> RebalancePlan:
+        """
+        Plan the slot writes that move the on-chain ranges to new_ranges
+        
+        Args:
+            new_ranges: Target ranges
+        
+        Returns:
+            RebalancePlan (operations, atomic groups and cost estimate)
+        """
+        if self.onchain_range_slots is None:
+            ranges_data = await self.contract_client.get_range_slots()
+            if ranges_data is None:
+                self.onchain_range_slots = [None] * MAX_CONTRACT_RANGES
+            else:
+                self.onchain_range_slots = self.parse_range_slots(ranges_data)
+        
+        return self.rebalance_planner.plan(self.onchain_range_slots, new_ranges)
+    
+    async def apply_range_plan(self, plan: RebalancePlan) -> List[str]:
+        """
+        Execute a rebalance plan's slot writes on RebalancingState
+        
+        Returns:
+            Transaction IDs, one per atomic group
+        """
+        if plan.is_noop:
+            print("✅ Ranges already within tolerance; nothing to write")
+            return []
+        
+        groups = [
+            [(operation.slot, self.format_range_slot(operation.new)) for operation in group]
+            for group in plan.groups
+        ]
+        try:
+            tx_ids = await self.contract_client.update_range_slots(groups)
+        except Exception:
+            # Unknown how far we got; re-read the layout next time
+            self.onchain_range_slots = None
+            raise
+        
+        self.onchain_range_slots = plan.final_slots
+        print(
+            f"✅ Ranges updated: {len(plan.operations)} slot write(s) in {plan.cost.groups} group(s), "
+            f"est. cost {plan.cost.total:.4f} (full replace {plan.full_replace_cost.total:.4f})"
+        )
+        return tx_ids
+    
+    async def get_contract_metrics(self) -> Dict[str, Any]:
         """
         Get comprehensive metrics from contracts and backend
         
@@ -539,13 +1122,16 @@ class SeltraBackendService:
         """
         metrics = {
             "timestamp": datetime.now().isoformat(),
-            "contract_connected": self.contract_connected
+            "contract_connected": self.contract_connected,
+            "range_cache": self.range_cache.get_stats(),
+            "oracle_publisher": self.oracle_publisher.get_status(),
+            "contract_sync": dict(self.sync_stats)
         }
         
-        if self.contract_connected:
+        if self.contract_connected or self.pool_reader is not None:
             try:
                 # Get contract state
-                contract_state = self.sync_with_contracts()
+                contract_state = await self.sync_with_contracts()
                 metrics.update(contract_state)
                 
                 # Add volatility metrics
@@ -571,6 +1157,412 @@ class SeltraBackendService:
         return metrics
 
 
+@dataclass
+class RebalanceDecision:
+    """Outcome of one rebalancing policy evaluation"""
+    should_rebalance: bool
+    reason: str
+    price: float
+    volatility: float
+    regime: str
+    efficiency: float
+    time_since_last: float
+    volatility_change: float
+    optimal_ranges: List[Range]
+    timestamp: float
+
+
+class RebalancingDaemon:
+    """
+    Rebalancer driven by the market price stream
+    
+    Every tick updates the EWMA volatility incrementally and re-evaluates
+    should_rebalance against the ranges actually deployed, the time since
+    the last executed rebalance and the volatility change since then.
+    On-chain execution runs as a background task so tick processing never
+    waits on algod; at most one rebalance is in flight.
+    """
+    
+    def __init__(
+        self,
+        backend: 'SeltraBackendService',
+        total_liquidity: float = 1000000.0,
+        cooldown_seconds: float = REBALANCE_COOLDOWN_SECONDS
+    ):
+        self.backend = backend
+        self.total_liquidity = total_liquidity
+        self.cooldown_seconds = cooldown_seconds
+        
+        # Deployed ranges and the state they were deployed in
+        self.current_ranges: List[Range] = []
+        self.last_rebalance_time = time.time()
+        self.volatility_at_last_rebalance = 0.0
+        self.last_tx_id: Optional[str] = None
+        
+        self.last_decision: Optional[RebalanceDecision] = None
+        self.is_running = False
+        self._inflight: Optional[asyncio.Task] = None
+        
+        self.stats = {
+            "ticks": 0,
+            "evaluations": 0,
+            "rebalances": 0,
+            "rejected": 0,
+            "failed": 0,
+            "last_reaction_ms": 0.0
+        }
+    
+    async def seed_from_contracts(self):
+        """Start from the ranges and liquidity currently on chain, if reachable"""
+        state = await self.backend.sync_with_contracts()
+        if "error" in state:
+            print(f"⚠️ Rebalancer starting without contract state: {state['error']}")
+            return
+        
+        ranges = [
+            Range(r["price_lower"], r["price_upper"], r["liquidity"])
+            for r in state.get("liquidity_ranges", []) if r.get("is_active", True)
+        ]
+        if ranges:
+            self.current_ranges = ranges
+        total = state.get("pool_state", {}).get("total_liquidity")
+        if total:
+            self.total_liquidity = total
+    
+    def on_price(self, price: float) -> RebalanceDecision:
+        """
+        Feed one price observation and re-evaluate the policy
+        
+        Args:
+            price: New market price
+        
+        Returns:
+            RebalanceDecision for the updated state
+        """
+        self.backend.update_oracle(price)
+        self.stats["ticks"] += 1
+        return self.evaluate()
+    
+    def evaluate(self) -> RebalanceDecision:
+        """
+        Evaluate should_rebalance from the current oracle and deployed ranges
+        
+        Returns:
+            RebalanceDecision (optimal_ranges is empty unless it should fire)
+        """
+        oracle = self.backend.oracle_state
+        if oracle is None:
+            raise ValueError("No price observed yet")
+        
+        now = time.time()
+        price = oracle.current_price
+        volatility = oracle.current_volatility
+        efficiency = self.backend.rebalancing_engine.calculate_efficiency_score(
+            self.current_ranges, price, max(volatility, MIN_EFFICIENCY_VOLATILITY)
+        )
+        time_since_last = now - self.last_rebalance_time
+        volatility_change = abs(volatility - self.volatility_at_last_rebalance)
+        total_liquidity = sum(r.liquidity for r in self.current_ranges) or self.total_liquidity
+        
+        self.stats["evaluations"] += 1
+        should_rebalance, optimal_ranges, reason = self.backend.check_rebalancing(
+            price, volatility, total_liquidity, efficiency, int(time_since_last), volatility_change
+        )
+        
+        if should_rebalance and self.current_ranges:
+            if time_since_last < self.cooldown_seconds:
+                should_rebalance, optimal_ranges = False, []
+                reason = f"Cooldown: {self.cooldown_seconds - time_since_last:.0f}s remaining"
+            else:
+                # Engine allocations carry a proximity bonus; redeploy exactly what is deployed
+                scale = total_liquidity / sum(r.liquidity for r in optimal_ranges)
+                optimal_ranges = [Range(r.lower, r.upper, r.liquidity * scale) for r in optimal_ranges]
+                
+                is_safe, safety_reason = self.backend.rebalancing_engine.validate_rebalancing_safety(
+                    self.current_ranges, optimal_ranges
+                )
+                if not is_safe:
+                    self.stats["rejected"] += 1
+                    should_rebalance, optimal_ranges = False, []
+                    reason = f"UNSAFE: {safety_reason}"
+        
+        decision = RebalanceDecision(
+            should_rebalance=should_rebalance,
+            reason=reason,
+            price=price,
+            volatility=volatility,
+            regime=oracle.current_regime,
+            efficiency=efficiency,
+            time_since_last=time_since_last,
+            volatility_change=volatility_change,
+            optimal_ranges=optimal_ranges,
+            timestamp=now
+        )
+        self.last_decision = decision
+        return decision
+    
+    @property
+    def rebalance_in_flight(self) -> bool:
+        return self._inflight is not None and not self._inflight.done()
+    
+    async def execute(self, decision: RebalanceDecision) -> Optional[str]:
+        """
+        Execute a decision and record the newly deployed state
+        
+        Without a contract connection the ranges are adopted locally (dry run).
+        
+        Returns:
+            Transaction ID, or None for a dry run
+        """
+        tx_id = None
+        if self.backend.contract_connected:
+            try:
+                tx_id = await self.backend.execute_rebalance_on_chain(decision.optimal_ranges)
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+        
+        self.current_ranges = decision.optimal_ranges
+        self.last_rebalance_time = time.time()
+        self.volatility_at_last_rebalance = decision.volatility
+        self.last_tx_id = tx_id
+        self.stats["rebalances"] += 1
+        return tx_id
+    
+    def start_rebalance(self, decision: RebalanceDecision) -> Tuple[asyncio.Task, bool]:
+        """
+        Execute a decision as the single in-flight rebalance
+        
+        Both the tick loop and manual triggers go through here, so at most
+        one rebalance runs on chain at a time.
+        
+        Returns:
+            Tuple of (in-flight task, whether it was started by this call);
+            when one is already in flight it is returned instead
+        """
+        if self.rebalance_in_flight:
+            return self._inflight, False
+        
+        self._inflight = asyncio.create_task(self.execute(decision))
+        self._inflight.add_done_callback(self._on_rebalance_done)
+        return self._inflight, True
+    
+    @staticmethod
+    def _on_rebalance_done(task: asyncio.Task):
+        # Retrieve the outcome so failures are reported even when nobody awaits the task
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Rebalancer: {task.exception()}")
+    
+    async def run(self, ticks: asyncio.Queue):
+        """
+        Consume price ticks until stopped
+        
+        Args:
+            ticks: Queue of price ticks (floats or objects with a .price)
+        """
+        self.is_running = True
+        try:
+            await self.seed_from_contracts()
+        except Exception as e:
+            print(f"⚠️ Rebalancer starting without contract state: {e}")
+        
+        try:
+            while self.is_running:
+                tick = await ticks.get()
+                received = time.perf_counter()
+                
+                # Catch up on ticks queued while we were busy, evaluate once
+                prices = [getattr(tick, "price", tick)]
+                while not ticks.empty():
+                    queued = ticks.get_nowait()
+                    prices.append(getattr(queued, "price", queued))
+                for price in prices[:-1]:
+                    self.backend.update_oracle(price)
+                self.stats["ticks"] += len(prices) - 1
+                decision = self.on_price(prices[-1])
+                
+                if decision.should_rebalance:
+                    self.start_rebalance(decision)
+                
+                self.stats["last_reaction_ms"] = (time.perf_counter() - received) * 1000
+        finally:
+            self.is_running = False
+            if self.rebalance_in_flight:
+                self._inflight.cancel()
+    
+    def stop(self):
+        """Stop after the current tick"""
+        self.is_running = False
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Current policy inputs, deployed ranges and counters"""
+        decision = self.last_decision
+        return {
+            "running": self.is_running,
+            "rebalance_in_flight": self.rebalance_in_flight,
+            "current_ranges": [
+                {"lower": r.lower, "upper": r.upper, "liquidity": r.liquidity}
+                for r in self.current_ranges
+            ],
+            "last_rebalance_time": self.last_rebalance_time,
+            "last_tx_id": self.last_tx_id,
+            "last_decision": None if decision is None else {
+                "should_rebalance": decision.should_rebalance,
+                "reason": decision.reason,
+                "price": decision.price,
+                "volatility": decision.volatility,
+                "regime": decision.regime,
+                "efficiency": decision.efficiency,
+                "time_since_last": decision.time_since_last,
+                "volatility_change": decision.volatility_change,
+                "timestamp": decision.timestamp
+            },
+            "stats": dict(self.stats)
+        }
+
+
+class OraclePublisher:
+    """
+    Coalescing writer of backend price/volatility to the on-chain oracle
+    
+    submit() only records the latest observation. Once per round (driven by
+    the BlockFollower) the latest observation is compared with what is on
+    chain and published as one atomic group (price + volatility) if it
+    deviates by more than the thresholds, or if the heartbeat is due. At most
+    one write is in flight, so on-chain data is never more than the
+    heartbeat plus one confirmation old.
+    """
+    
+    def __init__(
+        self,
+        backend: 'SeltraBackendService',
+        price_deviation: float = ORACLE_PRICE_DEVIATION,
+        volatility_deviation: float = ORACLE_VOLATILITY_DEVIATION,
+        heartbeat_rounds: int = ORACLE_HEARTBEAT_ROUNDS
+    ):
+        self.backend = backend
+        self.price_deviation = price_deviation
+        self.volatility_deviation = volatility_deviation
+        self.heartbeat_rounds = heartbeat_rounds
+        
+        # Latest observation not yet published: (price, volatility, regime)
+        self.pending: Optional[Tuple[float, float, str]] = None
+        
+        # Last value written on chain
+        self.published: Optional[Tuple[float, float, str]] = None
+        self.published_round = 0
+        self.last_tx_id: Optional[str] = None
+        
+        self._inflight: Optional[asyncio.Task] = None
+        self.stats = {
+            "submitted": 0,
+            "published": 0,
+            "below_threshold": 0,
+            "busy_rounds": 0,
+            "failed": 0,
+            "rejected": 0
+        }
+        
+        # Last encoding error, reported once instead of every round
+        self.last_error: Optional[str] = None
+    
+    def submit(self, price: float, volatility: float, regime: str):
+        """Record the latest oracle observation (replaces any unpublished one)"""
+        self.pending = (price, volatility, regime)
+        self.stats["submitted"] += 1
+    
+    def needs_publish(self, current_round: int) -> bool:
+        """Whether the pending observation should be written this round"""
+        if self.pending is None:
+            return False
+        if self.published is None:
+            return True
+        if current_round - self.published_round >= self.heartbeat_rounds:
+            return True
+        
+        price, volatility, regime = self.pending
+        published_price, published_volatility, published_regime = self.published
+        
+        if regime != published_regime:
+            return True
+        if abs(price - published_price) > published_price * self.price_deviation:
+            return True
+        return abs(volatility - published_volatility) > self.volatility_deviation
+    
+    async def on_round(self, current_round: int):
+        """BlockFollower callback: publish at most once per round"""
+        if self._inflight is not None and not self._inflight.done():
+            self.stats["busy_rounds"] += 1
+            return
+        if not self.needs_publish(current_round):
+            if self.pending is not None:
+                self.stats["below_threshold"] += 1
+            return
+        
+        observation, self.pending = self.pending, None
+        try:
+            encoded = self.encode(observation)
+        except ValueError as e:
+            # Permanent for this observation: drop it rather than retry every round
+            self.stats["rejected"] += 1
+            if str(e) != self.last_error:
+                print(f"❌ Oracle observation rejected: {e}")
+            self.last_error = str(e)
+            return
+        
+        self._inflight = asyncio.create_task(self._publish(observation, encoded))
+    
+    @staticmethod
+    def encode(observation: Tuple[float, float, str]) -> Tuple[int, int, str]:
+        """
+        Scale an observation to the contract's uint64 arguments
+        
+        Raises:
+            ValueError: If the price is not positive or a value does not fit in uint64
+        """
+        price, volatility, regime = observation
+        scaled_price = int(round(price * PRICE_FIXED_POINT_SCALE))
+        scaled_volatility = int(round(volatility / 100 * VOLATILITY_SCALE))
+        
+        if not 0 < scaled_price <= UINT64_MAX:
+            raise ValueError(f"Price {price} out of uint64 range at scale {PRICE_FIXED_POINT_SCALE}")
+        if not 0 <= scaled_volatility <= UINT64_MAX:
+            raise ValueError(f"Volatility {volatility} out of uint64 range at scale {VOLATILITY_SCALE}")
+        return scaled_price, scaled_volatility, regime
+    
+    async def _publish(self, observation: Tuple[float, float, str], encoded: Tuple[int, int, str]):
+        try:
+            tx_id, confirmed_round = await self.backend.contract_client.publish_oracle_update(*encoded)
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"❌ Oracle publish failed: {e}")
+            # Retry next round unless a newer observation arrived meanwhile
+            if self.pending is None:
+                self.pending = observation
+            return
+        
+        self.published = observation
+        self.published_round = confirmed_round
+        self.last_tx_id = tx_id
+        self.last_error = None
+        self.stats["published"] += 1
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Published value, round and counters"""
+        return {
+            "published": None if self.published is None else {
+                "price": self.published[0],
+                "volatility": self.published[1],
+                "regime": self.published[2],
+                "round": self.published_round,
+                "tx_id": self.last_tx_id
+            },
+            "has_pending": self.pending is not None,
+            "last_error": self.last_error,
+            "stats": dict(self.stats)
+        }
+
+
 # Example usage and testing
 if __name__ == "__main__":
     # Initialize backend service
@@ -606,5 +1598,6 @@ if __name__ == "__main__":
             print(f"  Range {i+1}: {r.lower:.2f} - {r.upper:.2f}, Liquidity: {r.liquidity:.0f}")
         
         # Format for contract
-        ranges_json = backend.format_ranges_for_contract(optimal_ranges)
-        print(f"\nFormatted for contract: {ranges_json}")
+        ranges_data = backend.format_ranges_for_contract(optimal_ranges)
+        print(f"\nFormatted for contract ({len(ranges_data)} bytes): {ranges_data.hex()}")
+        print(f"Round trip: {backend.parse_ranges_from_contract(ranges_data)}")
@@ -3,16 +3,32 @@ Seltra Contract Client - Integration with Deployed Contracts
 Handles all interactions with deployed Algorand smart contracts
 """
 
+import asyncio
+import base64
 import json
-from typing import Dict, List, Tuple, Optional, Any
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
-from algosdk.v2client.algod import AlgodClient
 from algosdk.transaction import (
     ApplicationCallTxn, AssetTransferTxn, PaymentTxn,
-    wait_for_confirmation, SuggestedParams
+    SuggestedParams, assign_group_id
 )
-from algosdk import account, mnemonic
+from algosdk import abi, account, mnemonic
 from algosdk.encoding import encode_address, decode_address
+from algosdk.error import AlgodHTTPError
+
+if TYPE_CHECKING:
+    # The async algod transport lives in the simulation package and is injected
+    # by it; offline tools (backtester, parameter sweep) never need it
+    from simulation.algod_client import AsyncAlgodClient
+
+# Backend-fed oracle writers (SeltraPoolCore / VolatilityOracleState)
+UPDATE_PRICE_METHOD = abi.Method.from_signature("update_price_from_backend(uint64)string")
+UPDATE_VOLATILITY_METHOD = abi.Method.from_signature("update_volatility_from_backend(uint64,string)string")
+
+# RebalancingState range writers; ranges are a fixed-width uint64[3][6] kept in box "ranges"
+UPDATE_RANGE_METHOD = abi.Method.from_signature("update_range(uint64,uint64[3])string")
+COMMIT_RANGES_METHOD = abi.Method.from_signature("commit_ranges()string")
+RANGES_BOX_NAME = b"ranges"
 
 
 @dataclass
@@ -60,9 +76,14 @@ class SwapResult:
 class SeltraContractClient:
     """Client for interacting with deployed Seltra contracts"""
     
-    def __init__(self, config: ContractConfig):
+    def __init__(self, config: ContractConfig, algod_client: 'AsyncAlgodClient'):
+        """
+        Args:
+            config: Deployed contract configuration
+            algod_client: Async algod transport for config.algod_address
+        """
         self.config = config
-        self.algod_client = AlgodClient(config.algod_token, config.algod_address)
+        self.algod_client = algod_client
         self.deployer_address = config.deployer_address
         self.deployer_private_key = config.deployer_private_key
         
@@ -70,16 +91,17 @@ class SeltraContractClient:
         self.seltra_pool_app_id = config.contracts['seltra_pool_core']['app_id']
         self.hack_token_asset_id = config.contracts['hack_token']['asset_id']
         self.oracle_app_id = config.contracts['volatility_oracle_state']['app_id']
+        self.rebalancing_app_id = config.contracts.get('rebalancing_state', {}).get('app_id')
         
-    def get_suggested_params(self) -> SuggestedParams:
+    async def get_suggested_params(self) -> SuggestedParams:
         """Get suggested transaction parameters"""
-        return self.algod_client.suggested_params()
+        return await self.algod_client.suggested_params()
     
-    def get_pool_state(self) -> PoolState:
+    async def get_pool_state(self) -> PoolState:
         """Get current pool state from contract"""
         try:
             # Call the get_pool_info method
-            result = self.algod_client.application_call(
+            result = await self.algod_client.application_call(
                 self.seltra_pool_app_id,
                 method="get_pool_info",
                 sender=self.deployer_address
@@ -106,10 +128,10 @@ class SeltraContractClient:
                 last_rebalance_time=0
             )
     
-    def get_liquidity_ranges(self) -> List[LiquidityRange]:
+    async def get_liquidity_ranges(self) -> List[LiquidityRange]:
         """Get current liquidity ranges from contract"""
         try:
-            result = self.algod_client.application_call(
+            result = await self.algod_client.application_call(
                 self.seltra_pool_app_id,
                 method="get_liquidity_ranges",
                 sender=self.deployer_address
@@ -134,10 +156,10 @@ class SeltraContractClient:
                 LiquidityRange(3, 800000000000000000, 1200000000000000000, 200000000, True)
             ]
     
-    def calculate_swap_output(self, asset_in: int, asset_out: int, amount_in: int) -> Tuple[int, int]:
+    async def calculate_swap_output(self, asset_in: int, asset_out: int, amount_in: int) -> Tuple[int, int]:
         """Calculate expected output for a swap"""
         try:
-            result = self.algod_client.application_call(
+            result = await self.algod_client.application_call(
                 self.seltra_pool_app_id,
                 method="calculate_swap_output",
                 sender=self.deployer_address,
@@ -148,7 +170,7 @@ class SeltraContractClient:
         except Exception as e:
             print(f"Error calculating swap output: {e}")
             # Simple calculation for demo
-            pool_state = self.get_pool_state()
+            pool_state = await self.get_pool_state()
             if asset_in == 0:  # ALGO to HACK
                 amount_out = amount_in * 1000000 // pool_state.current_price
                 price_impact = 10  # 0.1%
@@ -157,11 +179,11 @@ class SeltraContractClient:
                 price_impact = 10  # 0.1%
             return amount_out, price_impact
     
-    def execute_swap(self, asset_in: int, asset_out: int, amount_in: int, 
-                    min_amount_out: int, user_address: str, user_private_key: str) -> SwapResult:
+    async def execute_swap(self, asset_in: int, asset_out: int, amount_in: int, 
+                          min_amount_out: int, user_address: str, user_private_key: str) -> SwapResult:
         """Execute a swap transaction"""
         try:
-            params = self.get_suggested_params()
+            params = await self.get_suggested_params()
             
             # Create asset transfer transaction
             if asset_in == 0:  # ALGO
@@ -194,26 +216,26 @@ class SeltraContractClient:
             signed_app_call = app_call_txn.sign(user_private_key)
             
             # Submit transaction group
-            tx_id = self.algod_client.send_transactions([signed_transfer, signed_app_call])
-            result = wait_for_confirmation(self.algod_client, tx_id, 4)
+            tx_id = await self.algod_client.send_transactions([signed_transfer, signed_app_call])
+            result = await self.algod_client.wait_for_confirmation(tx_id, 4)
             
             return SwapResult(
                 amount_out=min_amount_out,  # Simplified
                 price_impact_bps=10,
                 fee_paid=amount_in * 30 // 10000,  # 0.3% fee
-                new_price=self.get_pool_state().current_price,
+                new_price=(await self.get_pool_state()).current_price,
                 transaction_id=tx_id
             )
         except Exception as e:
             print(f"Error executing swap: {e}")
             raise
     
-    def add_liquidity(self, asset_x: int, asset_y: int, amount_x: int, amount_y: int,
-                     range_lower: int, range_upper: int, user_address: str, 
-                     user_private_key: str) -> Tuple[int, int, int]:
+    async def add_liquidity(self, asset_x: int, asset_y: int, amount_x: int, amount_y: int,
+                           range_lower: int, range_upper: int, user_address: str, 
+                           user_private_key: str) -> Tuple[int, int, int]:
         """Add liquidity to a specific range"""
         try:
-            params = self.get_suggested_params()
+            params = await self.get_suggested_params()
             
             # Create asset transfer transactions
             transfer_x = AssetTransferTxn(
@@ -257,10 +279,10 @@ class SeltraContractClient:
             signed_transfer_y = transfer_y.sign(user_private_key)
             signed_app_call = app_call.sign(user_private_key)
             
-            tx_id = self.algod_client.send_transactions([
+            tx_id = await self.algod_client.send_transactions([
                 signed_transfer_x, signed_transfer_y, signed_app_call
             ])
-            wait_for_confirmation(self.algod_client, tx_id, 4)
+            await self.algod_client.wait_for_confirmation(tx_id, 4)
             
             # Return actual amounts and LP tokens minted
             return amount_x, amount_y, 1000000  # Simplified
@@ -269,10 +291,10 @@ class SeltraContractClient:
             print(f"Error adding liquidity: {e}")
             raise
     
-    def trigger_rebalance(self) -> str:
+    async def trigger_rebalance(self) -> str:
         """Trigger liquidity rebalancing"""
         try:
-            params = self.get_suggested_params()
+            params = await self.get_suggested_params()
             
             app_call = ApplicationCallTxn(
                 sender=self.deployer_address,
@@ -283,18 +305,128 @@ class SeltraContractClient:
             )
             
             signed_txn = app_call.sign(self.deployer_private_key)
-            tx_id = self.algod_client.send_transaction(signed_txn)
-            wait_for_confirmation(self.algod_client, tx_id, 4)
+            tx_id = await self.algod_client.send_transaction(signed_txn)
+            await self.algod_client.wait_for_confirmation(tx_id, 4)
             
             return tx_id
         except Exception as e:
             print(f"Error triggering rebalance: {e}")
             raise
     
-    def get_user_positions(self, user_address: str) -> List[Tuple[int, int, int]]:
+    async def publish_oracle_update(self, price: int, volatility: int, regime: str) -> Tuple[str, int]:
+        """
+        Write price and volatility in one atomic group
+        
+        Args:
+            price: Price scaled by PRICE_FIXED_POINT_SCALE (1e6, the pool's swap math scale)
+            volatility: Volatility scaled by VOLATILITY_SCALE (1e6)
+            regime: Volatility regime ("low", "medium", "high")
+        
+        Returns:
+            Tuple of (transaction ID of the first txn, confirmed round)
+        """
+        params = await self.get_suggested_params()
+        
+        price_call = ApplicationCallTxn(
+            sender=self.deployer_address,
+            sp=params,
+            index=self.seltra_pool_app_id,
+            on_complete=0,
+            app_args=[
+                UPDATE_PRICE_METHOD.get_selector(),
+                abi.UintType(64).encode(price)
+            ]
+        )
+        volatility_call = ApplicationCallTxn(
+            sender=self.deployer_address,
+            sp=params,
+            index=self.oracle_app_id,
+            on_complete=0,
+            app_args=[
+                UPDATE_VOLATILITY_METHOD.get_selector(),
+                abi.UintType(64).encode(volatility),
+                abi.StringType().encode(regime)
+            ]
+        )
+        
+        group = assign_group_id([price_call, volatility_call])
+        signed = [txn.sign(self.deployer_private_key) for txn in group]
+        tx_id = await self.algod_client.send_transactions(signed)
+        result = await self.algod_client.wait_for_confirmation(tx_id, 4)
+        
+        return tx_id, result['confirmed-round']
+    
+    async def get_range_slots(self) -> Optional[bytes]:
+        """
+        Read the stored RangeArray from RebalancingState
+        
+        Returns:
+            Encoded ranges, or None before the first write
+        """
+        if not self.rebalancing_app_id:
+            raise ValueError("rebalancing_state is not deployed")
+        
+        try:
+            box = await self.algod_client.application_box_by_name(self.rebalancing_app_id, RANGES_BOX_NAME)
+        except AlgodHTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+        return base64.b64decode(box["value"])
+    
+    async def update_range_slots(self, groups: List[List[Tuple[int, bytes]]]) -> List[str]:
+        """
+        Write individual range slots, one atomic group per entry
+        
+        Each group is the slot writes followed by commit_ranges, which
+        validates the resulting ranges on chain.
+        
+        Args:
+            groups: Per group, (slot, encoded uint64[3] bounds) writes
+        
+        Returns:
+            Transaction IDs of each group's first transaction
+        """
+        if not self.rebalancing_app_id:
+            raise ValueError("rebalancing_state is not deployed")
+        
+        params = await self.get_suggested_params()
+        boxes = [(self.rebalancing_app_id, RANGES_BOX_NAME)]
+        tx_ids = []
+        
+        for writes in groups:
+            txns = [
+                ApplicationCallTxn(
+                    sender=self.deployer_address,
+                    sp=params,
+                    index=self.rebalancing_app_id,
+                    on_complete=0,
+                    app_args=[UPDATE_RANGE_METHOD.get_selector(), abi.UintType(64).encode(slot), bounds],
+                    boxes=boxes
+                )
+                for slot, bounds in writes
+            ]
+            txns.append(ApplicationCallTxn(
+                sender=self.deployer_address,
+                sp=params,
+                index=self.rebalancing_app_id,
+                on_complete=0,
+                app_args=[COMMIT_RANGES_METHOD.get_selector()],
+                boxes=boxes
+            ))
+            
+            group = assign_group_id(txns)
+            signed = [txn.sign(self.deployer_private_key) for txn in group]
+            tx_id = await self.algod_client.send_transactions(signed)
+            await self.algod_client.wait_for_confirmation(tx_id, 4)
+            tx_ids.append(tx_id)
+        
+        return tx_ids
+    
+    async def get_user_positions(self, user_address: str) -> List[Tuple[int, int, int]]:
         """Get user's liquidity positions"""
         try:
-            result = self.algod_client.application_call(
+            result = await self.algod_client.application_call(
                 self.seltra_pool_app_id,
                 method="get_user_positions",
                 sender=user_address,
@@ -330,18 +462,27 @@ def load_contract_config() -> ContractConfig:
 
 
 # Example usage
-if __name__ == "__main__":
+async def main():
+    # Run from the repository root so the simulation package is importable
+    from simulation.algod_client import AsyncAlgodClient
+    
     config = load_contract_config()
-    client = SeltraContractClient(config)
+    client = SeltraContractClient(config, AsyncAlgodClient(config.algod_token, config.algod_address))
     
     # Get pool state
-    pool_state = client.get_pool_state()
+    pool_state = await client.get_pool_state()
     print(f"Pool State: {pool_state}")
     
     # Get liquidity ranges
-    ranges = client.get_liquidity_ranges()
+    ranges = await client.get_liquidity_ranges()
     print(f"Liquidity Ranges: {ranges}")
     
     # Calculate swap output
-    amount_out, price_impact = client.calculate_swap_output(0, config.contracts['hack_token']['asset_id'], 1000000)
+    amount_out, price_impact = await client.calculate_swap_output(0, config.contracts['hack_token']['asset_id'], 1000000)
     print(f"Swap 1 ALGO -> {amount_out} HACK (impact: {price_impact} bps)")
+    
+    await client.algod_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,505 @@
+"""
+Seltra Parameter Sweep
+Searches RebalancingEngine thresholds, concentration factors, range counts
+and should_rebalance triggers by backtesting every candidate
+
+- Candidates come from explicit grids, random sampling or a Parzen-estimator
+  (TPE-style) optimizer that proposes new points as workers free up
+- Each candidate is one Backtester run in a process pool; the price path is
+  placed in shared memory once and mapped by every worker
+- Results are cached on disk by a hash of (parameters, price data, backtest
+  config), so re-running a sweep only evaluates new points
+- pareto_front() reports the fee APR vs rebalance cost trade-off
+"""
+
+import os
+import json
+import math
+import time
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, asdict
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from .backend_service import RebalancingEngine
+    from .backtester import Backtester, BacktestConfig, BacktestResult
+except ImportError:
+    from backend_service import RebalancingEngine
+    from backtester import Backtester, BacktestConfig, BacktestResult
+
+
+# Thresholds must stay ordered for the decision tree to be meaningful
+THRESHOLD_NAMES = ["ULTRA_LOW_THRESHOLD", "LOW_THRESHOLD", "MEDIUM_THRESHOLD", "HIGH_THRESHOLD"]
+
+# TPE settings
+GOOD_FRACTION = 0.25        # Share of trials treated as "good" observations
+CANDIDATES_PER_PROPOSAL = 64
+MIN_BANDWIDTH = 0.02        # Kernel width bounds in unit-cube coordinates
+MAX_BANDWIDTH = 0.5
+
+
+@dataclass
+class Parameter:
+    """One searchable RebalancingEngine attribute"""
+    name: str
+    low: float
+    high: float
+    integer: bool = False
+    log: bool = False
+    
+    def to_unit(self, value: float) -> float:
+        """Map a value into [0, 1]"""
+        if self.log:
+            return (math.log(value) - math.log(self.low)) / (math.log(self.high) - math.log(self.low))
+        return (value - self.low) / (self.high - self.low)
+    
+    def from_unit(self, u: float) -> float:
+        """Map a [0, 1] coordinate back to a value"""
+        u = min(max(u, 0.0), 1.0)
+        if self.log:
+            value = math.exp(math.log(self.low) + u * (math.log(self.high) - math.log(self.low)))
+        else:
+            value = self.low + u * (self.high - self.low)
+        return int(round(value)) if self.integer else value
+
+
+# Concentration factors are capped at 50% of price by calculate_optimal_ranges,
+# so the factor bounds stop at 0.6
+DEFAULT_SPACE: List[Parameter] = [
+    Parameter("ULTRA_LOW_THRESHOLD", 0.25, 4.0, log=True),
+    Parameter("LOW_THRESHOLD", 0.5, 8.0, log=True),
+    Parameter("MEDIUM_THRESHOLD", 1.0, 16.0, log=True),
+    Parameter("HIGH_THRESHOLD", 2.0, 32.0, log=True),
+    Parameter("ULTRA_LOW_FACTOR", 0.002, 0.6, log=True),
+    Parameter("LOW_FACTOR", 0.002, 0.6, log=True),
+    Parameter("MEDIUM_FACTOR", 0.005, 0.6, log=True),
+    Parameter("HIGH_FACTOR", 0.01, 0.6, log=True),
+    Parameter("EXTREME_FACTOR", 0.01, 0.6, log=True),
+    Parameter("ULTRA_LOW_RANGES", 1, 8, integer=True),
+    Parameter("LOW_RANGES", 1, 8, integer=True),
+    Parameter("MEDIUM_RANGES", 1, 8, integer=True),
+    Parameter("HIGH_RANGES", 1, 8, integer=True),
+    Parameter("EXTREME_RANGES", 1, 8, integer=True),
+    Parameter("EFFICIENCY_TRIGGER", 10.0, 95.0),
+    Parameter("VOLATILITY_CHANGE_TRIGGER", 0.1, 10.0, log=True),
+    Parameter("MAX_REBALANCE_INTERVAL", 300, 86400, integer=True, log=True),
+]
+
+
+@dataclass
+class SweepResult:
+    """Metrics of one evaluated parameter set"""
+    key: str
+    params: Dict[str, Any]
+    fee_apr: float
+    rebalance_cost_apr: float     # BacktestResult.rebalance_cost_apr
+    fees_earned: float
+    impermanent_loss: float
+    realized_impermanent_loss: float
+    gas_spent: float
+    rebalance_count: int
+    rejected_rebalances: int
+    time_in_range: float
+    net_pnl: float
+    elapsed_seconds: float
+    
+    @property
+    def net_apr(self) -> float:
+        """Fee APR net of rebalance cost"""
+        return self.fee_apr - self.rebalance_cost_apr
+    
+    @classmethod
+    def from_backtest(cls, key: str, params: Dict[str, Any], result: BacktestResult, elapsed: float) -> 'SweepResult':
+        return cls(
+            key=key,
+            params=params,
+            fee_apr=result.fee_apr,
+            rebalance_cost_apr=result.rebalance_cost_apr,
+            fees_earned=result.fees_earned,
+            impermanent_loss=result.impermanent_loss,
+            realized_impermanent_loss=result.realized_impermanent_loss,
+            gas_spent=result.gas_spent,
+            rebalance_count=result.rebalance_count,
+            rejected_rebalances=result.rejected_rebalances,
+            time_in_range=result.time_in_range,
+            net_pnl=result.net_pnl,
+            elapsed_seconds=elapsed
+        )
+
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Canonical form of a parameter set
+    
+    Regime thresholds are sorted so equivalent decision trees hash alike.
+    """
+    params = dict(params)
+    present = [name for name in THRESHOLD_NAMES if name in params]
+    for name, value in zip(present, sorted(params[name] for name in present)):
+        params[name] = value
+    return params
+
+
+def pareto_front(results: Iterable[SweepResult]) -> List[SweepResult]:
+    """
+    Results not dominated on (higher fee APR, lower rebalance cost)
+    
+    Returns:
+        Front ordered by increasing rebalance cost
+    """
+    ordered = sorted(results, key=lambda r: (r.rebalance_cost_apr, -r.fee_apr))
+    front = []
+    best_apr = -math.inf
+    for result in ordered:
+        if result.fee_apr > best_apr:
+            front.append(result)
+            best_apr = result.fee_apr
+    return front
+
+
+class SweepCache:
+    """Append-only JSON-lines store of SweepResults keyed by parameter hash"""
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.results: Dict[str, SweepResult] = {}
+        
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                        self.results[record["key"]] = SweepResult(**record)
+                    except (ValueError, KeyError, TypeError):
+                        continue    # Torn write from an interrupted sweep
+    
+    def get(self, key: str) -> Optional[SweepResult]:
+        return self.results.get(key)
+    
+    def put(self, result: SweepResult):
+        self.results[result.key] = result
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(asdict(result), sort_keys=True) + "\n")
+
+
+# Worker process state, set once by _init_worker
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(shm_name: str, length: int, has_volumes: bool, config: Dict[str, Any]):
+    """Attach the shared price (and volume) series in a worker process"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    series = np.ndarray((2 if has_volumes else 1, length), dtype=np.float64, buffer=shm.buf)
+    _worker_state["shm"] = shm
+    _worker_state["prices"] = series[0]
+    _worker_state["volumes"] = series[1] if has_volumes else None
+    _worker_state["config"] = BacktestConfig(**config)
+
+
+def _run_backtest(
+    params: Dict[str, Any],
+    prices: np.ndarray,
+    volumes: Optional[np.ndarray],
+    config: BacktestConfig
+) -> BacktestResult:
+    engine = RebalancingEngine()
+    for name, value in params.items():
+        if not hasattr(engine, name):
+            raise ValueError(f"Unknown RebalancingEngine parameter: {name}")
+        setattr(engine, name, value)
+    return Backtester(engine, config).run(prices, volumes)
+
+
+def _evaluate_in_worker(key: str, params: Dict[str, Any]) -> SweepResult:
+    start_time = time.time()
+    result = _run_backtest(params, _worker_state["prices"], _worker_state["volumes"], _worker_state["config"])
+    return SweepResult.from_backtest(key, params, result, time.time() - start_time)
+
+
+class ParameterSweep:
+    """
+    Evaluates RebalancingEngine parameter sets by backtesting them in parallel
+    
+    Usage:
+        with ParameterSweep(prices, cache_path="sweep.jsonl") as sweep:
+            results = sweep.optimize(200)
+            front = pareto_front(results)
+    """
+    
+    def __init__(
+        self,
+        prices: Sequence[float],
+        volumes: Optional[Sequence[float]] = None,
+        config: Optional[BacktestConfig] = None,
+        space: Optional[List[Parameter]] = None,
+        cache_path: Optional[str] = None,
+        workers: Optional[int] = None,
+        objective: Optional[Callable[[SweepResult], float]] = None
+    ):
+        self.prices = np.ascontiguousarray(prices, dtype=np.float64)
+        self.volumes = None if volumes is None else np.ascontiguousarray(volumes, dtype=np.float64)
+        self.config = config or BacktestConfig()
+        self.space = space or DEFAULT_SPACE
+        self.cache = SweepCache(cache_path)
+        self.workers = workers or os.cpu_count() or 1
+        self.objective = objective or (lambda r: r.net_apr)
+        
+        # Cache keys cover the data and backtest config as well as the parameters
+        digest = hashlib.sha256(self.prices.tobytes())
+        if self.volumes is not None:
+            digest.update(self.volumes.tobytes())
+        self._context = {
+            "data": digest.hexdigest(),
+            "config": asdict(self.config)
+        }
+        
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {"evaluated": 0, "cache_hits": 0}
+    
+    def __enter__(self) -> 'ParameterSweep':
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        """Stop workers and release the shared price buffer"""
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+        if self._shm:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+    
+    def key(self, params: Dict[str, Any]) -> str:
+        """Cache key of a normalized parameter set"""
+        payload = json.dumps({"params": params, **self._context}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            has_volumes = self.volumes is not None
+            rows = 2 if has_volumes else 1
+            self._shm = shared_memory.SharedMemory(create=True, size=rows * self.prices.nbytes)
+            series = np.ndarray((rows, self.prices.size), dtype=np.float64, buffer=self._shm.buf)
+            series[0] = self.prices
+            if has_volumes:
+                series[1] = self.volumes
+            
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self._shm.name, self.prices.size, has_volumes, asdict(self.config))
+            )
+        return self._executor
+    
+    def _submit(self, params: Dict[str, Any]) -> Future:
+        """Evaluate one normalized parameter set (inline when running single-process)"""
+        key = self.key(params)
+        if self.workers <= 1:
+            future: Future = Future()
+            start_time = time.time()
+            result = _run_backtest(params, self.prices, self.volumes, self.config)
+            future.set_result(SweepResult.from_backtest(key, params, result, time.time() - start_time))
+            return future
+        return self._pool().submit(_evaluate_in_worker, key, params)
+    
+    def evaluate(self, param_sets: Iterable[Dict[str, Any]]) -> List[SweepResult]:
+        """
+        Evaluate parameter sets, reusing cached results
+        
+        Args:
+            param_sets: Parameter dicts (RebalancingEngine attribute -> value)
+        
+        Returns:
+            Results in input order (duplicates share one evaluation)
+        """
+        normalized = [normalize_params(p) for p in param_sets]
+        keys = [self.key(p) for p in normalized]
+        
+        pending: Dict[str, Future] = {}
+        for key, params in zip(keys, normalized):
+            if key in pending:
+                continue
+            if self.cache.get(key):
+                self.stats["cache_hits"] += 1
+                continue
+            pending[key] = self._submit(params)
+        
+        for future in pending.values():
+            result = future.result()
+            self.cache.put(result)
+            self.stats["evaluated"] += 1
+        
+        return [self.cache.get(key) for key in keys]
+    
+    def grid(self, values: Dict[str, Sequence[Any]]) -> List[SweepResult]:
+        """
+        Evaluate the cartesian product of per-parameter value lists
+        
+        Args:
+            values: Attribute name -> candidate values
+        """
+        names = list(values)
+        return self.evaluate(dict(zip(names, combo)) for combo in itertools.product(*values.values()))
+    
+    def random_search(self, n_trials: int, seed: int = 0) -> List[SweepResult]:
+        """Evaluate uniformly sampled points of the search space"""
+        rng = np.random.default_rng(seed)
+        return self.evaluate(self._from_unit(rng.random(len(self.space))) for _ in range(n_trials))
+    
+    def optimize(self, n_trials: int, n_startup: Optional[int] = None, seed: int = 0) -> List[SweepResult]:
+        """
+        TPE-style search maximizing the objective
+        
+        Keeps every worker busy: each time a backtest finishes, a new point is
+        proposed from all results so far (cached results count as history).
+        
+        Args:
+            n_trials: New points to propose
+            n_startup: Random points before model-based proposals
+            seed: RNG seed
+        
+        Returns:
+            All results of this run (cache hits included), in completion order
+        """
+        rng = np.random.default_rng(seed)
+        n_startup = max(1, self.workers if n_startup is None else n_startup)
+        
+        history = [
+            result for result in self.cache.results.values()
+            if result.key == self.key(normalize_params(result.params))
+        ]
+        results: List[SweepResult] = []
+        pending: Dict[Future, str] = {}
+        proposed = 0
+        
+        while proposed < n_trials or pending:
+            # Fill free workers with new proposals
+            while proposed < n_trials and len(pending) < self.workers:
+                proposed += 1
+                if len(history) < n_startup:
+                    unit = rng.random(len(self.space))
+                else:
+                    unit = self._propose(history, rng)
+                params = normalize_params(self._from_unit(unit))
+                key = self.key(params)
+                
+                cached = self.cache.get(key)
+                if cached:
+                    self.stats["cache_hits"] += 1
+                    results.append(cached)
+                    continue
+                if key in pending.values():
+                    continue
+                pending[self._submit(params)] = key
+            
+            if not pending:
+                continue
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                result = future.result()
+                self.cache.put(result)
+                self.stats["evaluated"] += 1
+                history.append(result)
+                results.append(result)
+        
+        return results
+    
+    def _from_unit(self, unit: np.ndarray) -> Dict[str, Any]:
+        return {p.name: p.from_unit(float(u)) for p, u in zip(self.space, unit)}
+    
+    def _to_unit(self, params: Dict[str, Any]) -> np.ndarray:
+        engine = RebalancingEngine()
+        return np.array([
+            min(max(p.to_unit(params.get(p.name, getattr(engine, p.name))), 0.0), 1.0) for p in self.space
+        ])
+    
+    def _propose(self, history: List[SweepResult], rng: np.random.Generator) -> np.ndarray:
+        """
+        Next point from Parzen estimators of good vs bad results
+        
+        Candidates are drawn around good observations and the one maximizing
+        l(x) / g(x) is returned (densities are per-dimension Gaussian kernels
+        mixed with a uniform prior).
+        """
+        points = np.array([self._to_unit(r.params) for r in history])
+        scores = np.array([self.objective(r) for r in history])
+        
+        order = np.argsort(-scores)
+        n_good = max(1, int(math.ceil(GOOD_FRACTION * len(history))))
+        good = points[order[:n_good]]
+        bad = points[order[n_good:]] if len(history) > n_good else points
+        
+        def bandwidth(observations: np.ndarray) -> np.ndarray:
+            spread = observations.std(axis=0) if len(observations) > 1 else np.full(observations.shape[1], 0.25)
+            return np.clip(spread * len(observations) ** -0.2, MIN_BANDWIDTH, MAX_BANDWIDTH)
+        
+        good_width = bandwidth(good)
+        bad_width = bandwidth(bad)
+        
+        # Sample around good points (occasionally from the prior)
+        centers = good[rng.integers(len(good), size=CANDIDATES_PER_PROPOSAL)]
+        candidates = np.clip(centers + rng.normal(size=centers.shape) * good_width, 0.0, 1.0)
+        from_prior = rng.random(CANDIDATES_PER_PROPOSAL) < 1 / (n_good + 1)
+        candidates[from_prior] = rng.random((int(from_prior.sum()), len(self.space)))
+        
+        def log_density(observations: np.ndarray, width: np.ndarray) -> np.ndarray:
+            # (candidates, observations, dims) kernel values, product over dims
+            z = (candidates[:, None, :] - observations[None, :, :]) / width
+            kernels = np.exp(-0.5 * z * z) / (width * math.sqrt(2 * math.pi))
+            prior_weight = 1 / (len(observations) + 1)
+            mixture = (1 - prior_weight) * kernels.mean(axis=1) + prior_weight
+            return np.log(mixture).sum(axis=1)
+        
+        score = log_density(good, good_width) - log_density(bad, bad_width)
+        return candidates[int(np.argmax(score))]
+
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Sweep RebalancingEngine parameters by backtesting")
+    parser.add_argument("--prices", help=".npy file of 1-second prices (default: 7 days of synthetic GBM)")
+    parser.add_argument("--trials", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default="parameter_sweep.jsonl")
+    parser.add_argument("--oracle-interval", type=int, default=60)
+    args = parser.parse_args()
+    
+    if args.prices:
+        prices = np.load(args.prices)
+    else:
+        rng = np.random.default_rng(42)
+        prices = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.0002, 7 * 24 * 3600)))
+    
+    config = BacktestConfig(oracle_interval_steps=args.oracle_interval)
+    
+    start_time = time.time()
+    with ParameterSweep(prices, config=config, cache_path=args.cache, workers=args.workers) as sweep:
+        baseline = sweep.evaluate([{}])[0]
+        results = sweep.optimize(args.trials)
+        stats = sweep.stats
+    elapsed = time.time() - start_time
+    
+    print(f"=== Parameter Sweep ({len(prices)} steps, {stats['evaluated']} evaluated, "
+          f"{stats['cache_hits']} cached, {elapsed:.1f}s) ===")
+    print(f"Baseline: fee APR {baseline.fee_apr:.2%}, rebalance cost {baseline.rebalance_cost_apr:.2%}, "
+          f"{baseline.rebalance_count} rebalances")
+    
+    print("Pareto front (fee APR vs rebalance cost):")
+    for result in pareto_front(results + [baseline]):
+        print(f"  fee APR {result.fee_apr:8.2%}  cost {result.rebalance_cost_apr:8.2%}  "
+              f"net {result.net_apr:8.2%}  rebalances {result.rebalance_count}")
@@ -0,0 +1,339 @@
+"""
+Seltra Rebalance Planner
+Turns a rebalance into the smallest set of per-range operations
+
+Deployed ranges live in fixed slots (RebalancingState RangeArray). Instead
+of replacing every slot, the planner matches current and target ranges
+(both sorted by price) with an order-preserving alignment that minimizes
+estimated cost:
+- Ranges within tolerance of their target are left untouched
+- Matched ranges that moved become SHIFT operations (rewrite one slot)
+- Unmatched current ranges are REMOVEd, unmatched targets are ADDed
+- A range left untouched that would overlap a moved neighbour is SHIFTed
+  to its exact target, since commit_ranges rejects overlapping ranges
+
+Operations are packed into atomic groups of at most MAX_GROUP_SIZE
+transactions, each ending with a commit_ranges call that validates the
+result on chain.
+"""
+
+from enum import Enum
+from typing import TYPE_CHECKING, List, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass
+
+if TYPE_CHECKING:
+    # backend_service imports this module; Range is only needed for annotations
+    from backend_service import Range
+
+
+# Algorand atomic group limit
+MAX_GROUP_SIZE = 16
+
+# Slots in RebalancingState.current_ranges
+MAX_SLOTS = 6
+
+# A range counts as unchanged when bounds move less than this fraction of
+# price and liquidity less than this fraction of its liquidity
+DEFAULT_PRICE_TOLERANCE = 0.0005
+DEFAULT_LIQUIDITY_TOLERANCE = 0.001
+
+# Cost model (quote units): pool fee paid on liquidity moved between ranges,
+# and the fee of one transaction
+DEFAULT_SLIPPAGE_RATE = 0.003
+DEFAULT_TXN_FEE = 0.001
+
+
+class OperationType(Enum):
+    """Per-slot rebalance operation"""
+    REMOVE = "remove"
+    ADD = "add"
+    SHIFT = "shift"
+
+
+@dataclass
+class RangeOperation:
+    """One slot write"""
+    op: OperationType
+    slot: int
+    old: Optional['Range']
+    new: Optional['Range']
+    moved_liquidity: float     # Liquidity withdrawn/redeposited by this operation
+
+
+@dataclass
+class PlanCost:
+    """Estimated cost of executing a plan"""
+    transactions: int
+    groups: int
+    fees: float
+    slippage: float
+    
+    @property
+    def total(self) -> float:
+        return self.fees + self.slippage
+
+
+@dataclass
+class RebalancePlan:
+    """Operations, their atomic groups and the resulting slot layout"""
+    operations: List[RangeOperation]
+    groups: List[List[RangeOperation]]
+    cost: PlanCost
+    full_replace_cost: PlanCost       # Cost of replacing every range, for comparison
+    final_slots: List[Optional['Range']]
+    
+    @property
+    def is_noop(self) -> bool:
+        return not self.operations
+    
+    @property
+    def final_ranges(self) -> List['Range']:
+        """Active ranges after the plan, in price order"""
+        return sorted((r for r in self.final_slots if r is not None), key=lambda r: r.lower)
+
+
+class RebalancePlanner:
+    """Plans minimal-diff rebalances between slot layouts"""
+    
+    def __init__(
+        self,
+        price_tolerance: float = DEFAULT_PRICE_TOLERANCE,
+        liquidity_tolerance: float = DEFAULT_LIQUIDITY_TOLERANCE,
+        slippage_rate: float = DEFAULT_SLIPPAGE_RATE,
+        txn_fee: float = DEFAULT_TXN_FEE,
+        max_slots: int = MAX_SLOTS,
+        max_group_size: int = MAX_GROUP_SIZE
+    ):
+        self.price_tolerance = price_tolerance
+        self.liquidity_tolerance = liquidity_tolerance
+        self.slippage_rate = slippage_rate
+        self.txn_fee = txn_fee
+        self.max_slots = max_slots
+        self.max_group_size = max_group_size
+    
+    def plan(self, current_slots: Sequence[Optional['Range']], target: Sequence['Range']) -> RebalancePlan:
+        """
+        Plan the cheapest operations that reach the target within tolerance
+        
+        Args:
+            current_slots: Deployed ranges by slot (None = empty slot); a plain
+                list of ranges is taken as occupying slots 0..n-1
+            target: Target ranges
+        
+        Returns:
+            RebalancePlan
+        
+        Raises:
+            ValueError: If the layout does not fit or the target ranges overlap
+        """
+        slots: List[Optional['Range']] = list(current_slots) + [None] * (self.max_slots - len(current_slots))
+        if len(slots) > self.max_slots:
+            raise ValueError(f"At most {self.max_slots} slots, got {len(slots)}")
+        
+        target = sorted((r for r in target if r.liquidity > 0), key=lambda r: r.lower)
+        if len(target) > self.max_slots:
+            raise ValueError(f"At most {self.max_slots} ranges fit on chain, got {len(target)}")
+        
+        current = sorted(
+            ((slot, r) for slot, r in enumerate(slots) if r is not None), key=lambda item: item[1].lower
+        )
+        
+        removes, shifts, adds, kept = self._align(current, target)
+        
+        # A range kept within tolerance of its target can still overlap a
+        # neighbour that moved; rewrite such ranges to their exact target
+        while True:
+            final_slots = self._layout(slots, removes, shifts, adds)
+            conflicts = self._overlapping_slots(final_slots)
+            if not conflicts:
+                break
+            promoted = [operation for operation in kept if operation.slot in conflicts]
+            if not promoted:
+                raise ValueError(f"Target ranges overlap in slots {sorted(conflicts)}")
+            for operation in promoted:
+                operation.op = OperationType.SHIFT
+                operation.moved_liquidity = self._moved_liquidity(operation.old, operation.new)
+                shifts.append(operation)
+                kept.remove(operation)
+            shifts.sort(key=lambda operation: operation.new.lower)
+        
+        # Removes first, so adds never overlap a range that is going away
+        operations = removes + shifts + adds
+        groups = self._pack(operations)
+        
+        full_replace = [
+            RangeOperation(OperationType.REMOVE, slot, r, None, r.liquidity) for slot, r in current
+        ] + [
+            RangeOperation(OperationType.ADD, 0, None, r, r.liquidity) for r in target
+        ]
+        
+        return RebalancePlan(
+            operations=operations,
+            groups=groups,
+            cost=self._cost(operations, groups),
+            full_replace_cost=self._cost(full_replace, self._pack(full_replace)),
+            final_slots=final_slots
+        )
+    
+    def _layout(
+        self,
+        slots: List[Optional['Range']],
+        removes: List[RangeOperation],
+        shifts: List[RangeOperation],
+        adds: List[RangeOperation]
+    ) -> List[Optional['Range']]:
+        """Slot layout after the operations; adds take slots freed by removes first, then empty ones"""
+        final_slots = list(slots)
+        for operation in removes:
+            final_slots[operation.slot] = None
+        for operation in shifts:
+            final_slots[operation.slot] = operation.new
+        free_slots = [slot for slot, r in enumerate(final_slots) if r is None]
+        for operation, slot in zip(adds, free_slots):
+            operation.slot = slot
+            final_slots[slot] = operation.new
+        return final_slots
+    
+    def _overlapping_slots(self, final_slots: List[Optional['Range']]) -> Set[int]:
+        """Slots whose range overlaps another one (touching bounds are fine, as on chain)"""
+        occupied = sorted(
+            ((slot, r) for slot, r in enumerate(final_slots) if r is not None), key=lambda item: item[1].lower
+        )
+        conflicts: Set[int] = set()
+        for i, (slot, r) in enumerate(occupied):
+            for other_slot, other in occupied[i + 1:]:
+                if other.lower >= r.upper:
+                    break
+                conflicts.update((slot, other_slot))
+        return conflicts
+    
+    def _align(
+        self,
+        current: List[Tuple[int, 'Range']],
+        target: List['Range']
+    ) -> Tuple[List[RangeOperation], List[RangeOperation], List[RangeOperation], List[RangeOperation]]:
+        """
+        Order-preserving min-cost alignment of current and target ranges
+        
+        Returns:
+            (removes, shifts, adds, kept); kept are matches within tolerance,
+            as SHIFT candidates that are not executed
+        """
+        m, n = len(current), len(target)
+        remove_cost = [self._operation_cost(r.liquidity) for _, r in current]
+        add_cost = [self._operation_cost(r.liquidity) for r in target]
+        
+        # cost[i][j]: cheapest way to turn current[:i] into target[:j]
+        cost = [[0.0] * (n + 1) for _ in range(m + 1)]
+        move = [[""] * (n + 1) for _ in range(m + 1)]
+        for i in range(1, m + 1):
+            cost[i][0] = cost[i - 1][0] + remove_cost[i - 1]
+            move[i][0] = "remove"
+        for j in range(1, n + 1):
+            cost[0][j] = cost[0][j - 1] + add_cost[j - 1]
+            move[0][j] = "add"
+        
+        for i in range(1, m + 1):
+            for j in range(1, n + 1):
+                old, new = current[i - 1][1], target[j - 1]
+                if self._within_tolerance(old, new):
+                    match_cost = 0.0
+                else:
+                    match_cost = self._operation_cost(self._moved_liquidity(old, new))
+                
+                cost[i][j], move[i][j] = min(
+                    (cost[i - 1][j - 1] + match_cost, "match"),
+                    (cost[i - 1][j] + remove_cost[i - 1], "remove"),
+                    (cost[i][j - 1] + add_cost[j - 1], "add"),
+                    key=lambda option: option[0]
+                )
+        
+        removes: List[RangeOperation] = []
+        shifts: List[RangeOperation] = []
+        adds: List[RangeOperation] = []
+        kept: List[RangeOperation] = []
+        i, j = m, n
+        while i > 0 or j > 0:
+            step = move[i][j]
+            if step == "match":
+                slot, old = current[i - 1]
+                new = target[j - 1]
+                if self._within_tolerance(old, new):
+                    kept.append(RangeOperation(OperationType.SHIFT, slot, old, new, 0.0))
+                else:
+                    shifts.append(RangeOperation(
+                        OperationType.SHIFT, slot, old, new, self._moved_liquidity(old, new)
+                    ))
+                i, j = i - 1, j - 1
+            elif step == "remove":
+                slot, old = current[i - 1]
+                removes.append(RangeOperation(OperationType.REMOVE, slot, old, None, old.liquidity))
+                i -= 1
+            else:
+                new = target[j - 1]
+                adds.append(RangeOperation(OperationType.ADD, -1, None, new, new.liquidity))
+                j -= 1
+        
+        return removes[::-1], shifts[::-1], adds[::-1], kept[::-1]
+    
+    def _within_tolerance(self, old: 'Range', new: 'Range') -> bool:
+        return (
+            abs(old.lower - new.lower) <= self.price_tolerance * old.lower
+            and abs(old.upper - new.upper) <= self.price_tolerance * old.upper
+            and abs(old.liquidity - new.liquidity) <= self.liquidity_tolerance * old.liquidity
+        )
+    
+    def _moved_liquidity(self, old: 'Range', new: 'Range') -> float:
+        """
+        Liquidity that has to leave or enter the pool to turn old into new
+        
+        Liquidity spread over the price overlap of both ranges stays put.
+        """
+        overlap = max(0.0, min(old.upper, new.upper) - max(old.lower, new.lower))
+        staying = min(
+            old.liquidity * overlap / (old.upper - old.lower),
+            new.liquidity * overlap / (new.upper - new.lower)
+        )
+        return max(old.liquidity, new.liquidity) - staying
+    
+    def _operation_cost(self, moved_liquidity: float) -> float:
+        return self.txn_fee + self.slippage_rate * moved_liquidity
+    
+    def _pack(self, operations: List[RangeOperation]) -> List[List[RangeOperation]]:
+        """Split operations, in order, into groups leaving room for commit_ranges"""
+        per_group = self.max_group_size - 1
+        return [operations[i:i + per_group] for i in range(0, len(operations), per_group)]
+    
+    def _cost(self, operations: List[RangeOperation], groups: List[List[RangeOperation]]) -> PlanCost:
+        transactions = len(operations) + len(groups)    # One commit per group
+        return PlanCost(
+            transactions=transactions,
+            groups=len(groups),
+            fees=transactions * self.txn_fee,
+            slippage=sum(self.slippage_rate * operation.moved_liquidity for operation in operations)
+        )
+
+
+if __name__ == "__main__":
+    from backend_service import Range
+    
+    planner = RebalancePlanner()
+    
+    current = [
+        Range(90.0, 95.0, 200000.0),
+        Range(95.0, 100.0, 300000.0),
+        Range(100.0, 105.0, 300000.0),
+        Range(105.0, 110.0, 200000.0),
+    ]
+    
+    # Only the top boundary moved
+    target = current[:3] + [Range(105.0, 112.0, 200000.0)]
+    
+    plan = planner.plan(current, target)
+    print("=== Rebalance Plan ===")
+    for operation in plan.operations:
+        print(f"  {operation.op.value} slot {operation.slot}: {operation.old} -> {operation.new}")
+    print(f"Cost: {plan.cost.transactions} txns in {plan.cost.groups} group(s), "
+          f"fees {plan.cost.fees:.4f}, slippage {plan.cost.slippage:.2f}")
+    print(f"Full replace: {plan.full_replace_cost.transactions} txns, "
+          f"fees {plan.full_replace_cost.fees:.4f}, slippage {plan.full_replace_cost.slippage:.2f}")
@@ -9,13 +9,19 @@ This is a stripped-down version that:
 - Relies on off-chain backend for complex calculations
 """
 
+import typing
+
 from algopy import (
     ARC4Contract,
+    Box,
     Global,
     UInt64,
     Bytes,
     arc4,
+    gtxn,
+    op,
     subroutine,
+    urange,
 )
 from algopy.arc4 import abimethod
 
@@ -23,6 +29,15 @@ from algopy.arc4 import abimethod
 # Constants
 DEFAULT_COOLDOWN = 300  # 5 minutes between rebalances (seconds)
 
+# Fixed-width range encoding: 6 slots of (lower, upper, liquidity) uint64 triples.
+# Prices are scaled by 1e9, liquidity by 1e6; unused slots are all zero and
+# active slots must not overlap.
+MAX_RANGES = 6
+RANGE_SLOT_BYTES = 3 * 8
+RANGE_ARRAY_BYTES = MAX_RANGES * RANGE_SLOT_BYTES
+RangeBounds = arc4.StaticArray[arc4.UInt64, typing.Literal[3]]
+RangeArray = arc4.StaticArray[RangeBounds, typing.Literal[6]]
+
 
 class RebalancingState(ARC4Contract):
     """
@@ -49,8 +64,10 @@ class RebalancingState(ARC4Contract):
         self.total_rebalances = UInt64(0)
         self.successful_rebalances = UInt64(0)
         
-        # Current ranges (stored as simple string)
-        self.current_ranges = arc4.String("")
+        # Current ranges (144 bytes exceeds a global state value, so they live
+        # in a box; the app account must hold its minimum balance and callers
+        # must reference box b"ranges")
+        self.current_ranges = Box(RangeArray, key=b"ranges")
 
     @abimethod()
     def initialize_engine(
@@ -97,21 +114,19 @@ class RebalancingState(ARC4Contract):
     @abimethod()
     def update_ranges_from_backend(
         self,
-        new_ranges_json: arc4.String
+        new_ranges: RangeArray
     ) -> arc4.String:
         """
         Update ranges from off-chain backend calculation
         
         Args:
-            new_ranges_json: New ranges in JSON format from backend
+            new_ranges: New ranges in the fixed-width encoding
         """
         assert self.is_initialized, "Engine not initialized"
-        
-        # Simple validation - just check it's not empty
-        assert len(new_ranges_json.native) > 0, "Empty ranges not allowed"
+        assert self._validate_ranges(new_ranges), "Invalid ranges"
         
         # Update current ranges
-        self.current_ranges = new_ranges_json
+        self.current_ranges.value = new_ranges.copy()
         
         return arc4.String("Ranges updated from backend")
 
@@ -119,16 +134,16 @@ class RebalancingState(ARC4Contract):
     def execute_rebalance(
         self,
         pool_address: Bytes,
-        old_ranges_json: arc4.String,
-        new_ranges_json: arc4.String
+        old_ranges: RangeArray,
+        new_ranges: RangeArray
     ) -> arc4.String:
         """
         Execute rebalancing operation (simplified version)
         
         Args:
             pool_address: Target pool contract address
-            old_ranges_json: Current ranges to close
-            new_ranges_json: New ranges to create
+            old_ranges: Current ranges to close (must match stored ranges)
+            new_ranges: New ranges to create
             
         Returns:
             Execution result
@@ -141,18 +156,94 @@ class RebalancingState(ARC4Contract):
         if current_time - self.last_rebalance_time < self.rebalance_cooldown:
             return arc4.String("REBALANCE_COOLDOWN_ACTIVE")
         
-        # Simple validation - just check ranges are not empty
-        if len(new_ranges_json.native) == 0:
-            return arc4.String("EXECUTION_FAILED: Empty new ranges")
+        if old_ranges.bytes != self._stored_ranges().bytes:
+            return arc4.String("EXECUTION_FAILED: Stale old ranges")
+        
+        if not self._validate_ranges(new_ranges):
+            return arc4.String("EXECUTION_FAILED: Invalid new ranges")
         
         # Update ranges and tracking
-        self.current_ranges = new_ranges_json
+        self.current_ranges.value = new_ranges.copy()
         self.last_rebalance_time = current_time
         self.total_rebalances += UInt64(1)
         self.successful_rebalances += UInt64(1)
         
         return arc4.String("REBALANCE_EXECUTED_SUCCESSFULLY")
 
+    @abimethod()
+    def update_range(
+        self,
+        slot: UInt64,
+        bounds: RangeBounds
+    ) -> arc4.String:
+        """
+        Overwrite one range slot (all zeros removes it)
+        
+        Slot writes are unvalidated on their own, so they are only accepted
+        inside a group whose last transaction is commit_ranges on this app.
+        
+        Args:
+            slot: Slot index (0-5)
+            bounds: (lower, upper, liquidity) in the fixed-width encoding
+        """
+        assert self.is_initialized, "Engine not initialized"
+        assert slot < UInt64(MAX_RANGES), "Invalid slot"
+        
+        commit = gtxn.ApplicationCallTransaction(Global.group_size - UInt64(1))
+        assert commit.app_id == Global.current_application_id, "Group must end with commit_ranges"
+        assert commit.app_args(0) == arc4.arc4_signature("commit_ranges()string"), "Group must end with commit_ranges"
+        
+        _stored, exists = self.current_ranges.maybe()
+        if not exists:
+            self.current_ranges.value = self._stored_ranges()
+        self.current_ranges.replace(slot * UInt64(RANGE_SLOT_BYTES), bounds.bytes)
+        
+        return arc4.String("Range slot updated")
+    
+    @abimethod()
+    def commit_ranges(self) -> arc4.String:
+        """Validate the ranges after a group of update_range writes"""
+        assert self.is_initialized, "Engine not initialized"
+        assert self._validate_ranges(self._stored_ranges()), "Invalid ranges"
+        
+        return arc4.String("Ranges committed")
+    
+    @subroutine
+    def _stored_ranges(self) -> RangeArray:
+        """Stored ranges, all-zero before the first update"""
+        return self.current_ranges.get(default=RangeArray.from_bytes(op.bzero(RANGE_ARRAY_BYTES)))
+    
+    @subroutine
+    def _validate_ranges(self, ranges: RangeArray) -> bool:
+        """
+        Check the fixed-width encoding: at least one active range, each with
+        0 < lower < upper and liquidity > 0, no two active ranges overlapping,
+        and unused slots all zero
+        """
+        active = UInt64(0)
+        
+        for i in urange(MAX_RANGES):
+            lower = ranges[i][0].native
+            upper = ranges[i][1].native
+            liquidity = ranges[i][2].native
+            
+            if liquidity == UInt64(0):
+                if lower != UInt64(0) or upper != UInt64(0):
+                    return False
+                continue
+            
+            if lower == UInt64(0) or lower >= upper:
+                return False
+            
+            for j in urange(i + UInt64(1), UInt64(MAX_RANGES)):
+                if ranges[j][2].native != UInt64(0):
+                    if lower < ranges[j][1].native and ranges[j][0].native < upper:
+                        return False  # Overlap
+            
+            active += UInt64(1)
+        
+        return active > UInt64(0)
+    
     @abimethod()
     def get_engine_status(self) -> arc4.String:
         """Get comprehensive engine status"""
@@ -182,10 +273,10 @@ class RebalancingState(ARC4Contract):
         return arc4.String(params)
 
     @abimethod()
-    def get_current_ranges(self) -> arc4.String:
-        """Get current ranges configuration"""
+    def get_current_ranges(self) -> RangeArray:
+        """Get current ranges configuration (fixed-width encoding)"""
         assert self.is_initialized, "Engine not initialized"
-        return self.current_ranges
+        return self._stored_ranges()
 
     @abimethod()
     def get_last_rebalance_time(self) -> UInt64:
@@ -1,6 +1,9 @@
 import { useState, useEffect, useCallback } from 'react'
 import { simulationAPI } from '../services/api'
 
+const HISTORY_WINDOW = 50
+const RESULTS_WINDOW = 20
+
 export const useSimulationData = () => {
   const [connectionStatus, setConnectionStatus] = useState({
     market_active: false,
@@ -70,7 +73,7 @@ export const useSimulationData = () => {
   // Fetch price history
   const fetchPriceHistory = useCallback(async () => {
     try {
-      const historyData = await simulationAPI.getPriceHistory(50)
+      const historyData = await simulationAPI.getPriceHistory(HISTORY_WINDOW)
       setMarketData(prev => ({
         ...prev,
         price_history: historyData.history
@@ -106,6 +109,51 @@ export const useSimulationData = () => {
     }
   }, [])
 
+  // Apply pushed events instead of polling status and history
+  const handleTick = useCallback((event) => {
+    const tick = JSON.parse(event.data).data
+    setMarketData(prev => ({
+      ...prev,
+      current_price: tick.price,
+      current_volatility: tick.volatility,
+      price_history: [...prev.price_history, tick].slice(-HISTORY_WINDOW)
+    }))
+    // A tick means the market simulator is live
+    setConnectionStatus(prev => ({ ...prev, market_active: true, current_price: tick.price }))
+  }, [])
+
+  const handleMetrics = useCallback((event) => {
+    const { metrics } = JSON.parse(event.data).data
+    if (metrics.market) {
+      const { scenario, regime, uptime_seconds, current_volatility } = metrics.market
+      setMarketData(prev => ({
+        ...prev,
+        ...(scenario !== undefined && { scenario }),
+        ...(regime !== undefined && { regime }),
+        ...(uptime_seconds !== undefined && { uptime_seconds }),
+        ...(current_volatility !== undefined && { current_volatility })
+      }))
+    }
+    if (metrics.blockchain) {
+      const { is_running, ...blockchain } = metrics.blockchain
+      const { active_wallets } = blockchain
+      setBlockchainData(prev => ({ ...prev, ...blockchain }))
+      setConnectionStatus(prev => ({
+        ...prev,
+        ...(is_running !== undefined && { blockchain_active: is_running }),
+        ...(active_wallets !== undefined && { total_wallets: active_wallets })
+      }))
+    }
+  }, [])
+
+  const handleTransaction = useCallback((event) => {
+    const result = JSON.parse(event.data).data
+    setBlockchainData(prev => ({
+      ...prev,
+      recent_results: [result, ...(prev.recent_results || [])].slice(0, RESULTS_WINDOW)
+    }))
+  }, [])
+
   // Control methods
   const triggerScenario = useCallback(async (scenarioName) => {
     try {
@@ -145,25 +193,39 @@ export const useSimulationData = () => {
 
   // Set up polling intervals
   useEffect(() => {
-    // Initial fetch
-    fetchStatus()
+    // Initial fetch (status is fetched whenever the stream (re)connects)
     fetchPriceHistory()
     fetchWallets()
     fetchPendingTransactions()
 
-    // Set up intervals - optimized for performance
-    const statusInterval = setInterval(fetchStatus, 3000) // Every 3 seconds
-    const historyInterval = setInterval(fetchPriceHistory, 2000) // Every 2 seconds for charts
+    // Ticks, metrics and transaction results are pushed; snapshots are
+    // re-fetched only when the server says the resume gap was lost
+    const stream = simulationAPI.openStream()
+    stream.addEventListener('tick', handleTick)
+    stream.addEventListener('metrics', handleMetrics)
+    stream.addEventListener('transaction', handleTransaction)
+    stream.addEventListener('reset', () => {
+      fetchStatus()
+      fetchPriceHistory()
+    })
+    // The backend may still be starting when the page loads; refresh the
+    // connection status on every (re)connect instead of only on mount
+    stream.onopen = () => {
+      setError(null)
+      fetchStatus()
+    }
+    stream.onerror = () => setError('Stream disconnected, reconnecting...')
+
+    // Remaining polls - wallets and the pending queue are not streamed
     const walletInterval = setInterval(fetchWallets, 15000) // Every 15 seconds
     const txInterval = setInterval(fetchPendingTransactions, 4000) // Every 4 seconds
 
     return () => {
-      clearInterval(statusInterval)
-      clearInterval(historyInterval)
+      stream.close()
       clearInterval(walletInterval)
       clearInterval(txInterval)
     }
-  }, [fetchStatus, fetchPriceHistory, fetchWallets, fetchPendingTransactions])
+  }, [fetchStatus, fetchPriceHistory, fetchWallets, fetchPendingTransactions, handleTick, handleMetrics, handleTransaction])
 
   return {
     connectionStatus,
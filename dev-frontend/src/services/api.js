@@ -70,6 +70,11 @@ export const simulationAPI = {
     return response.data
   },
 
+  simulateTrades: async (sizes, directions = 'buy') => {
+    const response = await api.post('/api/v1/trade/simulate-batch', { sizes, directions })
+    return response.data
+  },
+
   resetSimulation: async (initialPrice = null) => {
     const params = initialPrice ? `?initial_price=${initialPrice}` : ''
     const response = await api.post(`/api/v1/reset${params}`)
@@ -102,6 +107,12 @@ export const simulationAPI = {
     return response.data
   },
 
+  // Push stream (ticks, transaction results, metric deltas); the browser
+  // resumes from the last event id automatically on reconnect
+  openStream: (channels = ['tick', 'transaction', 'metrics']) => {
+    return new EventSource(`${API_BASE_URL}/api/v1/stream?channels=${channels.join(',')}`)
+  },
+
   // Demo scenarios
   triggerDemoScenario: async (scenarioName) => {
     const response = await api.post(`/api/v1/demo/scenario?scenario_name=${scenarioName}`)
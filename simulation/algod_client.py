@@ -0,0 +1,645 @@
+"""
+Async Algod Client
+
+Shared asyncio transport for the Algorand node REST API. Keeps a bounded pool
+of persistent HTTP/1.1 keep-alive connections, pipelines idempotent reads onto
+busy connections when the node supports it (never onto or behind a block
+long-poll), and applies per-endpoint timeouts.
+Exposes coroutine versions of the algosdk AlgodClient methods we use, and a
+BlockFollower that drives per-round work from the chain tip.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import ssl
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlencode, urlsplit
+
+from algosdk import constants, encoding, error
+from algosdk.transaction import SuggestedParams, Transaction
+
+from .telemetry import ALGOD_REQUEST_SECONDS
+
+logger = logging.getLogger(__name__)
+
+API_VERSION_PREFIX = "/v2"
+
+# Request timeouts in seconds, matched by longest path prefix
+DEFAULT_ENDPOINT_TIMEOUTS: Dict[str, float] = {
+    "/v2/status/wait-for-block-after": 65.0,  # Long-poll; algod answers within a minute
+    "/v2/status": 5.0,
+    "/v2/transactions/params": 5.0,
+    "/v2/transactions/pending": 5.0,
+    "/v2/transactions": 10.0,
+    "/v2/accounts": 5.0,
+    "/v2/applications": 5.0,
+    "/v2/assets": 5.0,
+}
+DEFAULT_TIMEOUT = 10.0
+CONNECT_TIMEOUT = 5.0
+
+# Requests held open by algod until something happens; they get a connection
+# of their own, since anything pipelined behind them would wait (and time out)
+LONG_POLL_PREFIXES = ("/v2/status/wait-for-block-after",)
+
+
+def endpoint_label(path: str) -> str:
+    """Collapse IDs, addresses and txids in a request path for metric labels."""
+    return "/".join(
+        ":id" if segment.isdigit() or len(segment) >= 26 else segment
+        for segment in path.split("?")[0].split("/")
+    )
+
+
+class ConnectionLost(ConnectionError):
+    """Connection dropped before the response was read (idempotent requests may retry)."""
+
+
+class AlgodConnection:
+    """
+    One persistent HTTP/1.1 connection to algod.
+    
+    Requests are written in order and their responses read back in the same
+    order, so several requests can be in flight at once (pipelining) once the
+    server has answered with a keep-alive HTTP/1.1 response.
+    """
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.in_flight = 0
+        self.closed = False
+        self.keep_alive_confirmed = False
+        self.long_poll = False          # Reserved by a long-poll; never pipelined
+        self.requests_served = 0
+        self._write_lock = asyncio.Lock()
+        self._read_tail: Optional[asyncio.Future] = None
+    
+    @property
+    def can_pipeline(self) -> bool:
+        """Whether more requests may be queued behind in-flight ones."""
+        return not self.closed and self.keep_alive_confirmed and not self.long_poll
+    
+    def close(self):
+        """Close the socket; queued requests fail with ConnectionLost."""
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+    
+    async def request(self, payload: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Write a request and read its response.
+        
+        Args:
+            payload: Fully encoded HTTP request
+        
+        Returns:
+            Tuple of (status, headers, body)
+        """
+        previous = self._read_tail
+        turn = asyncio.get_running_loop().create_future()
+        self._read_tail = turn
+        completed = False
+        
+        try:
+            async with self._write_lock:
+                if self.closed:
+                    raise ConnectionLost("connection closed")
+                self.writer.write(payload)
+                await self.writer.drain()
+            
+            # Responses arrive in request order; wait for earlier ones to be consumed
+            if previous is not None and not await asyncio.shield(previous):
+                raise ConnectionLost("pipelined request ahead of this one failed")
+            
+            response = await self._read_response()
+            completed = True
+            return response
+        
+        except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError) as e:
+            raise ConnectionLost(str(e)) from e
+        
+        finally:
+            # Any failure (including cancellation mid-read) leaves the stream out of sync
+            if not completed:
+                self.close()
+            turn.set_result(completed and not self.closed)
+    
+    async def _read_response(self) -> Tuple[int, Dict[str, str], bytes]:
+        """Read one HTTP/1.x response (Content-Length, chunked or close-delimited)."""
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionLost("connection closed by algod")
+        
+        parts = status_line.decode("latin-1").split(None, 2)
+        version, status = parts[0], int(parts[1])
+        
+        headers: Dict[str, str] = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n"):
+                break
+            if not line:
+                raise ConnectionLost("connection closed while reading headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            keep_alive = connection != "close"
+        else:
+            keep_alive = connection == "keep-alive"
+        
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            body = await self._read_chunked()
+        elif "content-length" in headers:
+            body = await self.reader.readexactly(int(headers["content-length"]))
+        elif status in (204, 304) or status < 200:
+            body = b""
+        else:
+            body = await self.reader.read()
+            keep_alive = False
+        
+        self.requests_served += 1
+        if keep_alive:
+            self.keep_alive_confirmed = version == "HTTP/1.1"
+        else:
+            self.close()
+        
+        return status, headers, body
+    
+    async def _read_chunked(self) -> bytes:
+        """Read a chunked transfer-encoded body."""
+        chunks = []
+        while True:
+            size_line = await self.reader.readline()
+            if not size_line:
+                raise ConnectionLost("connection closed while reading body")
+            size = int(size_line.split(b";")[0].strip(), 16)
+            if size == 0:
+                # Skip trailers
+                while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+
+class AsyncAlgodClient:
+    """
+    Async drop-in for the algosdk AlgodClient methods used by the simulator.
+    
+    One instance is meant to be shared by every component talking to the same
+    node so they all reuse the same warm connections.
+    """
+    
+    def __init__(
+        self,
+        algod_token: str,
+        algod_address: str,
+        headers: Optional[Dict[str, str]] = None,
+        pool_size: int = 8,
+        pipeline_depth: int = 4,
+        endpoint_timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = 1,
+        max_long_polls: Optional[int] = None
+    ):
+        """
+        Initialize the client.
+        
+        Args:
+            algod_token: Algod API token
+            algod_address: Algod base URL (http or https)
+            headers: Extra headers sent with every request
+            pool_size: Maximum number of open connections
+            pipeline_depth: Maximum in-flight requests per connection (1 disables pipelining)
+            endpoint_timeouts: Path prefix -> timeout overrides, merged with the defaults
+            default_timeout: Timeout for paths without a matching prefix
+            max_retries: Retries for idempotent requests whose connection dropped
+            max_long_polls: Connections long-polls may hold at once (default: half the pool),
+                so ordinary requests always keep the rest
+        """
+        url = urlsplit(algod_address)
+        
+        self.algod_token = algod_token
+        self.algod_address = algod_address
+        self.headers = headers or {}
+        self.pool_size = max(1, pool_size)
+        self.pipeline_depth = max(1, pipeline_depth)
+        self.default_timeout = default_timeout
+        self.max_retries = max_retries
+        self.max_long_polls = max_long_polls or max(1, self.pool_size // 2)
+        
+        self.endpoint_timeouts = dict(DEFAULT_ENDPOINT_TIMEOUTS)
+        self.endpoint_timeouts.update(endpoint_timeouts or {})
+        self._timeout_prefixes = sorted(self.endpoint_timeouts, key=len, reverse=True)
+        
+        self._host = url.hostname or "localhost"
+        self._port = url.port or (443 if url.scheme == "https" else 80)
+        self._ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self._host_header = url.netloc
+        self._base_path = url.path.rstrip("/")
+        
+        self._connections: List[AlgodConnection] = []
+        self._opening = 0
+        self._long_polls = 0            # Reserved by long-polls, including connections still opening
+        self._slot_freed = asyncio.Event()
+        
+        self.stats = {
+            "requests": 0,
+            "connections_opened": 0,
+            "pipelined": 0,
+            "long_polls": 0,
+            "retries": 0,
+            "timeouts": 0
+        }
+    
+    def timeout_for(self, path: str) -> float:
+        """Get the timeout for a request path (longest matching prefix)."""
+        for prefix in self._timeout_prefixes:
+            if path.startswith(prefix):
+                return self.endpoint_timeouts[prefix]
+        return self.default_timeout
+    
+    async def _acquire(self, pipelined: bool, long_poll: bool = False) -> AlgodConnection:
+        """
+        Reserve a connection: idle first, then a new one, then a pipelined slot.
+        
+        A long-poll only takes an idle or new connection and marks it so
+        nothing is pipelined behind it; at most max_long_polls are held.
+        """
+        while True:
+            self._connections = [c for c in self._connections if not c.closed]
+            
+            if long_poll and self._long_polls >= self.max_long_polls:
+                self._slot_freed.clear()
+                await self._slot_freed.wait()
+                continue
+            
+            for conn in self._connections:
+                if conn.in_flight == 0:
+                    conn.in_flight += 1
+                    conn.long_poll = long_poll
+                    self._long_polls += long_poll
+                    return conn
+            
+            if len(self._connections) + self._opening < self.pool_size:
+                # Count the reservation before awaiting the connect, so concurrent
+                # long-polls cannot all pass the limit check
+                self._long_polls += long_poll
+                try:
+                    conn = await self._open_connection()
+                except BaseException:
+                    self._long_polls -= long_poll
+                    raise
+                conn.long_poll = long_poll
+                return conn
+            
+            if pipelined and not long_poll and self.pipeline_depth > 1:
+                candidates = [
+                    c for c in self._connections
+                    if c.can_pipeline and c.in_flight < self.pipeline_depth
+                ]
+                if candidates:
+                    conn = min(candidates, key=lambda c: c.in_flight)
+                    conn.in_flight += 1
+                    self.stats["pipelined"] += 1
+                    return conn
+            
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+    
+    async def _open_connection(self) -> AlgodConnection:
+        """Open a new pooled connection (already reserved for the caller)."""
+        self._opening += 1
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self._host, self._port, ssl=self._ssl),
+                CONNECT_TIMEOUT
+            )
+        finally:
+            self._opening -= 1
+            self._slot_freed.set()
+        
+        conn = AlgodConnection(reader, writer)
+        conn.in_flight = 1
+        self._connections.append(conn)
+        self.stats["connections_opened"] += 1
+        return conn
+    
+    def _release(self, conn: AlgodConnection):
+        """Return a reserved connection slot to the pool."""
+        conn.in_flight -= 1
+        if conn.in_flight == 0 and conn.long_poll:
+            conn.long_poll = False
+            self._long_polls -= 1
+        self._slot_freed.set()
+    
+    def _encode_request(
+        self,
+        method: str,
+        target: str,
+        data: Optional[bytes],
+        headers: Dict[str, str]
+    ) -> bytes:
+        """Encode an HTTP/1.1 request."""
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {self._host_header}",
+            "User-Agent: py-algorand-sdk",
+            "Connection: keep-alive"
+        ]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if data is not None or method != "GET":
+            lines.append(f"Content-Length: {len(data or b'')}")
+        
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (data or b"")
+    
+    async def algod_request(
+        self,
+        method: str,
+        requrl: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        response_format: str = "json",
+        timeout: Optional[float] = None
+    ) -> Union[Dict[str, Any], bytes]:
+        """
+        Execute a request against algod.
+        
+        Args:
+            method: HTTP method
+            requrl: Path relative to the API version prefix
+            params: Query parameters
+            data: Request body
+            headers: Extra headers for this request
+            response_format: "json" to decode the body, anything else returns bytes
+            timeout: Override the endpoint timeout
+        
+        Returns:
+            Decoded JSON response, or the raw body
+        """
+        request_headers = dict(self.headers)
+        if headers:
+            request_headers.update(headers)
+        if requrl not in constants.no_auth:
+            request_headers[constants.algod_auth_header] = self.algod_token
+        
+        if requrl not in constants.unversioned_paths:
+            requrl = API_VERSION_PREFIX + requrl
+        if timeout is None:
+            timeout = self.timeout_for(requrl)
+        
+        target = self._base_path + requrl
+        if params:
+            target += "?" + urlencode(params)
+        
+        payload = self._encode_request(method, target, data, request_headers)
+        idempotent = method == "GET"
+        long_poll = requrl.startswith(LONG_POLL_PREFIXES)
+        attempts = 1 + (self.max_retries if idempotent else 0)
+        
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            for attempt in range(attempts):
+                conn = await self._acquire(pipelined=idempotent, long_poll=long_poll)
+                self.stats["requests"] += 1
+                if long_poll:
+                    self.stats["long_polls"] += 1
+                try:
+                    status, _, body = await asyncio.wait_for(conn.request(payload), timeout)
+                    outcome = str(status)
+                    break
+                except asyncio.TimeoutError:
+                    self.stats["timeouts"] += 1
+                    outcome = "timeout"
+                    logger.warning(f"Algod request timed out after {timeout}s: {method} {requrl}")
+                    raise
+                except ConnectionLost:
+                    if attempt + 1 >= attempts:
+                        raise
+                    self.stats["retries"] += 1
+                finally:
+                    self._release(conn)
+        finally:
+            ALGOD_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, method=method, endpoint=endpoint_label(requrl), status=outcome
+            )
+        
+        if status >= 400:
+            message = body.decode("utf-8", "replace")
+            payload_json: Dict[str, Any] = {}
+            try:
+                payload_json = json.loads(message)
+                message = payload_json.get("message", message)
+            except ValueError:
+                pass
+            raise error.AlgodHTTPError(message, status, payload_json.get("data"))
+        
+        if response_format != "json":
+            return body
+        
+        if not body:
+            # Some algod endpoints answer 200 OK with an empty body
+            return {}
+        
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise error.AlgodResponseError("Failed to parse JSON response from algod") from e
+    
+    async def status(self) -> Dict[str, Any]:
+        """Get node status."""
+        return await self.algod_request("GET", "/status")
+    
+    async def status_after_block(self, block_num: int) -> Dict[str, Any]:
+        """Wait for the round after block_num and return node status."""
+        return await self.algod_request("GET", f"/status/wait-for-block-after/{block_num}")
+    
+    async def suggested_params(self) -> SuggestedParams:
+        """Get suggested transaction parameters."""
+        res = await self.algod_request("GET", "/transactions/params")
+        
+        return SuggestedParams(
+            res["fee"],
+            res["last-round"],
+            res["last-round"] + 1000,
+            res["genesis-hash"],
+            res["genesis-id"],
+            False,
+            res["consensus-version"],
+            res["min-fee"]
+        )
+    
+    async def send_raw_transaction(self, txn: Union[bytes, str]) -> str:
+        """
+        Broadcast base64-encoded signed transaction bytes.
+        
+        Returns:
+            Transaction ID of the first transaction
+        """
+        res = await self.algod_request(
+            "POST",
+            "/transactions",
+            data=base64.b64decode(txn),
+            headers={"Content-Type": "application/x-binary"}
+        )
+        return res["txId"]
+    
+    async def send_transaction(self, txn: Any) -> str:
+        """Broadcast one signed transaction and return its ID."""
+        assert not isinstance(txn, Transaction), f"Attempt to send UNSIGNED transaction {txn}"
+        return await self.send_raw_transaction(encoding.msgpack_encode(txn))
+    
+    async def send_transactions(self, txns: Iterable[Any]) -> str:
+        """Broadcast a signed transaction group and return the first transaction ID."""
+        serialized = []
+        for txn in txns:
+            assert not isinstance(txn, Transaction), f"Attempt to send UNSIGNED transaction {txn}"
+            serialized.append(base64.b64decode(encoding.msgpack_encode(txn)))
+        return await self.send_raw_transaction(base64.b64encode(b"".join(serialized)))
+    
+    async def pending_transaction_info(self, transaction_id: str) -> Dict[str, Any]:
+        """Get information about a pending (or recently confirmed) transaction."""
+        return await self.algod_request(
+            "GET",
+            f"/transactions/pending/{transaction_id}",
+            params={"format": "json"}
+        )
+    
+    async def account_info(self, address: str) -> Dict[str, Any]:
+        """Get account information."""
+        return await self.algod_request("GET", f"/accounts/{address}")
+    
+    async def asset_info(self, asset_id: int) -> Dict[str, Any]:
+        """Get asset information."""
+        return await self.algod_request("GET", f"/assets/{asset_id}")
+    
+    async def application_info(self, application_id: int) -> Dict[str, Any]:
+        """Get application information, including global state."""
+        return await self.algod_request("GET", f"/applications/{application_id}")
+    
+    async def application_box_by_name(self, application_id: int, box_name: bytes) -> Dict[str, Any]:
+        """Get one application box; the value is base64 encoded."""
+        return await self.algod_request(
+            "GET",
+            f"/applications/{application_id}/box",
+            params={"name": "b64:" + base64.b64encode(box_name).decode()}
+        )
+    
+    async def wait_for_confirmation(self, txid: str, wait_rounds: int = 0) -> Dict[str, Any]:
+        """Wait until a pending transaction is confirmed (see wait_for_confirmation)."""
+        return await wait_for_confirmation(self, txid, wait_rounds)
+    
+    async def close(self):
+        """Close all pooled connections."""
+        connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        for conn in connections:
+            try:
+                await conn.writer.wait_closed()
+            except Exception:
+                pass
+
+
+async def wait_for_confirmation(
+    algod_client: AsyncAlgodClient,
+    txid: str,
+    wait_rounds: int = 0
+) -> Dict[str, Any]:
+    """
+    Wait until a pending transaction is confirmed (async algosdk equivalent).
+    
+    Args:
+        algod_client: Async algod client
+        txid: Transaction ID
+        wait_rounds: Rounds to wait before raising (0 means 1000)
+    
+    Returns:
+        Pending transaction info of the confirmed transaction
+    """
+    last_round = (await algod_client.status())["last-round"]
+    current_round = last_round + 1
+    
+    if wait_rounds == 0:
+        wait_rounds = 1000
+    
+    while True:
+        if current_round > last_round + wait_rounds:
+            raise error.ConfirmationTimeoutError(f"Wait for transaction id {txid} timed out")
+        
+        try:
+            tx_info = await algod_client.pending_transaction_info(txid)
+            
+            if tx_info.get("pool-error"):
+                raise error.TransactionRejectedError("Transaction rejected: " + tx_info["pool-error"])
+            
+            if tx_info.get("confirmed-round", 0) != 0:
+                return tx_info
+        except error.AlgodHTTPError:
+            # May 404 behind a load balancer that routed us to another node
+            pass
+        
+        await algod_client.status_after_block(current_round)
+        current_round += 1
+
+
+class BlockFollower:
+    """
+    Follows the chain tip with wait-for-block-after long-polls.
+    
+    Subscribers are called once per new round, in order, so per-round work
+    (cache invalidation, batched writes) is driven by blocks instead of
+    timers. Rounds skipped while a subscriber was slow are not replayed;
+    subscribers receive the latest round.
+    """
+    
+    def __init__(self, algod_client: AsyncAlgodClient, retry_delay: float = 1.0):
+        self.algod_client = algod_client
+        self.retry_delay = retry_delay
+        self.current_round = 0
+        self.is_running = False
+        self._subscribers: List[Callable[[int], Awaitable[None]]] = []
+    
+    def subscribe(self, callback: Callable[[int], Awaitable[None]]):
+        """Register an async callback taking the new round number."""
+        self._subscribers.append(callback)
+    
+    async def run(self):
+        """Long-poll algod for new rounds until stopped."""
+        self.is_running = True
+        try:
+            while self.is_running:
+                try:
+                    if self.current_round == 0:
+                        status = await self.algod_client.status()
+                    else:
+                        status = await self.algod_client.status_after_block(self.current_round)
+                except (error.AlgodHTTPError, ConnectionError, asyncio.TimeoutError) as e:
+                    logger.warning(f"Block follower: {e}; retrying in {self.retry_delay}s")
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                
+                last_round = status["last-round"]
+                if last_round <= self.current_round:
+                    continue
+                self.current_round = last_round
+                
+                for callback in self._subscribers:
+                    try:
+                        await callback(last_round)
+                    except Exception as e:
+                        logger.error(f"Block follower subscriber failed at round {last_round}: {e}")
+        finally:
+            self.is_running = False
+    
+    def stop(self):
+        """Stop after the current long-poll returns."""
+        self.is_running = False
@@ -2,20 +2,39 @@
 API routes for the Seltra Market Simulator.
 """
 
-from fastapi import APIRouter, HTTPException
+from dataclasses import asdict
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Header, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union
+import numpy as np
 import sys
 import os
 
 # Add the contracts directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../contracts/refactored'))
 
+from ..broadcast import ALL_CHANNELS
+from ..profiler import PROFILER
+from ..response_cache import ResponseCache
+from ..serialization import encode_table, negotiate_table_format
+
 # Import will be resolved at runtime when the module is loaded
 # This avoids circular imports since main.py imports this file
 
 router = APIRouter()
 
+# Serialized read responses, rebuilt only when a simulator version moves
+response_cache = ResponseCache()
+
+
+def _cache_key(request: Request, exclude: Tuple[str, ...] = ()) -> str:
+    """Cache key for a read endpoint: path plus sorted query parameters (minus `exclude`)."""
+    params = sorted(item for item in request.query_params.multi_items() if item[0] not in exclude)
+    return f"{request.url.path}?{params}"
+
 # Initialize backend service for contract integration
 try:
     from backend_service import SeltraBackendService
@@ -53,6 +72,11 @@ class TradeRequest(BaseModel):
     direction: str = "buy"
 
 
+class TradeBatchRequest(BaseModel):
+    sizes: List[float]
+    directions: Union[str, List[str]] = "buy"  # One per size, or one for all
+
+
 class TradingPatternRequest(BaseModel):
     pattern: str
 
@@ -78,35 +102,84 @@ async def get_current_price():
     }
 
 
+# Longest /history long-poll, so idle requests don't pin connections forever
+HISTORY_MAX_WAIT_SECONDS = 30.0
+
+
 @router.get("/history")
-async def get_price_history(window: int = 100):
-    """Get recent price history."""
+async def get_price_history(
+    request: Request,
+    window: int = 100,
+    since_seq: Optional[int] = None,
+    since_ts: Optional[int] = None,
+    wait: float = 0.0
+):
+    """
+    Get recent price history (cached per market tick, supports ETag).
+    
+    Without a cursor returns the last `window` points. With `since_seq` (or
+    `since_ts`) returns only newer ticks; pass the response's `next_seq` as
+    the next `since_seq`. `wait` > 0 long-polls up to that many seconds for
+    a new tick when there is none yet. `truncated` means ticks between the
+    cursor and the oldest buffered point were evicted.
+    
+    Rows by default; send Accept: application/vnd.seltra.columnar+json for
+    one array per field or application/x-ndjson for one row per line (the
+    cursor is also sent as the X-Next-Seq header).
+    """
     from simulation.main import get_simulator
     
     simulator = get_simulator()
     if not simulator:
         raise HTTPException(status_code=503, detail="Simulator not available")
     
-    history = simulator.get_price_history(window)
-    return {
-        "history": [
-            {"price": price, "volume": volume, "timestamp": timestamp}
-            for price, volume, timestamp in history
-        ],
-        "count": len(history)
-    }
+    if since_seq is not None and since_ts is not None:
+        raise HTTPException(status_code=400, detail="Use either since_seq or since_ts, not both")
+    if wait < 0 or wait > HISTORY_MAX_WAIT_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Wait must be between 0 and {HISTORY_MAX_WAIT_SECONDS}")
+    
+    if wait > 0:
+        if since_seq is not None and since_seq <= simulator.tick_seq:
+            await simulator.wait_for_tick(since_seq, wait)
+        elif since_ts is not None and simulator.price_history.columns_since_timestamp(since_ts)["price"].size == 0:
+            await simulator.wait_for_tick(simulator.tick_seq, wait)
+    
+    media_type = negotiate_table_format(request.headers.get("accept"))
+    next_seq = simulator.tick_seq
+    
+    def build():
+        truncated = False
+        if since_seq is not None:
+            columns, truncated = simulator.price_history.columns_since_seq(since_seq)
+        elif since_ts is not None:
+            columns = simulator.price_history.columns_since_timestamp(since_ts)
+        else:
+            columns = simulator.get_price_columns(window)
+        
+        return encode_table(
+            {name: columns[name] for name in ("price", "volume", "timestamp")},
+            media_type,
+            rows_key="history",
+            extra={"count": len(columns["price"]), "next_seq": next_seq, "truncated": truncated}
+        )
+    
+    # wait only delays the response; it doesn't change the payload
+    return response_cache.respond(
+        request, f"{_cache_key(request, exclude=('wait',))}|{media_type}", (simulator.version,), build, media_type,
+        extra_headers={"X-Next-Seq": str(next_seq)}
+    )
 
 
 @router.get("/metrics")
-async def get_simulation_metrics():
-    """Get detailed simulation metrics."""
+async def get_simulation_metrics(request: Request):
+    """Get detailed simulation metrics (cached per market tick, supports ETag)."""
     from simulation.main import get_simulator
     
     simulator = get_simulator()
     if not simulator:
         raise HTTPException(status_code=503, detail="Simulator not available")
     
-    return simulator.get_metrics()
+    return response_cache.respond(request, _cache_key(request), (simulator.version,), simulator.get_metrics)
 
 
 @router.post("/scenario")
@@ -252,6 +325,61 @@ async def simulate_trade(request: TradeRequest):
     }
 
 
+# Largest /trade/simulate-batch request
+MAX_TRADE_BATCH = 10000
+
+
+@router.post("/trade/simulate-batch")
+async def simulate_trade_batch(request: Request, batch: TradeBatchRequest):
+    """
+    Simulate many candidate trades in one pass against the same market state.
+    
+    `directions` is either one direction per size or a single direction for
+    all of them. Every quote uses the same price and tick (`current_price`,
+    `tick_seq`). Rows by default; send Accept:
+    application/vnd.seltra.columnar+json for one array per field.
+    """
+    from simulation.main import get_simulator
+    
+    simulator = get_simulator()
+    if not simulator:
+        raise HTTPException(status_code=503, detail="Simulator not available")
+    
+    count = len(batch.sizes)
+    if count == 0 or count > MAX_TRADE_BATCH:
+        raise HTTPException(status_code=400, detail=f"Batch must contain 1 to {MAX_TRADE_BATCH} trades")
+    
+    directions = [batch.directions] * count if isinstance(batch.directions, str) else batch.directions
+    if len(directions) != count:
+        raise HTTPException(status_code=400, detail="Directions must match sizes in length")
+    if not set(directions) <= {"buy", "sell"}:
+        raise HTTPException(status_code=400, detail="Direction must be 'buy' or 'sell'")
+    
+    sizes = np.asarray(batch.sizes, dtype=np.float64)
+    if not np.all(sizes > 0):
+        raise HTTPException(status_code=400, detail="Trade size must be positive")
+    
+    # No await between reading the snapshot and pricing, so no tick can land in between
+    current_price = simulator.get_current_price()
+    tick_seq = simulator.tick_seq
+    execution_prices, slippage = simulator.simulate_trades(sizes, np.array(directions) == "buy")
+    
+    media_type = negotiate_table_format(request.headers.get("accept"))
+    body = encode_table(
+        {
+            "trade_size": sizes,
+            "direction": directions,
+            "execution_price": execution_prices,
+            "slippage": slippage,
+            "slippage_bps": (slippage * 10000).astype(np.int64),
+        },
+        media_type,
+        rows_key="quotes",
+        extra={"count": count, "current_price": current_price, "tick_seq": tick_seq}
+    )
+    return Response(content=body, media_type=media_type)
+
+
 @router.post("/reset")
 async def reset_simulation(initial_price: Optional[float] = None):
     """Reset the simulation to initial state."""
@@ -270,8 +398,8 @@ async def reset_simulation(initial_price: Optional[float] = None):
 
 
 @router.get("/status")
-async def get_status():
-    """Get simulation status."""
+async def get_status(request: Request):
+    """Get simulation status (cached per simulator tick, supports ETag)."""
     from simulation.main import get_simulator, get_blockchain_simulator
     
     simulator = get_simulator()
@@ -280,6 +408,14 @@ async def get_status():
     if not simulator:
         raise HTTPException(status_code=503, detail="Market simulator not available")
     
+    version = (simulator.version, blockchain_sim.version if blockchain_sim else 0)
+    return response_cache.respond(
+        request, _cache_key(request), version, lambda: _build_status(simulator, blockchain_sim)
+    )
+
+
+def _build_status(simulator, blockchain_sim) -> Dict:
+    """Build the /status payload."""
     market_metrics = simulator.get_metrics()
     blockchain_metrics = blockchain_sim.get_metrics() if blockchain_sim else {}
     
@@ -308,33 +444,101 @@ async def get_status():
 # Blockchain Simulation Endpoints
 
 @router.get("/blockchain/wallets")
-async def get_blockchain_wallets():
-    """Get information about all simulated wallets."""
+async def get_blockchain_wallets(
+    request: Request,
+    pattern: Optional[str] = None,
+    balance_bucket: Optional[str] = None,
+    activity: Optional[str] = None,
+    sort: str = "address",
+    order: str = "asc",
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    fields: Optional[str] = None
+):
+    """
+    Get a page of simulated wallets, filtered, sorted and projected server-side.
+    
+    Cached per simulation tick with ETag support; the Accept header selects
+    rows, columnar JSON or NDJSON like /history.
+    """
     from simulation.main import get_blockchain_simulator
     
     blockchain_sim = get_blockchain_simulator()
     if not blockchain_sim:
         raise HTTPException(status_code=503, detail="Blockchain simulator not available")
     
-    wallets = blockchain_sim.get_wallet_info()
-    return {
-        "wallets": wallets,
-        "total_count": len(wallets),
-        "whale_count": len([w for w in wallets if w["pattern"] == "whale"]),
-        "retail_count": len([w for w in wallets if w["pattern"] == "retail"])
-    }
+    if order not in ["asc", "desc"]:
+        raise HTTPException(status_code=400, detail="Order must be 'asc' or 'desc'")
+    
+    if limit < 1 or limit > 1000:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 1000")
+    
+    media_type = negotiate_table_format(request.headers.get("accept"))
+    
+    def build():
+        try:
+            page = blockchain_sim.query_wallets(
+                pattern=pattern,
+                balance_bucket=balance_bucket,
+                activity=activity,
+                sort_by=sort,
+                descending=order == "desc",
+                cursor=cursor,
+                limit=limit,
+                fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+                columnar=True
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        counts = blockchain_sim.get_wallet_counts()
+        return encode_table(
+            page["columns"],
+            media_type,
+            rows_key="wallets",
+            extra={
+                "total_count": counts["total"],
+                "whale_count": counts["by_pattern"].get("whale", 0),
+                "retail_count": counts["by_pattern"].get("retail", 0),
+                "matched_count": page["matched_count"],
+                "next_cursor": page["next_cursor"]
+            }
+        )
+    
+    version = (blockchain_sim.version, blockchain_sim.wallet_manager.version)
+    return response_cache.respond(
+        request, f"{_cache_key(request)}|{media_type}", version, build, media_type
+    )
+
+
+@router.get("/blockchain/pool")
+async def get_blockchain_pool(refresh: bool = False):
+    """Get decoded pool state (shared, read at most once per round)."""
+    from simulation.main import get_blockchain_simulator
+    
+    blockchain_sim = get_blockchain_simulator()
+    if not blockchain_sim or not blockchain_sim.pool_client:
+        raise HTTPException(status_code=503, detail="Pool contract not available")
+    
+    pool_info = await blockchain_sim.pool_client.get_pool_info(force_refresh=refresh)
+    if not pool_info:
+        raise HTTPException(status_code=503, detail="Pool state unavailable")
+    
+    return asdict(pool_info)
 
 
 @router.get("/blockchain/metrics")
-async def get_blockchain_metrics():
-    """Get detailed blockchain simulation metrics."""
+async def get_blockchain_metrics(request: Request):
+    """Get detailed blockchain simulation metrics (cached per simulation tick, supports ETag)."""
     from simulation.main import get_blockchain_simulator
     
     blockchain_sim = get_blockchain_simulator()
     if not blockchain_sim:
         raise HTTPException(status_code=503, detail="Blockchain simulator not available")
     
-    return blockchain_sim.get_metrics()
+    return response_cache.respond(
+        request, _cache_key(request), (blockchain_sim.version,), blockchain_sim.get_metrics
+    )
 
 
 @router.post("/blockchain/pattern")
@@ -393,14 +597,13 @@ async def get_pending_transactions():
     if not blockchain_sim:
         raise HTTPException(status_code=503, detail="Blockchain simulator not available")
     
+    now = __import__("time").time()
     pending = []
-    for plan in blockchain_sim.transaction_queue:
+    for transaction in blockchain_sim.get_pending_transactions():
         pending.append({
-            "wallet_address": plan.wallet.address[:12] + "...",
-            "transaction_type": plan.tx_type.value,
-            "size": plan.size,
-            "target_time": plan.target_time,
-            "time_until_execution": max(0, plan.target_time - __import__("time").time())
+            **transaction,
+            "wallet_address": transaction["wallet_address"][:12] + "...",
+            "time_until_execution": max(0, transaction["target_time"] - now)
         })
     
     return {
@@ -481,119 +684,306 @@ async def get_contract_metrics():
         raise HTTPException(status_code=503, detail="Contract integration not available")
     
     try:
-        metrics = backend_service.get_contract_metrics()
+        metrics = await backend_service.get_contract_metrics()
         return metrics
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get contract metrics: {str(e)}")
 
 
-@router.post("/execute-swap")
-async def execute_swap(request: SwapRequest):
-    """Execute a swap on the deployed contracts."""
-    if not CONTRACT_INTEGRATION_AVAILABLE:
-        raise HTTPException(status_code=503, detail="Contract integration not available")
+@router.post("/swaps", status_code=202)
+async def submit_swap(request: SwapRequest):
+    """
+    Queue a swap from a managed wallet and return a handle immediately.
+    
+    Poll GET /swaps/{swapId} or subscribe to the `swap` stream channel for
+    pending/confirmed/failed updates, the confirmed round and amount out.
+    """
+    from simulation.main import get_swap_queue
+    
+    swap_queue = get_swap_queue()
+    if not swap_queue:
+        raise HTTPException(status_code=503, detail="Pool contract not available")
     
     try:
-        # For demo purposes, we'll simulate the swap
-        # In a real implementation, this would call the contract client
-        from simulation.main import get_simulator
-        simulator = get_simulator()
-        
-        if not simulator:
-            raise HTTPException(status_code=503, detail="Simulator not available")
-        
-        # Simulate swap execution
-        current_price = simulator.get_current_price()
-        if request.assetIn == 0:  # ALGO to HACK
-            amount_out = int(request.amountIn * 1000000 / current_price)  # Convert to HACK
-        else:  # HACK to ALGO
-            amount_out = int(request.amountIn * current_price / 1000000)  # Convert to ALGO
-        
-        # Generate a mock transaction ID
-        import time
-        tx_id = f"SWAP_{int(time.time())}_{request.userAddress[:8]}"
-        
-        return {
-            "transactionId": tx_id,
-            "amountOut": amount_out,
-            "priceImpact": 10,  # 0.1% in basis points
-            "feePaid": int(request.amountIn * 30 / 10000),  # 0.3% fee
-            "newPrice": current_price
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Swap execution failed: {str(e)}")
+        ticket = swap_queue.submit(
+            sender=request.userAddress,
+            asset_in_id=request.assetIn,
+            asset_out_id=request.assetOut,
+            amount_in=request.amountIn,
+            min_amount_out=request.minAmountOut
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=429, detail="Too many swaps queued, retry later")
+    
+    return {
+        "swapId": ticket.swap_id,
+        "status": ticket.status.value,
+        "statusUrl": f"/api/v1/swaps/{ticket.swap_id}"
+    }
+
+
+@router.get("/swaps/{swap_id}")
+async def get_swap_status(swap_id: str):
+    """Get a submitted swap's status, confirmed round and amount out."""
+    from simulation.main import get_swap_queue
+    
+    swap_queue = get_swap_queue()
+    if not swap_queue:
+        raise HTTPException(status_code=503, detail="Pool contract not available")
+    
+    ticket = swap_queue.get(swap_id)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Unknown swap")
+    return ticket.to_dict()
+
+
+@router.get("/swaps")
+async def get_swap_queue_stats():
+    """Get swap submission queue statistics."""
+    from simulation.main import get_swap_queue
+    
+    swap_queue = get_swap_queue()
+    if not swap_queue:
+        raise HTTPException(status_code=503, detail="Pool contract not available")
+    return swap_queue.get_stats()
+
+
+@router.post("/execute-swap", status_code=202)
+async def execute_swap(request: SwapRequest):
+    """Submit a swap (alias of POST /swaps, kept for existing clients)."""
+    return await submit_swap(request)
 
 
 @router.post("/trigger-rebalance")
 async def trigger_rebalance():
-    """Trigger liquidity rebalancing on deployed contracts."""
+    """Evaluate the rebalancing policy now and execute it if it fires."""
     if not CONTRACT_INTEGRATION_AVAILABLE:
         raise HTTPException(status_code=503, detail="Contract integration not available")
     
     try:
-        # Get current market conditions
-        from simulation.main import get_simulator
-        simulator = get_simulator()
-        
-        if not simulator:
-            raise HTTPException(status_code=503, detail="Simulator not available")
-        
-        current_price = simulator.get_current_price()
-        current_volatility = simulator.get_current_volatility()
+        rebalancer = backend_service.rebalancer
         
-        # Update oracle with current price
-        volatility, regime = backend_service.update_oracle(current_price)
-        
-        # Check if rebalancing is needed
-        should_rebalance, optimal_ranges, reason = backend_service.check_rebalancing(
-            current_price=current_price,
-            current_volatility=current_volatility,
-            total_liquidity=1000000.0,  # Demo value
-            current_efficiency=45.0,    # Demo value
-            time_since_last=400,        # Demo value
-            volatility_change=2.5       # Demo value
-        )
+        if rebalancer.is_running and backend_service.oracle_state:
+            # The daemon keeps the oracle current; use its live state
+            decision = rebalancer.evaluate()
+        else:
+            from simulation.main import get_simulator
+            simulator = get_simulator()
+            
+            if not simulator:
+                raise HTTPException(status_code=503, detail="Simulator not available")
+            
+            decision = rebalancer.on_price(simulator.get_current_price())
         
-        if should_rebalance:
-            # Execute rebalance on chain
-            tx_id = await backend_service.execute_rebalance_on_chain(optimal_ranges)
+        if decision.should_rebalance:
+            task, started = rebalancer.start_rebalance(decision)
+            if not started:
+                raise HTTPException(status_code=409, detail="A rebalance is already in flight")
+            
+            # Shielded: a client disconnect must not cancel the on-chain execution
+            tx_id = await asyncio.shield(task)
             
             return {
                 "transactionId": tx_id,
-                "reason": reason,
+                "reason": decision.reason,
                 "optimalRanges": [
                     {
                         "lower": r.lower,
                         "upper": r.upper,
                         "liquidity": r.liquidity
                     }
-                    for r in optimal_ranges
+                    for r in decision.optimal_ranges
                 ],
-                "volatilityRegime": regime
+                "volatilityRegime": decision.regime,
+                "efficiency": decision.efficiency
             }
         else:
             return {
                 "message": "No rebalancing needed",
-                "reason": reason,
-                "volatilityRegime": regime
+                "reason": decision.reason,
+                "volatilityRegime": decision.regime,
+                "efficiency": decision.efficiency
             }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Rebalance failed: {str(e)}")
 
 
+@router.get("/rebalancer")
+async def get_rebalancer_status():
+    """Get the rebalancing daemon's policy inputs, deployed ranges and counters."""
+    if not CONTRACT_INTEGRATION_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Contract integration not available")
+    
+    return backend_service.rebalancer.get_status()
+
+
 @router.get("/contract-state")
-async def get_contract_state():
-    """Get current state from deployed contracts."""
+async def get_contract_state(refresh: bool = False):
+    """Get current state from deployed contracts (cached per round unless refresh=true)."""
     if not CONTRACT_INTEGRATION_AVAILABLE:
         raise HTTPException(status_code=503, detail="Contract integration not available")
     
     try:
-        contract_state = backend_service.sync_with_contracts()
+        contract_state = await backend_service.sync_with_contracts(refresh=refresh)
         return contract_state
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get contract state: {str(e)}")
 
 
+# Push Streams
+
+# Idle SSE connections get a comment line this often so proxies keep them open
+STREAM_KEEPALIVE_SECONDS = 15.0
+
+
+def _parse_channels(channels: Optional[str]) -> List[str]:
+    """Parse a comma-separated channel list (all channels when empty)."""
+    if not channels:
+        return list(ALL_CHANNELS)
+    
+    requested = [c.strip() for c in channels.split(",") if c.strip()]
+    invalid = [c for c in requested if c not in ALL_CHANNELS]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid channels {invalid}. Valid options: {list(ALL_CHANNELS)}"
+        )
+    return requested
+
+
+def _reset_payload(hub) -> Dict:
+    """Tell a resuming client its gap is gone from the replay buffer."""
+    return {"seq": hub.seq, "reason": "resume gap exceeds replay buffer"}
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    channels: Optional[str] = None,
+    last_seq: Optional[int] = None,
+    last_event_id: Optional[str] = Header(default=None)
+):
+    """
+    Server-Sent Events stream of ticks, transaction results and metric deltas.
+    
+    Resumes after `last_seq` (or the Last-Event-ID header browsers send on
+    reconnect). A `reset` event means the gap was too old to replay and the
+    client should re-fetch snapshots.
+    """
+    from simulation.main import get_event_hub
+    
+    hub = get_event_hub()
+    if not hub:
+        raise HTTPException(status_code=503, detail="Event stream not available")
+    
+    if last_seq is None and last_event_id and last_event_id.isdigit():
+        last_seq = int(last_event_id)
+    subscription = hub.subscribe(_parse_channels(channels), last_seq)
+    
+    async def event_source():
+        try:
+            if subscription.lagged:
+                yield f"event: reset\ndata: {json.dumps(_reset_payload(hub))}\n\n"
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.next_event(), STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                if event is None:
+                    # Dropped for lagging; the client reconnects with Last-Event-ID
+                    break
+                yield event.to_sse()
+        finally:
+            hub.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket, channels: Optional[str] = None, last_seq: Optional[int] = None):
+    """
+    WebSocket stream of the same events as /stream, one JSON message each.
+    
+    Sends {"channel": "reset", ...} when the resume gap is too old and closes
+    with code 1013 when the client falls behind; reconnect with the last seq.
+    """
+    from simulation.main import get_event_hub
+    
+    hub = get_event_hub()
+    await websocket.accept()
+    if not hub:
+        await websocket.close(code=1013)
+        return
+    
+    try:
+        subscription = hub.subscribe(_parse_channels(channels), last_seq)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    
+    try:
+        if subscription.lagged:
+            await websocket.send_text(json.dumps({"channel": "reset", "data": _reset_payload(hub)}))
+        
+        while True:
+            event = await subscription.next_event()
+            if event is None:
+                await websocket.close(code=1013, reason="lagging")
+                break
+            await websocket.send_text(event.payload)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.unsubscribe(subscription)
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Get read response cache statistics."""
+    return response_cache.get_stats()
+
+
+@router.get("/stream/stats")
+async def get_stream_stats():
+    """Get broadcast hub statistics."""
+    from simulation.main import get_event_hub
+    
+    hub = get_event_hub()
+    if not hub:
+        raise HTTPException(status_code=503, detail="Event stream not available")
+    
+    return hub.get_stats()
+
+
+@router.get("/debug/profile")
+async def get_profile(samples: bool = False):
+    """
+    Event-loop lag, per-stage tick timings and recent slow stages.
+    
+    Args:
+        samples: Include the stack samples taken while the loop was blocked
+    """
+    return PROFILER.get_report(include_samples=samples)
+
+
+@router.post("/debug/profile/reset")
+async def reset_profile():
+    """Clear collected profile statistics."""
+    PROFILER.reset()
+    return {"message": "Profile statistics reset"}
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint for the simulation service."""
@@ -10,20 +10,30 @@ import random
 import time
 import logging
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from enum import Enum
 
 from algosdk import account, mnemonic
-from algosdk.v2client import algod
 from algosdk.transaction import PaymentTxn, ApplicationCallTxn, AssetTransferTxn
 from algosdk.atomic_transaction_composer import AtomicTransactionComposer
 from algosdk.encoding import encode_address
 
+from .algod_client import AsyncAlgodClient
 from .contract_client import SeltraPoolClient, TransactionResult
 from .wallet_manager import WalletManager, ManagedWallet, FundingConfig
+from .broadcast import BroadcastHub, TRANSACTION_CHANNEL
+from .profiler import PROFILER
+from .telemetry import (
+    PLAN_GENERATION_SECONDS, TRANSACTION_SUBMIT_SECONDS, TRANSACTION_CONFIRM_SECONDS, TRANSACTIONS
+)
 
 logger = logging.getLogger(__name__)
 
+# Execution awaits submission and confirmation of each planned transaction,
+# so its wall time spans algod rounds; flag it only when far slower than that
+EXECUTION_SLOW_SECONDS = 15.0
+PROFILER.set_threshold("blockchain", "execution", EXECUTION_SLOW_SECONDS)
+
 
 class TransactionType(Enum):
     """Types of transactions to simulate."""
@@ -65,7 +75,9 @@ class AlgorandTransactionSimulator:
         pool_app_id: Optional[int] = None,
         asset_x_id: Optional[int] = None,
         asset_y_id: Optional[int] = None,
-        faucet_private_key: Optional[str] = None
+        faucet_private_key: Optional[str] = None,
+        algod_pool_size: int = 8,
+        event_hub: Optional[BroadcastHub] = None
     ):
         """
         Initialize the blockchain transaction simulator.
@@ -79,18 +91,24 @@ class AlgorandTransactionSimulator:
             asset_x_id: Asset X ID
             asset_y_id: Asset Y ID
             faucet_private_key: Private key for funding wallets
+            algod_pool_size: Keep-alive connections shared by all algod callers
+            event_hub: Hub that receives every transaction result
         """
         self.algod_address = algod_address
         self.algod_token = algod_token
         self.num_wallets = num_wallets
         self.market_simulator = market_simulator
+        self.event_hub = event_hub
+        
+        # Bumped on every state change; read endpoints cache responses per version
+        self.version = 0
         
-        # Initialize Algorand client
+        # Initialize shared async Algorand client (pooled keep-alive connections)
         if algod_token:
-            self.algod_client = algod.AlgodClient(algod_token, algod_address)
+            self.algod_client = AsyncAlgodClient(algod_token, algod_address, pool_size=algod_pool_size)
         else:
             # For public nodes like AlgoNode, no token needed
-            self.algod_client = algod.AlgodClient("", algod_address)
+            self.algod_client = AsyncAlgodClient("", algod_address, pool_size=algod_pool_size)
 
         # Initialize contract client (only if we have contract IDs)
         if pool_app_id and asset_y_id:
@@ -158,11 +176,58 @@ class AlgorandTransactionSimulator:
         """Initialize the simulator - create wallets and connect to blockchain."""
         logger.info("Initializing Algorand Transaction Simulator...")
         
-        # Test connection to Algorand node
-        if not await self.pool_client.connect():
-            raise RuntimeError("Failed to connect to Algorand node")
+        await self.connect()
+        await self.load_wallets()
+        await self.refresh_balances()
+        await self.fund_wallets()
+        
+        logger.info(f"Simulation initialized with {len(self.wallet_manager.wallets)} wallets")
+    
+    # Initialization phases (run in order by initialize, or one by one by the
+    # service's background warm-up so it can report progress)
+    
+    async def connect(
+        self,
+        retry: bool = False,
+        max_delay: float = 30.0,
+        on_retry: Optional[Callable[[Exception], None]] = None
+    ):
+        """
+        Connect to the Algorand node.
+        
+        Args:
+            retry: Keep retrying with exponential backoff instead of failing
+            max_delay: Longest wait between retries (seconds)
+            on_retry: Called with the error before each retry
         
-        # Load existing wallets or create new ones
+        Raises:
+            RuntimeError: If the node is unreachable and retry is False
+        """
+        delay = 1.0
+        while True:
+            try:
+                status = await self.algod_client.status()
+                break
+            except Exception as e:
+                if not retry:
+                    raise RuntimeError(f"Failed to connect to Algorand node: {e}") from e
+                logger.warning(f"Algorand node unreachable ({e}); retrying in {delay:.0f}s")
+                if on_retry:
+                    on_retry(e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, max_delay)
+        
+        if self.pool_client:
+            self.pool_client.observe_round(status.get('last-round', 0))
+        logger.info(f"Connected to Algorand node - Round: {status.get('last-round', 'unknown')}")
+    
+    async def load_wallets(self) -> int:
+        """
+        Load existing wallets or create new ones.
+        
+        Returns:
+            Number of managed wallets
+        """
         existing_wallets = await self.wallet_manager.load_existing_wallets()
         
         if existing_wallets == 0:
@@ -172,17 +237,31 @@ class AlgorandTransactionSimulator:
             
             await self.wallet_manager.create_wallets(self.num_wallets, whale_ratio)
         
-        # Fund wallets if faucet is available
-        if self.wallet_manager.funding_config:
-            logger.info("Funding wallets...")
-            funded_count = await self.wallet_manager.fund_all_wallets()
-            logger.info(f"Successfully funded {funded_count} wallets")
-        
-        # Update initial wallet balances
-        await self.wallet_manager.update_wallet_balances()
+        return len(self.wallet_manager.wallets)
+    
+    async def refresh_balances(self) -> int:
+        """
+        Refresh every wallet's cached balances (needs the pool contract).
         
-        logger.info(f"Simulation initialized with {len(self.wallet_manager.wallets)} wallets")
+        Returns:
+            Number of wallets updated
+        """
+        if not self.pool_client:
+            return 0
+        return await self.wallet_manager.update_wallet_balances()
     
+    async def fund_wallets(self) -> int:
+        """
+        Fund wallets below the refill threshold if a faucet is available.
+        
+        Returns:
+            Number of wallets funded
+        """
+        if not self.wallet_manager.funding_config or not self.pool_client:
+            return 0
+        
+        logger.info("Funding wallets...")
+        return await self.wallet_manager.fund_underfunded_wallets()
     
     async def start_simulation(self):
         """Start the transaction simulation."""
@@ -192,6 +271,7 @@ class AlgorandTransactionSimulator:
         
         self.is_running = True
         self.start_time = time.time()
+        self.version += 1
         logger.info("Starting blockchain transaction simulation...")
         
         try:
@@ -208,10 +288,12 @@ class AlgorandTransactionSimulator:
             raise
         finally:
             self.is_running = False
+            self.version += 1
     
     def stop_simulation(self):
         """Stop the transaction simulation."""
         self.is_running = False
+        self.version += 1
         logger.info("Stopping blockchain transaction simulation...")
     
     async def _simulation_tick(self):
@@ -219,22 +301,28 @@ class AlgorandTransactionSimulator:
         current_time = time.time()
         
         # Generate new transaction plans
-        await self._generate_transaction_plans(current_time)
+        with PLAN_GENERATION_SECONDS.time(), PROFILER.stage("blockchain", "plan_generation"):
+            await self._generate_transaction_plans(current_time)
+        self.version += 1
         
         # Execute ready transactions
-        ready_transactions = [
-            plan for plan in self.transaction_queue 
-            if plan.target_time <= current_time
-        ]
+        with PROFILER.stage("blockchain", "scheduling"):
+            ready_transactions = [
+                plan for plan in self.transaction_queue 
+                if plan.target_time <= current_time
+            ]
         
         if ready_transactions:
-            await self._execute_transactions(ready_transactions)
+            with PROFILER.stage("blockchain", "execution"):
+                await self._execute_transactions(ready_transactions)
             
             # Remove executed transactions
-            self.transaction_queue = [
-                plan for plan in self.transaction_queue 
-                if plan.target_time > current_time
-            ]
+            with PROFILER.stage("blockchain", "scheduling"):
+                self.transaction_queue = [
+                    plan for plan in self.transaction_queue 
+                    if plan.target_time > current_time
+                ]
+            self.version += 1
     
     async def _generate_transaction_plans(self, current_time: float):
         """Generate transaction plans based on current market conditions."""
@@ -354,6 +442,8 @@ class AlgorandTransactionSimulator:
                 logger.error(f"Transaction execution failed: {e}")
                 self.failed_transactions += 1
                 self.total_transactions += 1
+            
+            self.version += 1
     
     async def _execute_single_transaction(self, plan: TransactionPlan) -> bool:
         """Execute a single transaction plan on the real blockchain."""
@@ -371,11 +461,15 @@ class AlgorandTransactionSimulator:
                 return False
             
             # Update wallet statistics
-            self.wallet_manager.update_wallet_stats(
-                plan.wallet.address,
-                result.success,
-                plan.size if result.success else 0
-            )
+            with PROFILER.stage("blockchain", "wallet_updates"):
+                self.wallet_manager.update_wallet_stats(
+                    plan.wallet.address,
+                    result.success,
+                    plan.size if result.success else 0
+                )
+                
+                self._record_result(plan, result)
+                self._publish_result(plan, result)
             
             if result.success:
                 logger.debug(
@@ -392,6 +486,7 @@ class AlgorandTransactionSimulator:
             
         except Exception as e:
             logger.error(f"Transaction execution error: {e}")
+            TRANSACTIONS.inc(type=plan.tx_type.value, outcome="error")
             # Update wallet statistics for failed transaction
             self.wallet_manager.update_wallet_stats(plan.wallet.address, False, 0)
             return False
@@ -412,7 +507,7 @@ class AlgorandTransactionSimulator:
         min_amount_out = int(amount_in * (1 - params.get("slippage_tolerance", 0.005)))
         
         return await self.pool_client.execute_swap(
-            private_key=plan.wallet.private_key,
+            private_key=self.wallet_manager.get_signer(plan.wallet.address),
             asset_in_id=asset_in_id,
             asset_out_id=asset_out_id,
             amount_in=amount_in,
@@ -440,7 +535,7 @@ class AlgorandTransactionSimulator:
             range_id = 1  # Tight range
         
         return await self.pool_client.add_liquidity(
-            private_key=plan.wallet.private_key,
+            private_key=self.wallet_manager.get_signer(plan.wallet.address),
             amount_x_desired=amount_x_desired,
             amount_y_desired=amount_y_desired,
             amount_x_min=amount_x_min,
@@ -462,19 +557,46 @@ class AlgorandTransactionSimulator:
         range_id = 2
         
         return await self.pool_client.remove_liquidity(
-            private_key=plan.wallet.private_key,
+            private_key=self.wallet_manager.get_signer(plan.wallet.address),
             lp_token_amount=lp_token_amount,
             amount_x_min=amount_x_min,
             amount_y_min=amount_y_min,
             range_id=range_id
         )
     
+    def _record_result(self, plan: TransactionPlan, result: TransactionResult):
+        """Record per-type outcome and submit/confirm latency."""
+        tx_type = plan.tx_type.value
+        TRANSACTIONS.inc(type=tx_type, outcome="success" if result.success else "failure")
+        
+        if result.submit_time is not None:
+            TRANSACTION_SUBMIT_SECONDS.observe(result.submit_time, type=tx_type)
+            if result.success and result.execution_time is not None:
+                TRANSACTION_CONFIRM_SECONDS.observe(result.execution_time - result.submit_time, type=tx_type)
+    
+    def _publish_result(self, plan: TransactionPlan, result: TransactionResult):
+        """Push a transaction result to stream subscribers."""
+        if not self.event_hub:
+            return
+        
+        self.event_hub.publish(TRANSACTION_CHANNEL, {
+            "type": plan.tx_type.value,
+            "wallet": plan.wallet.address,
+            "size": plan.size,
+            "success": result.success,
+            "txn_id": result.txn_id,
+            "confirmed_round": result.confirmed_round,
+            "error": result.error_message,
+            "execution_time": result.execution_time
+        })
+    
     def set_trading_pattern(self, pattern: str):
         """Set the current trading pattern."""
         try:
             new_pattern = TradingPattern(pattern)
             if new_pattern != self.current_pattern:
                 self.current_pattern = new_pattern
+                self.version += 1
                 logger.info(f"Changed trading pattern to: {pattern}")
                 
                 # Update pattern configuration - wallet manager handles the specifics
@@ -503,12 +625,33 @@ class AlgorandTransactionSimulator:
             "pending_transactions": len(self.transaction_queue),
         }
     
+    def get_pending_transactions(self) -> List[Dict]:
+        """Get planned transactions waiting for their target time."""
+        return [
+            {
+                "wallet_address": plan.wallet.address,
+                "transaction_type": plan.tx_type.value,
+                "size": plan.size,
+                "target_time": plan.target_time,
+            }
+            for plan in self.transaction_queue
+        ]
+    
     def get_wallet_info(self) -> List[Dict]:
         """Get information about all wallets."""
         return self.wallet_manager.get_wallet_info()
     
+    def query_wallets(self, **query) -> Dict:
+        """Query wallets through the wallet manager's secondary indexes."""
+        return self.wallet_manager.query_wallets(**query)
+    
+    def get_wallet_counts(self) -> Dict:
+        """Get index-maintained wallet counts."""
+        return self.wallet_manager.get_wallet_counts()
+    
     async def cleanup(self):
         """Clean up resources and save state."""
         logger.info("Cleaning up blockchain simulator...")
         if self.wallet_manager:
             await self.wallet_manager.cleanup()
+        await self.algod_client.close()
@@ -0,0 +1,284 @@
+"""
+In-process broadcast hub for push streaming.
+
+Market ticks, transaction results and metric deltas are published once to
+the hub, serialized once, and fanned out to every SSE/WebSocket subscriber.
+Each event carries a monotonically increasing sequence number; a bounded
+replay buffer lets reconnecting clients resume from the last sequence they
+saw instead of re-fetching full snapshots.
+"""
+
+import asyncio
+import json
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+# Channels published by the simulation services
+TICK_CHANNEL = "tick"
+TRANSACTION_CHANNEL = "transaction"
+METRICS_CHANNEL = "metrics"
+SWAP_CHANNEL = "swap"
+ALL_CHANNELS = (TICK_CHANNEL, TRANSACTION_CHANNEL, METRICS_CHANNEL, SWAP_CHANNEL)
+
+# Events kept for resume (about 15 minutes of 1s ticks plus traffic)
+DEFAULT_REPLAY_SIZE = 4096
+
+# Events buffered per subscriber before it is considered lagging
+DEFAULT_SUBSCRIBER_QUEUE_SIZE = 1024
+
+
+@dataclass
+class StreamEvent:
+    """A published event, serialized once for all subscribers."""
+    seq: int
+    channel: str
+    data: Any
+    timestamp: float
+    payload: str = ""       # JSON of {"seq", "channel", "timestamp", "data"}
+    
+    def to_sse(self) -> str:
+        """Render as a Server-Sent Events frame."""
+        return f"id: {self.seq}\nevent: {self.channel}\ndata: {self.payload}\n\n"
+
+
+@dataclass
+class Subscription:
+    """One client's view of the hub."""
+    channels: Set[str]
+    queue: asyncio.Queue
+    lagged: bool = False      # Set when the client fell behind and events were dropped
+    
+    async def next_event(self) -> Optional[StreamEvent]:
+        """
+        Wait for the next event.
+        
+        Returns:
+            The event, or None once the subscription was closed for lagging
+        """
+        return await self.queue.get()
+
+
+class BroadcastHub:
+    """
+    Sequenced publish/subscribe hub with replay.
+    
+    Publishing is synchronous and never blocks the publisher: a subscriber
+    whose queue is full is closed (it receives None) and is expected to
+    reconnect with its last sequence number, which the replay buffer serves.
+    """
+    
+    def __init__(
+        self,
+        replay_size: int = DEFAULT_REPLAY_SIZE,
+        subscriber_queue_size: int = DEFAULT_SUBSCRIBER_QUEUE_SIZE
+    ):
+        """
+        Initialize the hub.
+        
+        Args:
+            replay_size: Events retained for resume
+            subscriber_queue_size: Per-subscriber buffer before it is dropped
+        """
+        self.replay: Deque[StreamEvent] = deque(maxlen=replay_size)
+        self.subscriber_queue_size = subscriber_queue_size
+        self.subscriptions: List[Subscription] = []
+        self.seq = 0
+        
+        # Statistics
+        self.published_events = 0
+        self.dropped_subscribers = 0
+    
+    def publish(self, channel: str, data: Any) -> int:
+        """
+        Publish an event to every subscriber of its channel.
+        
+        Args:
+            channel: Event channel
+            data: JSON-serializable payload
+        
+        Returns:
+            Sequence number assigned to the event
+        """
+        self.seq += 1
+        event = StreamEvent(seq=self.seq, channel=channel, data=data, timestamp=time.time())
+        event.payload = json.dumps(
+            {"seq": event.seq, "channel": channel, "timestamp": event.timestamp, "data": data},
+            separators=(",", ":"),
+            default=str
+        )
+        self.replay.append(event)
+        self.published_events += 1
+        
+        for subscription in list(self.subscriptions):
+            if channel not in subscription.channels:
+                continue
+            if subscription.queue.full():
+                self._drop(subscription)
+            else:
+                subscription.queue.put_nowait(event)
+        
+        return event.seq
+    
+    def subscribe(self, channels: Optional[Iterable[str]] = None, last_seq: Optional[int] = None) -> Subscription:
+        """
+        Subscribe to channels, optionally resuming after a sequence number.
+        
+        Args:
+            channels: Channels to receive (all when None)
+            last_seq: Last sequence the client saw; newer buffered events are
+                replayed first. If the gap is older than the replay buffer the
+                subscription is marked lagged so the client re-fetches a snapshot.
+        
+        Returns:
+            Subscription
+        """
+        subscription = Subscription(
+            channels=set(channels) if channels else set(ALL_CHANNELS),
+            queue=asyncio.Queue(maxsize=self.subscriber_queue_size)
+        )
+        
+        if last_seq is not None and last_seq < self.seq:
+            oldest = self.replay[0].seq if self.replay else self.seq + 1
+            if last_seq + 1 < oldest:
+                subscription.lagged = True
+            
+            backlog = [
+                event for event in self.replay
+                if event.seq > last_seq and event.channel in subscription.channels
+            ]
+            # Keep the newest events if the backlog exceeds the queue
+            for event in backlog[-self.subscriber_queue_size:]:
+                subscription.queue.put_nowait(event)
+            if len(backlog) > self.subscriber_queue_size:
+                subscription.lagged = True
+        
+        self.subscriptions.append(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        """Stop delivering events to a subscription."""
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+    
+    def _drop(self, subscription: Subscription):
+        """Close a lagging subscription; its reader receives None."""
+        self.unsubscribe(subscription)
+        subscription.lagged = True
+        self.dropped_subscribers += 1
+        
+        # Make room for the close marker
+        subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+        logger.warning(f"Dropped lagging stream subscriber (seq {self.seq})")
+    
+    async def pump(self, channel: str, source: asyncio.Queue, transform: Callable[[Any], Any]):
+        """
+        Forward items from a queue (e.g. MarketSimulator ticks) to a channel.
+        
+        Args:
+            channel: Channel to publish on
+            source: Queue to drain
+            transform: Converts each item to a JSON-serializable payload
+        """
+        while True:
+            item = await source.get()
+            try:
+                self.publish(channel, transform(item))
+            except Exception as e:
+                logger.error(f"Failed to publish {channel} event: {e}")
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get hub statistics."""
+        return {
+            "seq": self.seq,
+            "subscribers": len(self.subscriptions),
+            "published_events": self.published_events,
+            "dropped_subscribers": self.dropped_subscribers,
+            "replay_size": len(self.replay),
+            "oldest_replay_seq": self.replay[0].seq if self.replay else 0,
+        }
+
+
+class MetricsDeltaPublisher:
+    """
+    Publishes only the metric values that changed since the last publish.
+    
+    Sources are polled once per interval no matter how many clients listen.
+    Every `snapshot_every` publishes a full snapshot is sent so late joiners
+    (or clients whose resume gap was too old) converge without a REST call.
+    """
+    
+    def __init__(
+        self,
+        hub: BroadcastHub,
+        sources: Dict[str, Callable[[], Dict[str, Any]]],
+        interval: float = 1.0,
+        snapshot_every: int = 30
+    ):
+        """
+        Initialize the publisher.
+        
+        Args:
+            hub: Hub to publish on
+            sources: Metric group name -> callable returning a flat dict
+            interval: Seconds between polls
+            snapshot_every: Publishes between full snapshots
+        """
+        self.hub = hub
+        self.sources = sources
+        self.interval = interval
+        self.snapshot_every = snapshot_every
+        self.last_values: Dict[str, Dict[str, Any]] = {}
+        self.publish_count = 0
+        self.is_running = False
+    
+    def collect(self) -> Optional[Dict[str, Any]]:
+        """
+        Poll sources and compute the delta against the last published values.
+        
+        Returns:
+            {"snapshot": bool, "metrics": {group: {key: value}}}, or None when
+            nothing changed
+        """
+        snapshot = self.publish_count % self.snapshot_every == 0
+        changes: Dict[str, Dict[str, Any]] = {}
+        
+        for group, source in self.sources.items():
+            try:
+                values = source() or {}
+            except Exception as e:
+                logger.error(f"Metric source {group} failed: {e}")
+                continue
+            
+            previous = self.last_values.get(group, {})
+            delta = values if snapshot else {
+                key: value for key, value in values.items() if previous.get(key) != value
+            }
+            if delta:
+                changes[group] = delta
+            self.last_values[group] = values
+        
+        if not changes:
+            return None
+        
+        self.publish_count += 1
+        return {"snapshot": snapshot, "metrics": changes}
+    
+    async def run(self):
+        """Poll and publish until stopped."""
+        self.is_running = True
+        while self.is_running:
+            delta = self.collect()
+            if delta:
+                self.hub.publish(METRICS_CHANNEL, delta)
+            await asyncio.sleep(self.interval)
+    
+    def stop(self):
+        """Stop the publishing loop."""
+        self.is_running = False
@@ -6,20 +6,25 @@ Handles real blockchain transactions for swaps and liquidity operations.
 """
 
 import asyncio
+import base64
+import copy
 import logging
 import time
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any, Union
 from decimal import Decimal
 
-from algosdk import account, mnemonic, encoding
-from algosdk.v2client import algod
+from nacl.signing import SigningKey
+
+from algosdk import mnemonic, encoding, constants
 from algosdk.transaction import (
     PaymentTxn, 
     ApplicationCallTxn, 
     AssetTransferTxn,
     AssetCreateTxn,
-    wait_for_confirmation
+    SignedTransaction,
+    SuggestedParams,
+    Transaction
 )
 from algosdk.atomic_transaction_composer import (
     AtomicTransactionComposer,
@@ -29,8 +34,13 @@ from algosdk.atomic_transaction_composer import (
 from algosdk.abi import Contract
 from algosdk.error import AlgodHTTPError
 
+from .algod_client import AsyncAlgodClient, wait_for_confirmation
+
 logger = logging.getLogger(__name__)
 
+# Placeholder for variable uint64 args/amounts when sizing templates (widest encoding)
+MAX_UINT64 = 2**64 - 1
+
 
 @dataclass
 class AssetInfo:
@@ -52,6 +62,11 @@ class PoolInfo:
     current_price: int  # Fixed point
     total_liquidity: int
     is_initialized: bool
+    range1_liquidity: int = 0
+    range2_liquidity: int = 0
+    range3_liquidity: int = 0
+    current_fee_rate: int = 0  # Basis points
+    round: int = 0  # Round the state was read at
 
 
 @dataclass
@@ -63,6 +78,97 @@ class TransactionResult:
     error_message: Optional[str] = None
     gas_used: Optional[int] = None
     execution_time: Optional[float] = None
+    submit_time: Optional[float] = None     # Seconds until algod accepted it; the rest is confirmation
+
+
+@dataclass
+class SwapSubmission:
+    """A broadcast swap group awaiting confirmation."""
+    txn_id: str                 # First transaction of the group (what algod returns)
+    app_call_txn_id: str        # Pool app call; its inner transactions pay the output
+    sender: str
+    last_valid_round: int       # Unconfirmed after this round means it expired
+
+
+def swap_amount_out(app_call_info: Dict[str, Any], receiver: str) -> int:
+    """
+    Sum the output the pool paid to the swapper in a confirmed app call.
+    
+    Args:
+        app_call_info: Pending transaction info of the pool app call
+        receiver: Swapper address
+    
+    Returns:
+        Output amount in base units (ALGO payments and ASA transfers)
+    """
+    amount = 0
+    for inner in app_call_info.get("inner-txns", []):
+        txn = inner.get("txn", {}).get("txn", {})
+        if txn.get("rcv") == receiver:
+            amount += txn.get("amt", 0)
+        elif txn.get("arcv") == receiver:
+            amount += txn.get("aamt", 0)
+    return amount
+
+
+def decode_global_state(global_state: List[Dict[str, Any]]) -> Dict[str, Union[int, bytes]]:
+    """
+    Decode an algod `global-state` array into a plain dictionary.
+    
+    Args:
+        global_state: List of {"key": b64, "value": {"type", "bytes", "uint"}} entries
+    
+    Returns:
+        Mapping of UTF-8 key to int (uint values) or bytes (byte-slice values)
+    """
+    state = {}
+    for entry in global_state:
+        key = base64.b64decode(entry["key"]).decode("utf-8", errors="replace")
+        value = entry.get("value", {})
+        if value.get("type") == 1:
+            state[key] = base64.b64decode(value.get("bytes", ""))
+        else:
+            state[key] = value.get("uint", 0)
+    return state
+
+
+@dataclass
+class TransactionTemplate:
+    """Invariant parts of one pool operation's group, built once per pool/asset pair."""
+    deposits: List[Transaction]  # User -> pool transfers, in group order
+    app_call: ApplicationCallTxn
+    fixed_args: List[bytes]  # Selector plus constant (asset ID) args
+    sizes: List[int]  # Estimated signed sizes (deposits..., app call) for fee calculation
+
+
+class WalletSigner(AccountTransactionSigner):
+    """
+    Long-lived signer for one account.
+    
+    Decodes the base64 private key and derives the address once, then signs
+    with the cached signing key. Usable anywhere an AccountTransactionSigner
+    is accepted (ATC groups) as well as for single transactions via sign().
+    """
+    
+    def __init__(self, private_key: str):
+        super().__init__(private_key)
+        key_bytes = base64.b64decode(private_key)
+        self.signing_key = SigningKey(key_bytes[:constants.key_len_bytes])
+        self.address = encoding.encode_address(key_bytes[constants.key_len_bytes:])
+    
+    def sign(self, txn: Transaction) -> SignedTransaction:
+        """Sign a single transaction with the cached key."""
+        signature = self.signing_key.sign(txn.bytes_to_sign()).signature
+        authorizing_address = None if txn.sender == self.address else self.address
+        return SignedTransaction(txn, base64.b64encode(signature).decode(), authorizing_address)
+    
+    def sign_transactions(
+        self, 
+        txn_group: List[Transaction], 
+        indexes: List[int]
+    ) -> List[SignedTransaction]:
+        """Sign the transactions at the given indexes of a group."""
+        return [self.sign(txn_group[i]) for i in indexes]
 
 
 class SeltraPoolClient:
@@ -74,7 +180,7 @@ class SeltraPoolClient:
     
     def __init__(
         self,
-        algod_client: algod.AlgodClient,
+        algod_client: AsyncAlgodClient,
         pool_app_id: Optional[int] = None,
         asset_x_id: Optional[int] = None,
         asset_y_id: Optional[int] = None
@@ -83,7 +189,7 @@ class SeltraPoolClient:
         Initialize the pool client.
         
         Args:
-            algod_client: Algorand client instance
+            algod_client: Shared async Algorand client
             pool_app_id: Existing pool application ID
             asset_x_id: First asset ID in the pair
             asset_y_id: Second asset ID in the pair
@@ -96,15 +202,25 @@ class SeltraPoolClient:
         # Contract ABI (simplified - in production would load from JSON)
         self.contract_abi = None  # Will be loaded when contract is available
         
-        # Cache for pool info
+        # Per-operation transaction templates and derived pool address
+        self._templates: Dict[Tuple[str, int, int, int], TransactionTemplate] = {}
+        self._pool_address: Optional[str] = None
+        self._pool_address_app_id: Optional[int] = None
+        
+        # Pool info cache, versioned by the round it was read at
         self._pool_info_cache: Optional[PoolInfo] = None
-        self._cache_timestamp = 0
-        self.cache_duration = 30  # 30 seconds cache
+        self._pool_info_lock = asyncio.Lock()
+        
+        # Last round seen from algod (status, confirmations, account reads)
+        self.last_observed_round = 0
+        self._round_observed_at = 0.0
+        self.round_poll_interval = 1.0  # Seconds; below block time so new rounds are noticed
         
     async def connect(self) -> bool:
         """Test connection to Algorand node."""
         try:
-            status = self.algod_client.status()
+            status = await self.algod_client.status()
+            self.observe_round(status.get('last-round', 0))
             logger.info(f"Connected to Algorand node - Round: {status.get('last-round', 'unknown')}")
             return True
         except Exception as e:
@@ -113,7 +229,7 @@ class SeltraPoolClient:
     
     async def create_test_assets(
         self, 
-        creator_private_key: str,
+        creator_private_key: Union[str, WalletSigner],
         asset_x_config: Dict[str, Any],
         asset_y_config: Dict[str, Any]
     ) -> Tuple[int, int]:
@@ -121,18 +237,19 @@ class SeltraPoolClient:
         Create test ASA tokens for the pool.
         
         Args:
-            creator_private_key: Private key of asset creator
+            creator_private_key: Private key (or WalletSigner) of asset creator
             asset_x_config: Config for asset X (e.g., ETH-like)
             asset_y_config: Config for asset Y (e.g., USDC-like)
             
         Returns:
             Tuple of (asset_x_id, asset_y_id)
         """
-        creator_address = account.address_from_private_key(creator_private_key)
+        signer = self._resolve_signer(creator_private_key)
+        creator_address = signer.address
         
         try:
             # Get suggested parameters
-            params = self.algod_client.suggested_params()
+            params = await self.algod_client.suggested_params()
             
             # Create Asset X
             asset_x_txn = AssetCreateTxn(
@@ -150,17 +267,17 @@ class SeltraPoolClient:
             )
             
             # Sign and send
-            signed_txn = asset_x_txn.sign(creator_private_key)
-            txn_id_x = self.algod_client.send_transaction(signed_txn)
+            signed_txn = signer.sign(asset_x_txn)
+            txn_id_x = await self.algod_client.send_transaction(signed_txn)
             
             # Wait for confirmation
-            result_x = wait_for_confirmation(self.algod_client, txn_id_x, 4)
+            result_x = await wait_for_confirmation(self.algod_client, txn_id_x, 4)
             asset_x_id = result_x['asset-index']
             
             logger.info(f"Created asset X ({asset_x_config['name']}): {asset_x_id}")
             
             # Create Asset Y
-            params = self.algod_client.suggested_params()  # Refresh params
+            params = await self.algod_client.suggested_params()  # Refresh params
             asset_y_txn = AssetCreateTxn(
                 sender=creator_address,
                 sp=params,
@@ -175,10 +292,10 @@ class SeltraPoolClient:
                 decimals=asset_y_config["decimals"]
             )
             
-            signed_txn = asset_y_txn.sign(creator_private_key)
-            txn_id_y = self.algod_client.send_transaction(signed_txn)
+            signed_txn = signer.sign(asset_y_txn)
+            txn_id_y = await self.algod_client.send_transaction(signed_txn)
             
-            result_y = wait_for_confirmation(self.algod_client, txn_id_y, 4)
+            result_y = await wait_for_confirmation(self.algod_client, txn_id_y, 4)
             asset_y_id = result_y['asset-index']
             
             logger.info(f"Created asset Y ({asset_y_config['name']}): {asset_y_id}")
@@ -214,14 +331,14 @@ class SeltraPoolClient:
     
     async def initialize_pool(
         self,
-        private_key: str,
+        private_key: Union[str, WalletSigner],
         initial_price: int  # Fixed point price
     ) -> TransactionResult:
         """
         Initialize the pool with assets and starting price.
         
         Args:
-            private_key: Private key of initializer
+            private_key: Private key (or WalletSigner) of initializer
             initial_price: Starting price in fixed point format
             
         Returns:
@@ -236,8 +353,9 @@ class SeltraPoolClient:
         start_time = time.time()
         
         try:
-            sender_address = account.address_from_private_key(private_key)
-            params = self.algod_client.suggested_params()
+            signer = self._resolve_signer(private_key)
+            sender_address = signer.address
+            params = await self.algod_client.suggested_params()
             
             # Create application call transaction
             # Note: This is simplified - real implementation would use ATC
@@ -256,21 +374,24 @@ class SeltraPoolClient:
             )
             
             # Sign and send
-            signed_txn = app_call_txn.sign(private_key)
-            txn_id = self.algod_client.send_transaction(signed_txn)
+            signed_txn = signer.sign(app_call_txn)
+            txn_id = await self.algod_client.send_transaction(signed_txn)
+            submit_time = time.time() - start_time
             
             # Wait for confirmation
-            result = wait_for_confirmation(self.algod_client, txn_id, 4)
+            result = await wait_for_confirmation(self.algod_client, txn_id, 4)
             
             execution_time = time.time() - start_time
             
+            self.observe_round(result['confirmed-round'])
             logger.info(f"Pool initialized successfully - TxnID: {txn_id}")
             
             return TransactionResult(
                 success=True,
                 txn_id=txn_id,
                 confirmed_round=result['confirmed-round'],
-                execution_time=execution_time
+                execution_time=execution_time,
+                submit_time=submit_time
             )
             
         except Exception as e:
@@ -283,9 +404,72 @@ class SeltraPoolClient:
                 execution_time=execution_time
             )
     
+    async def submit_swap(
+        self,
+        private_key: Union[str, WalletSigner],
+        asset_in_id: int,
+        asset_out_id: int,
+        amount_in: int,
+        min_amount_out: int,
+        deadline: Optional[int] = None
+    ) -> SwapSubmission:
+        """
+        Build, sign and broadcast a swap without waiting for confirmation.
+        
+        Args:
+            private_key: Private key (or WalletSigner) of swapper
+            asset_in_id: Input asset ID
+            asset_out_id: Output asset ID
+            amount_in: Input amount (in base units)
+            min_amount_out: Minimum output amount (slippage protection)
+            deadline: Transaction deadline timestamp
+        
+        Returns:
+            SwapSubmission identifying the broadcast group
+        
+        Raises:
+            ValueError: If the pool is not configured
+            AlgodHTTPError: If algod rejects the group
+        """
+        if not self.pool_app_id:
+            raise ValueError("Pool app ID not set")
+        
+        signer = self._resolve_signer(private_key)
+        sender_address = signer.address
+        params = await self.algod_client.suggested_params()
+        
+        # Set deadline if not provided
+        if not deadline:
+            deadline = int(time.time()) + 3600  # 1 hour from now
+        
+        # Fill the cached swap template (deposit + app call)
+        template = self._get_template("swap", asset_in_id, asset_out_id, params)
+        txns = self._fill_template(
+            template,
+            sender_address,
+            params,
+            deposits=[amount_in],
+            args=[amount_in, min_amount_out, deadline]
+        )
+        
+        atc = AtomicTransactionComposer()
+        for txn in txns:
+            atc.add_transaction(TransactionWithSigner(txn, signer))
+        
+        # Sign the group and submit it over the shared async transport
+        signed = atc.gather_signatures()
+        txn_id = await self.algod_client.send_transactions(signed)
+        
+        return SwapSubmission(
+            txn_id=txn_id,
+            app_call_txn_id=signed[-1].get_txid(),
+            sender=sender_address,
+            last_valid_round=params.last
+        )
+    
     async def execute_swap(
         self,
-        private_key: str,
+        private_key: Union[str, WalletSigner],
         asset_in_id: int,
         asset_out_id: int,
         amount_in: int,
@@ -296,7 +480,7 @@ class SeltraPoolClient:
         Execute a token swap through the pool.
         
         Args:
-            private_key: Private key of swapper
+            private_key: Private key (or WalletSigner) of swapper
             asset_in_id: Input asset ID
             asset_out_id: Output asset ID
             amount_in: Input amount (in base units)
@@ -312,60 +496,24 @@ class SeltraPoolClient:
         start_time = time.time()
         
         try:
-            sender_address = account.address_from_private_key(private_key)
-            params = self.algod_client.suggested_params()
-            
-            # Set deadline if not provided
-            if not deadline:
-                deadline = int(time.time()) + 3600  # 1 hour from now
-            
-            # Create atomic transaction composer for complex transactions
-            atc = AtomicTransactionComposer()
-            signer = AccountTransactionSigner(private_key)
-            
-            # Asset transfer transaction (user -> pool)
-            asset_transfer_txn = AssetTransferTxn(
-                sender=sender_address,
-                sp=params,
-                receiver=self.get_pool_address(),  # Pool contract address
-                amt=amount_in,
-                index=asset_in_id
+            submission = await self.submit_swap(
+                private_key, asset_in_id, asset_out_id, amount_in, min_amount_out, deadline
             )
-            
-            atc.add_transaction(TransactionWithSigner(asset_transfer_txn, signer))
-            
-            # Application call for swap
-            app_call_txn = ApplicationCallTxn(
-                sender=sender_address,
-                sp=params,
-                index=self.pool_app_id,
-                on_complete=0,  # NoOp
-                app_args=[
-                    "swap".encode(),
-                    asset_in_id.to_bytes(8, 'big'),
-                    asset_out_id.to_bytes(8, 'big'),
-                    amount_in.to_bytes(8, 'big'),
-                    min_amount_out.to_bytes(8, 'big'),
-                    deadline.to_bytes(8, 'big')
-                ],
-                foreign_assets=[asset_in_id, asset_out_id],
-                foreign_apps=[self.pool_app_id]
-            )
-            
-            atc.add_transaction(TransactionWithSigner(app_call_txn, signer))
-            
-            # Execute transaction group
-            result = atc.execute(self.algod_client, 4)
+            txn_id = submission.txn_id
+            submit_time = time.time() - start_time
+            result = await wait_for_confirmation(self.algod_client, txn_id, 4)
             
             execution_time = time.time() - start_time
             
-            logger.info(f"Swap executed successfully - Group ID: {result.tx_ids[0]}")
+            self.observe_round(result['confirmed-round'])
+            logger.info(f"Swap executed successfully - Group ID: {txn_id}")
             
             return TransactionResult(
                 success=True,
-                txn_id=result.tx_ids[0],
-                confirmed_round=result.confirmed_round,
-                execution_time=execution_time
+                txn_id=txn_id,
+                confirmed_round=result['confirmed-round'],
+                execution_time=execution_time,
+                submit_time=submit_time
             )
             
         except Exception as e:
@@ -380,7 +528,7 @@ class SeltraPoolClient:
     
     async def add_liquidity(
         self,
-        private_key: str,
+        private_key: Union[str, WalletSigner],
         amount_x_desired: int,
         amount_y_desired: int,
         amount_x_min: int,
@@ -392,7 +540,7 @@ class SeltraPoolClient:
         Add liquidity to a specific range in the pool.
         
         Args:
-            private_key: Private key of liquidity provider
+            private_key: Private key (or WalletSigner) of liquidity provider
             amount_x_desired: Desired amount of asset X
             amount_y_desired: Desired amount of asset Y
             amount_x_min: Minimum amount of asset X
@@ -409,72 +557,50 @@ class SeltraPoolClient:
         start_time = time.time()
         
         try:
-            sender_address = account.address_from_private_key(private_key)
-            params = self.algod_client.suggested_params()
+            signer = self._resolve_signer(private_key)
+            sender_address = signer.address
+            params = await self.algod_client.suggested_params()
             
             if not deadline:
                 deadline = int(time.time()) + 3600
             
-            # Create atomic transaction composer
-            atc = AtomicTransactionComposer()
-            signer = AccountTransactionSigner(private_key)
-            
-            # Asset transfer X
-            if amount_x_desired > 0:
-                transfer_x_txn = AssetTransferTxn(
-                    sender=sender_address,
-                    sp=params,
-                    receiver=self.get_pool_address(),
-                    amt=amount_x_desired,
-                    index=self.asset_x_id
-                )
-                atc.add_transaction(TransactionWithSigner(transfer_x_txn, signer))
-            
-            # Asset transfer Y  
-            if amount_y_desired > 0:
-                transfer_y_txn = AssetTransferTxn(
-                    sender=sender_address,
-                    sp=params,
-                    receiver=self.get_pool_address(),
-                    amt=amount_y_desired,
-                    index=self.asset_y_id
-                )
-                atc.add_transaction(TransactionWithSigner(transfer_y_txn, signer))
-            
-            # Application call for add_liquidity
-            app_call_txn = ApplicationCallTxn(
-                sender=sender_address,
-                sp=params,
-                index=self.pool_app_id,
-                on_complete=0,
-                app_args=[
-                    "add_liquidity".encode(),
-                    self.asset_x_id.to_bytes(8, 'big'),
-                    self.asset_y_id.to_bytes(8, 'big'),
-                    amount_x_desired.to_bytes(8, 'big'),
-                    amount_y_desired.to_bytes(8, 'big'),
-                    amount_x_min.to_bytes(8, 'big'),
-                    amount_y_min.to_bytes(8, 'big'),
-                    range_id.to_bytes(8, 'big'),
-                    deadline.to_bytes(8, 'big')
-                ],
-                foreign_assets=[self.asset_x_id, self.asset_y_id]
+            # Fill the cached add_liquidity template (deposits X/Y + app call)
+            template = self._get_template("add_liquidity", self.asset_x_id, self.asset_y_id, params)
+            txns = self._fill_template(
+                template,
+                sender_address,
+                params,
+                deposits=[amount_x_desired, amount_y_desired],
+                args=[
+                    amount_x_desired,
+                    amount_y_desired,
+                    amount_x_min,
+                    amount_y_min,
+                    range_id,
+                    deadline
+                ]
             )
             
-            atc.add_transaction(TransactionWithSigner(app_call_txn, signer))
+            atc = AtomicTransactionComposer()
+            for txn in txns:
+                atc.add_transaction(TransactionWithSigner(txn, signer))
             
-            # Execute
-            result = atc.execute(self.algod_client, 4)
+            # Sign the group and submit it over the shared async transport
+            txn_id = await self.algod_client.send_transactions(atc.gather_signatures())
+            submit_time = time.time() - start_time
+            result = await wait_for_confirmation(self.algod_client, txn_id, 4)
             
             execution_time = time.time() - start_time
             
-            logger.info(f"Liquidity added successfully - Group ID: {result.tx_ids[0]}")
+            self.observe_round(result['confirmed-round'])
+            logger.info(f"Liquidity added successfully - Group ID: {txn_id}")
             
             return TransactionResult(
                 success=True,
-                txn_id=result.tx_ids[0],
-                confirmed_round=result.confirmed_round,
-                execution_time=execution_time
+                txn_id=txn_id,
+                confirmed_round=result['confirmed-round'],
+                execution_time=execution_time,
+                submit_time=submit_time
             )
             
         except Exception as e:
@@ -489,7 +615,7 @@ class SeltraPoolClient:
     
     async def remove_liquidity(
         self,
-        private_key: str,
+        private_key: Union[str, WalletSigner],
         lp_token_amount: int,
         amount_x_min: int,
         amount_y_min: int,
@@ -500,7 +626,7 @@ class SeltraPoolClient:
         Remove liquidity from a specific range.
         
         Args:
-            private_key: Private key of liquidity provider
+            private_key: Private key (or WalletSigner) of liquidity provider
             lp_token_amount: Amount of LP tokens to burn
             amount_x_min: Minimum asset X to receive
             amount_y_min: Minimum asset Y to receive
@@ -516,43 +642,40 @@ class SeltraPoolClient:
         start_time = time.time()
         
         try:
-            sender_address = account.address_from_private_key(private_key)
-            params = self.algod_client.suggested_params()
+            signer = self._resolve_signer(private_key)
+            sender_address = signer.address
+            params = await self.algod_client.suggested_params()
             
             if not deadline:
                 deadline = int(time.time()) + 3600
             
-            # Application call for remove_liquidity
-            app_call_txn = ApplicationCallTxn(
-                sender=sender_address,
-                sp=params,
-                index=self.pool_app_id,
-                on_complete=0,
-                app_args=[
-                    "remove_liquidity".encode(),
-                    lp_token_amount.to_bytes(8, 'big'),
-                    amount_x_min.to_bytes(8, 'big'),
-                    amount_y_min.to_bytes(8, 'big'),
-                    range_id.to_bytes(8, 'big'),
-                    deadline.to_bytes(8, 'big')
-                ],
-                foreign_assets=[self.asset_x_id, self.asset_y_id]
+            # Fill the cached remove_liquidity template (app call only)
+            template = self._get_template("remove_liquidity", self.asset_x_id, self.asset_y_id, params)
+            app_call_txn, = self._fill_template(
+                template,
+                sender_address,
+                params,
+                deposits=[],
+                args=[lp_token_amount, amount_x_min, amount_y_min, range_id, deadline]
             )
             
-            signed_txn = app_call_txn.sign(private_key)
-            txn_id = self.algod_client.send_transaction(signed_txn)
+            signed_txn = signer.sign(app_call_txn)
+            txn_id = await self.algod_client.send_transaction(signed_txn)
+            submit_time = time.time() - start_time
             
-            result = wait_for_confirmation(self.algod_client, txn_id, 4)
+            result = await wait_for_confirmation(self.algod_client, txn_id, 4)
             
             execution_time = time.time() - start_time
             
+            self.observe_round(result['confirmed-round'])
             logger.info(f"Liquidity removed successfully - TxnID: {txn_id}")
             
             return TransactionResult(
                 success=True,
                 txn_id=txn_id,
                 confirmed_round=result['confirmed-round'],
-                execution_time=execution_time
+                execution_time=execution_time,
+                submit_time=submit_time
             )
             
         except Exception as e:
@@ -565,17 +688,210 @@ class SeltraPoolClient:
                 execution_time=execution_time
             )
     
+    @staticmethod
+    def _resolve_signer(private_key: Union[str, WalletSigner]) -> WalletSigner:
+        """Accept either a pre-built signer or a raw base64 private key."""
+        if isinstance(private_key, WalletSigner):
+            return private_key
+        return WalletSigner(private_key)
+    
     def get_pool_address(self) -> str:
-        """Get the pool contract address."""
+        """Get the pool contract address (derived once per app ID)."""
         if not self.pool_app_id:
             raise ValueError("Pool app ID not set")
         
-        # Convert app ID to address
-        return encoding.encode_address(encoding.checksum(b"appID" + self.pool_app_id.to_bytes(8, "big")))
+        if self._pool_address_app_id != self.pool_app_id:
+            # Convert app ID to address
+            self._pool_address = encoding.encode_address(
+                encoding.checksum(b"appID" + self.pool_app_id.to_bytes(8, "big"))
+            )
+            self._pool_address_app_id = self.pool_app_id
+        
+        return self._pool_address
+    
+    def _get_template(
+        self, 
+        operation: str, 
+        asset_a: int, 
+        asset_b: int, 
+        params: SuggestedParams
+    ) -> TransactionTemplate:
+        """Get (building on first use) the template for an operation on this pool."""
+        key = (operation, self.pool_app_id, asset_a, asset_b)
+        template = self._templates.get(key)
+        
+        if template is None:
+            template = self._build_template(operation, asset_a, asset_b, params)
+            self._templates[key] = template
+        
+        return template
+    
+    def _build_template(
+        self, 
+        operation: str, 
+        asset_a: int, 
+        asset_b: int, 
+        params: SuggestedParams
+    ) -> TransactionTemplate:
+        """
+        Precompute every invariant field of an operation's transaction group.
+        
+        Args:
+            operation: "swap", "add_liquidity" or "remove_liquidity"
+            asset_a: Input asset (swap) or asset X (liquidity operations)
+            asset_b: Output asset (swap) or asset Y (liquidity operations)
+            params: Current suggested params (only network fields are kept)
+        
+        Returns:
+            Template with placeholder sender, amounts and variable args
+        """
+        pool_address = self.get_pool_address()
+        # Fee and validity rounds are overwritten per call; maximal placeholders
+        # keep their fields in the encoding (a zero fee is omitted) at full width
+        template_params = SuggestedParams(
+            MAX_UINT64, MAX_UINT64, MAX_UINT64, params.gh, params.gen, flat_fee=True
+        )
+        
+        asset_args = [asset_a.to_bytes(8, 'big'), asset_b.to_bytes(8, 'big')]
+        foreign_apps = None
+        
+        if operation == "swap":
+            deposit_assets = [asset_a]
+            fixed_args = ["swap".encode()] + asset_args
+            variable_args = 3  # amount_in, min_amount_out, deadline
+            foreign_apps = [self.pool_app_id]
+        elif operation == "add_liquidity":
+            deposit_assets = [asset_a, asset_b]
+            fixed_args = ["add_liquidity".encode()] + asset_args
+            variable_args = 6  # amounts desired/min, range_id, deadline
+        elif operation == "remove_liquidity":
+            deposit_assets = []
+            fixed_args = ["remove_liquidity".encode()]
+            variable_args = 5  # lp amount, amounts min, range_id, deadline
+        else:
+            raise ValueError(f"Unknown pool operation: {operation}")
+        
+        deposits = []
+        for asset_id in deposit_assets:
+            if asset_id == 0:
+                deposit = PaymentTxn(
+                    sender=pool_address,
+                    sp=template_params,
+                    receiver=pool_address,
+                    amt=MAX_UINT64
+                )
+            else:
+                deposit = AssetTransferTxn(
+                    sender=pool_address,
+                    sp=template_params,
+                    receiver=pool_address,
+                    amt=MAX_UINT64,
+                    index=asset_id
+                )
+            deposits.append(deposit)
+        
+        app_call = ApplicationCallTxn(
+            sender=pool_address,
+            sp=template_params,
+            index=self.pool_app_id,
+            on_complete=0,  # NoOp
+            app_args=fixed_args + [MAX_UINT64.to_bytes(8, 'big')] * variable_args,
+            foreign_assets=[asset_a, asset_b],
+            foreign_apps=foreign_apps
+        )
+        
+        # Sizes are taken with every variable field at its widest, so fees never undershoot
+        sizes = [txn.estimate_size() for txn in deposits + [app_call]]
+        
+        logger.debug(f"Built {operation} template for pool {self.pool_app_id} ({asset_a}/{asset_b})")
+        
+        return TransactionTemplate(
+            deposits=deposits,
+            app_call=app_call,
+            fixed_args=fixed_args,
+            sizes=sizes
+        )
+    
+    def _fill_template(
+        self,
+        template: TransactionTemplate,
+        sender: str,
+        params: SuggestedParams,
+        deposits: List[int],
+        args: List[int]
+    ) -> List[Transaction]:
+        """
+        Instantiate a template: copy it and write only the per-call fields.
+        
+        Args:
+            template: Template from _get_template
+            sender: Sender address
+            params: Suggested params for validity window and fees
+            deposits: Deposit amounts aligned with template.deposits (zero skips the transfer)
+            args: Variable uint64 app args appended after the fixed args
+        
+        Returns:
+            Transactions in group order
+        """
+        min_fee = constants.min_txn_fee if params.min_fee is None else params.min_fee
+        
+        def stamp(txn_template: Transaction, size: int) -> Transaction:
+            txn = copy.copy(txn_template)
+            txn.sender = sender
+            txn.fee = params.fee if params.flat_fee else max(size * params.fee, min_fee)
+            txn.first_valid_round = params.first
+            txn.last_valid_round = params.last
+            txn.genesis_id = params.gen
+            txn.genesis_hash = params.gh
+            return txn
+        
+        txns = []
+        for deposit_template, size, amount in zip(template.deposits, template.sizes, deposits):
+            if amount <= 0:
+                continue
+            
+            txn = stamp(deposit_template, size)
+            if isinstance(txn, PaymentTxn):
+                txn.amt = amount
+            else:
+                txn.amount = amount
+            txns.append(txn)
+        
+        app_call = stamp(template.app_call, template.sizes[-1])
+        app_call.app_args = template.fixed_args + [value.to_bytes(8, 'big') for value in args]
+        txns.append(app_call)
+        
+        return txns
+    
+    def observe_round(self, round_number: Optional[int]):
+        """Record a round seen in any algod response."""
+        if not round_number:
+            return
+        
+        if round_number >= self.last_observed_round:
+            self.last_observed_round = round_number
+            self._round_observed_at = time.time()
+    
+    async def get_current_round(self) -> int:
+        """
+        Get the latest known round, asking algod only if the last observation is stale.
+        
+        Returns:
+            Last observed round number
+        """
+        if time.time() - self._round_observed_at >= self.round_poll_interval:
+            status = await self.algod_client.status()
+            self.observe_round(status.get('last-round', 0))
+            self._round_observed_at = time.time()
+        
+        return self.last_observed_round
     
     async def get_pool_info(self, force_refresh: bool = False) -> Optional[PoolInfo]:
         """
-        Get current pool information with caching.
+        Get current pool information, read at most once per round.
+        
+        Concurrent callers in the same round share a single application_info
+        read; the cached value is served until a newer round is observed.
         
         Args:
             force_refresh: Skip cache and fetch fresh data
@@ -583,44 +899,45 @@ class SeltraPoolClient:
         Returns:
             Pool information or None if unavailable
         """
-        current_time = time.time()
-        
-        # Return cached data if valid
-        if (not force_refresh and 
-            self._pool_info_cache and 
-            current_time - self._cache_timestamp < self.cache_duration):
-            return self._pool_info_cache
+        if not self.pool_app_id:
+            return None
         
-        try:
-            if not self.pool_app_id:
-                return None
-            
-            # Fetch application info
-            app_info = self.algod_client.application_info(self.pool_app_id)
-            
-            # Parse global state (simplified - would need proper parsing)
-            global_state = app_info.get('params', {}).get('global-state', [])
-            
-            # Extract pool data from global state
-            # Note: This is simplified - real implementation would parse the state properly
-            pool_info = PoolInfo(
-                app_id=self.pool_app_id,
-                asset_x_id=self.asset_x_id or 0,
-                asset_y_id=self.asset_y_id or 0,
-                current_price=0,  # Would parse from state
-                total_liquidity=0,  # Would parse from state
-                is_initialized=True  # Would check from state
-            )
-            
-            # Update cache
-            self._pool_info_cache = pool_info
-            self._cache_timestamp = current_time
-            
-            return pool_info
+        async with self._pool_info_lock:
+            try:
+                current_round = await self.get_current_round()
+                
+                # Return cached data if it was read in the current round
+                if (not force_refresh and 
+                    self._pool_info_cache and 
+                    self._pool_info_cache.round >= current_round):
+                    return self._pool_info_cache
+                
+                # Fetch application info and decode SeltraPoolCore global state
+                app_info = await self.algod_client.application_info(self.pool_app_id)
+                state = decode_global_state(app_info.get('params', {}).get('global-state', []))
+                
+                pool_info = PoolInfo(
+                    app_id=self.pool_app_id,
+                    asset_x_id=state.get('asset_x_id', self.asset_x_id or 0),
+                    asset_y_id=state.get('asset_y_id', self.asset_y_id or 0),
+                    current_price=state.get('current_price', 0),
+                    total_liquidity=state.get('total_liquidity', 0),
+                    is_initialized=bool(state.get('is_initialized', 0)),
+                    range1_liquidity=state.get('range1_liquidity', 0),
+                    range2_liquidity=state.get('range2_liquidity', 0),
+                    range3_liquidity=state.get('range3_liquidity', 0),
+                    current_fee_rate=state.get('current_fee_rate', 0),
+                    round=current_round
+                )
+                
+                # Update cache
+                self._pool_info_cache = pool_info
+                
+                return pool_info
             
-        except Exception as e:
-            logger.error(f"Failed to get pool info: {e}")
-            return None
+            except Exception as e:
+                logger.error(f"Failed to get pool info: {e}")
+                return None
     
     async def get_asset_balance(self, address: str, asset_id: int) -> int:
         """
@@ -636,11 +953,13 @@ class SeltraPoolClient:
         try:
             if asset_id == 0:
                 # ALGO balance
-                account_info = self.algod_client.account_info(address)
+                account_info = await self.algod_client.account_info(address)
+                self.observe_round(account_info.get('round'))
                 return account_info.get('amount', 0)
             else:
                 # ASA balance
-                account_info = self.algod_client.account_info(address)
+                account_info = await self.algod_client.account_info(address)
+                self.observe_round(account_info.get('round'))
                 assets = account_info.get('assets', [])
                 
                 for asset in assets:
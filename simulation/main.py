@@ -7,13 +7,27 @@ the Seltra AMM dynamic liquidity management capabilities.
 
 import asyncio
 import logging
-from fastapi import FastAPI
+import os
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from dataclasses import asdict
+from typing import Dict, List
 
 from .market_simulator import MarketSimulator
 from .blockchain_simulator import AlgorandTransactionSimulator
+from .algod_client import BlockFollower
+from .swap_queue import SwapSubmissionQueue
+from .broadcast import BroadcastHub, MetricsDeltaPublisher, TICK_CHANNEL
+from .shared_state import (
+    SharedStatePublisher, SharedStateReader, DEFAULT_SHARED_STATE_NAME, ENGINE_ROLE, READER_ROLE, STANDALONE_ROLE
+)
+from .startup import StartupTracker
+from .profiler import PROFILER
+from .telemetry import REGISTRY, PROMETHEUS_CONTENT_TYPE, queue_depth_sources, cache_stats_sources, cache_size_sources
 from .api.routes import router
+from .api import routes as api_routes
 
 
 # Configure logging
@@ -23,15 +37,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Process role: "standalone" (default) runs everything in this process; an
+# "engine" also publishes its state to shared memory, which any number of
+# "reader" processes (e.g. uvicorn --workers N) serve read endpoints from
+SIMULATION_ROLE = os.getenv("SELTRA_ROLE", STANDALONE_ROLE)
+SHARED_STATE_NAME = os.getenv("SELTRA_SHARED_STATE", DEFAULT_SHARED_STATE_NAME)
+
+# POST endpoints that only read state and can be served by readers
+READER_POST_PATHS = {"/api/v1/trade/simulate", "/api/v1/trade/simulate-batch"}
+
 # Global simulator instances
 simulator: MarketSimulator = None
 blockchain_simulator: AlgorandTransactionSimulator = None
+event_hub: BroadcastHub = None
+swap_queue: SwapSubmissionQueue = None
+shared_state_reader: SharedStateReader = None
+startup: StartupTracker = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application startup and shutdown."""
-    global simulator, blockchain_simulator
+    global simulator, blockchain_simulator, event_hub, swap_queue, shared_state_reader, startup
+    
+    startup = StartupTracker()
+    
+    # Event-loop lag probe and blocked-loop watchdog (see /api/v1/debug/profile)
+    profiler_task = asyncio.create_task(PROFILER.monitor_loop())
+    
+    if SIMULATION_ROLE == READER_ROLE:
+        # Read-only worker: no simulation here, serve the engine's snapshot
+        logger.info(f"Starting read-only API worker on shared state '{SHARED_STATE_NAME}'")
+        shared_state_reader = SharedStateReader(SHARED_STATE_NAME)
+        attach_task = asyncio.create_task(_wait_for_shared_state())
+        try:
+            yield
+        finally:
+            attach_task.cancel()
+            profiler_task.cancel()
+            shared_state_reader.close()
+        return
+    
+    for name in ("market", "algod", "wallets", "balances"):
+        startup.add(name)
+    startup.add("funding", required=False)
+    startup.add("blockchain_simulation")
+    startup.add("swap_queue")
     
     # Startup
     logger.info("Starting Seltra Simulation Services...")
@@ -43,10 +94,11 @@ async def lifespan(app: FastAPI):
         tick_interval=1.0
     )
     
+    # Push streams (SSE/WebSocket) fan out from one hub
+    event_hub = BroadcastHub()
+    
     # Initialize blockchain simulator with market simulator reference
     # Load configuration from environment variables
-    import os
-
     pool_app_id = os.getenv('SELTRA_POOL_APP_ID')
     if pool_app_id and pool_app_id.strip():
         pool_app_id = int(pool_app_id)
@@ -86,22 +138,64 @@ async def lifespan(app: FastAPI):
         pool_app_id=pool_app_id,
         asset_x_id=asset_x_id,
         asset_y_id=asset_y_id,
-        faucet_private_key=faucet_private_key
+        faucet_private_key=faucet_private_key,
+        event_hub=event_hub
     )
     
-    try:
-        # Initialize blockchain simulator
-        await blockchain_simulator.initialize()
-    except Exception as e:
-        logger.warning(f"Blockchain simulator initialization failed: {e}")
-        logger.info("Continuing with market simulation only...")
+    # Share the round-cached pool reader and the algod transport with the
+    # contract backend service (one connection pool and long-poll limit)
+    if api_routes.CONTRACT_INTEGRATION_AVAILABLE:
+        if blockchain_simulator.pool_client:
+            api_routes.backend_service.attach_pool_reader(blockchain_simulator.pool_client)
+        api_routes.backend_service.attach_block_follower(BlockFollower(blockchain_simulator.algod_client))
     
-    # Start simulations in background tasks
+    # The market and read routes serve immediately; the blockchain side
+    # (algod, wallets, balances, funding) warms up in the background
     market_task = asyncio.create_task(simulator.run_simulation())
-    blockchain_task = None
+    startup.mark_ready("market")
+    
+    blockchain_tasks: List[asyncio.Task] = []
+    warmup_task = asyncio.create_task(_warm_up_blockchain(blockchain_tasks))
+    
+    # Scrape-time gauges for queues and caches (see /metrics)
+    queue_depth_sources({
+        "swap_submissions": lambda: swap_queue.queue.qsize() if swap_queue else 0,
+        "swaps_in_flight": lambda: len(swap_queue.in_flight) if swap_queue else 0,
+        "pending_transactions": lambda: len(blockchain_simulator.transaction_queue),
+        "tick_subscribers": lambda: sum(q.qsize() for q in simulator.tick_subscribers),
+        "stream_subscribers": lambda: sum(sub.queue.qsize() for sub in event_hub.subscriptions),
+    })
+    cache_sources = {"response": _response_cache_requests}
+    if api_routes.CONTRACT_INTEGRATION_AVAILABLE:
+        cache_sources["contract_sync"] = lambda: api_routes.backend_service.sync_stats
+    cache_stats_sources(cache_sources)
+    cache_size_sources({"response": lambda: len(api_routes.response_cache.entries)})
     
+    # Publish ticks and metric deltas once for all stream clients
+    tick_task = asyncio.create_task(event_hub.pump(TICK_CHANNEL, simulator.subscribe_ticks(), asdict))
+    metric_sources = {"market": simulator.get_metrics}
     if blockchain_simulator:
-        blockchain_task = asyncio.create_task(blockchain_simulator.start_simulation())
+        metric_sources["blockchain"] = blockchain_simulator.get_metrics
+    metrics_publisher = MetricsDeltaPublisher(event_hub, metric_sources)
+    metrics_task = asyncio.create_task(metrics_publisher.run())
+    
+    # Rebalance from the live price stream instead of on request
+    rebalancer_task = None
+    if api_routes.CONTRACT_INTEGRATION_AVAILABLE:
+        rebalancer = api_routes.backend_service.rebalancer
+        rebalancer_task = asyncio.create_task(rebalancer.run(simulator.subscribe_ticks()))
+    
+    # Per-round chain work (coalesced oracle writes) follows the chain tip
+    follower_task = None
+    if api_routes.CONTRACT_INTEGRATION_AVAILABLE and api_routes.backend_service.block_follower:
+        follower_task = asyncio.create_task(api_routes.backend_service.block_follower.run())
+    
+    # Engine role: publish state for read-only workers
+    state_publisher = None
+    publisher_task = None
+    if SIMULATION_ROLE == ENGINE_ROLE:
+        state_publisher = SharedStatePublisher(simulator, blockchain_simulator, SHARED_STATE_NAME)
+        publisher_task = asyncio.create_task(state_publisher.run())
     
     try:
         yield
@@ -109,23 +203,122 @@ async def lifespan(app: FastAPI):
         # Shutdown
         logger.info("Shutting down Simulation Services...")
         
+        if state_publisher:
+            state_publisher.stop()
         if simulator:
             simulator.stop_simulation()
+        warmup_task.cancel()
+        metrics_publisher.stop()
+        if swap_queue:
+            swap_queue.stop()
+        if rebalancer_task:
+            api_routes.backend_service.rebalancer.stop()
+        if follower_task:
+            api_routes.backend_service.block_follower.stop()
         if blockchain_simulator:
             blockchain_simulator.stop_simulation()
             await blockchain_simulator.cleanup()
         
         # Cancel background tasks
         market_task.cancel()
-        if blockchain_task:
-            blockchain_task.cancel()
+        tick_task.cancel()
+        metrics_task.cancel()
+        for task in blockchain_tasks:
+            task.cancel()
+        if rebalancer_task:
+            rebalancer_task.cancel()
+        if follower_task:
+            follower_task.cancel()
+        if publisher_task:
+            publisher_task.cancel()
+        profiler_task.cancel()
         
         try:
             await market_task
-            if blockchain_task:
-                await blockchain_task
+            await tick_task
+            await metrics_task
+            await asyncio.gather(warmup_task, *blockchain_tasks, return_exceptions=True)
+            if rebalancer_task:
+                await rebalancer_task
+            if follower_task:
+                await follower_task
+            if publisher_task:
+                await publisher_task
+            await profiler_task
         except asyncio.CancelledError:
             pass
+        
+        if state_publisher:
+            state_publisher.close()
+
+
+async def _warm_up_blockchain(tasks: List[asyncio.Task]):
+    """
+    Initialize the blockchain simulator phase by phase, then start it.
+    
+    Runs in the background so startup doesn't wait for algod or funding;
+    /ready reports each phase. Started tasks are appended to `tasks`.
+    """
+    global swap_queue
+    pool_client = blockchain_simulator.pool_client
+    
+    try:
+        async with startup.phase("algod") as phase:
+            await blockchain_simulator.connect(
+                retry=True, on_retry=lambda e: setattr(phase, "detail", f"Waiting for algod: {e}")
+            )
+            phase.detail = None
+        async with startup.phase("wallets") as phase:
+            phase.detail = f"{await blockchain_simulator.load_wallets()} wallets"
+        if pool_client:
+            async with startup.phase("balances") as phase:
+                phase.detail = f"{await blockchain_simulator.refresh_balances()} wallets refreshed"
+        else:
+            startup.skip("balances", "No pool contract configured")
+    except Exception as e:
+        logger.warning(f"Blockchain simulator initialization failed: {e}")
+        logger.info("Continuing with market simulation only...")
+        return
+    
+    if pool_client and blockchain_simulator.wallet_manager.funding_config:
+        try:
+            async with startup.phase("funding") as phase:
+                phase.detail = f"{await blockchain_simulator.fund_wallets()} wallets funded"
+        except Exception:
+            pass  # Best effort; recorded on the phase
+    else:
+        startup.skip("funding", "No faucet or pool contract configured")
+    
+    logger.info(f"Simulation initialized with {len(blockchain_simulator.wallet_manager.wallets)} wallets")
+    tasks.append(asyncio.create_task(blockchain_simulator.start_simulation()))
+    startup.mark_ready("blockchain_simulation")
+    
+    # Swap submissions are queued and confirmed in the background
+    if pool_client:
+        swap_queue = SwapSubmissionQueue(
+            blockchain_simulator.algod_client,
+            pool_client,
+            blockchain_simulator.wallet_manager,
+            event_hub
+        )
+        tasks.append(asyncio.create_task(swap_queue.run()))
+        startup.mark_ready("swap_queue")
+    else:
+        startup.skip("swap_queue", "No pool contract configured")
+
+
+def _response_cache_requests() -> Dict[str, int]:
+    """Response cache lookup counts (its entry count is exported as a gauge)"""
+    stats = api_routes.response_cache.get_stats()
+    return {result: stats[result] for result in ("hits", "misses", "not_modified")}
+
+
+async def _wait_for_shared_state():
+    """Reader role: mark ready once the engine's first snapshot is readable."""
+    async with startup.phase("shared_state") as phase:
+        while shared_state_reader.snapshot() is None:
+            await asyncio.sleep(0.1)
+        phase.detail = f"Attached to '{SHARED_STATE_NAME}'"
 
 
 # Create FastAPI app with lifespan events
@@ -145,6 +338,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Read-only workers reject control requests
+@app.middleware("http")
+async def reject_writes_on_readers(request: Request, call_next):
+    """Control requests change simulation state, which only the engine owns."""
+    if (
+        SIMULATION_ROLE == READER_ROLE
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and request.url.path not in READER_POST_PATHS
+    ):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Read-only API worker; send control requests to the simulation engine"}
+        )
+    return await call_next(request)
+
+
 # Include API routes
 app.include_router(router, prefix="/api/v1")
 
@@ -152,9 +362,11 @@ app.include_router(router, prefix="/api/v1")
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    global simulator, blockchain_simulator
+    simulator = get_simulator()
+    blockchain_simulator = get_blockchain_simulator()
     return {
         "status": "healthy",
+        "role": SIMULATION_ROLE,
         "market_simulator_active": simulator.is_running if simulator else False,
         "blockchain_simulator_active": blockchain_simulator.is_running if blockchain_simulator else False,
         "current_price": simulator.get_current_price() if simulator else None,
@@ -162,6 +374,22 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 200 once every required startup phase is done, else 503."""
+    if not startup:
+        return JSONResponse(status_code=503, content={"ready": False, "phases": {}})
+    
+    status = startup.get_status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Hot-path counters, gauges and latency histograms in Prometheus text format."""
+    return Response(content=REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -173,15 +401,29 @@ async def root():
 
 
 def get_simulator() -> MarketSimulator:
-    """Get the global market simulator instance."""
+    """Get the global market simulator instance (a read-only snapshot view on readers)."""
+    if shared_state_reader:
+        return shared_state_reader.market_view()
     return simulator
 
 
 def get_blockchain_simulator() -> AlgorandTransactionSimulator:
-    """Get the global blockchain simulator instance."""
+    """Get the global blockchain simulator instance (a read-only snapshot view on readers)."""
+    if shared_state_reader:
+        return shared_state_reader.blockchain_view()
     return blockchain_simulator
 
 
+def get_event_hub() -> BroadcastHub:
+    """Get the global stream broadcast hub."""
+    return event_hub
+
+
+def get_swap_queue() -> SwapSubmissionQueue:
+    """Get the global swap submission queue (None without a pool contract)."""
+    return swap_queue
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -13,6 +13,11 @@ from dataclasses import dataclass
 from typing import List, Tuple, Dict, Optional
 from enum import Enum
 
+import numpy as np
+
+from .profiler import PROFILER
+from .telemetry import MARKET_TICK_SECONDS, MARKET_TICKS
+
 
 class VolatilityRegime(Enum):
     """Volatility regime classification."""
@@ -52,6 +57,124 @@ class SimulationMetrics:
     average_trade_size: float
 
 
+class PriceHistoryBuffer:
+    """
+    Fixed-capacity columnar ring buffer of price points.
+    
+    Every value is written twice (at i and i + capacity), so the most recent
+    n points are always one contiguous slice per column: reads return numpy
+    views that can be encoded directly without building per-point objects.
+    
+    Points are numbered by a sequence that starts at 1 and keeps increasing
+    across clear(), so it can serve as a client cursor.
+    """
+    
+    FIELDS = ("price", "volume", "timestamp", "volatility")
+    
+    def __init__(self, capacity: int):
+        """
+        Initialize the buffer.
+        
+        Args:
+            capacity: Maximum number of points retained
+        """
+        self.capacity = capacity
+        self.prices = np.zeros(2 * capacity)
+        self.volumes = np.zeros(2 * capacity)
+        self.timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self.volatilities = np.zeros(2 * capacity)
+        self.next_index = 0
+        self.count = 0
+        self.last_seq = 0           # Sequence of the newest point
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def append(self, point: PricePoint):
+        """Add a point, evicting the oldest once full."""
+        for offset in (self.next_index, self.next_index + self.capacity):
+            self.prices[offset] = point.price
+            self.volumes[offset] = point.volume
+            self.timestamps[offset] = point.timestamp
+            self.volatilities[offset] = point.volatility
+        
+        self.next_index = (self.next_index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.last_seq += 1
+    
+    def clear(self):
+        """Drop all points (the sequence keeps counting)."""
+        self.next_index = 0
+        self.count = 0
+    
+    def restore(self, columns: Dict[str, np.ndarray], last_seq: int):
+        """
+        Replace the contents with points copied from another buffer.
+        
+        Args:
+            columns: Field name -> array, oldest first (at most capacity points)
+            last_seq: Sequence of the newest point
+        """
+        n = len(columns["price"])
+        for name, column in zip(self.FIELDS, (self.prices, self.volumes, self.timestamps, self.volatilities)):
+            column[:n] = columns[name]
+            column[self.capacity:self.capacity + n] = columns[name]
+        
+        self.next_index = n % self.capacity
+        self.count = n
+        self.last_seq = last_seq
+    
+    def last_price(self) -> Optional[float]:
+        """Most recent price, or None when empty."""
+        if not self.count:
+            return None
+        return float(self.prices[self.next_index + self.capacity - 1])
+    
+    def columns(self, window: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Most recent points, oldest first, as read-only column views.
+        
+        Args:
+            window: Number of points (all when None/0)
+        
+        Returns:
+            Field name -> numpy array
+        """
+        n = min(window, self.count) if window else self.count
+        return self._tail(n)
+    
+    def columns_since_seq(self, since_seq: int) -> Tuple[Dict[str, np.ndarray], bool]:
+        """
+        Points with a sequence greater than since_seq.
+        
+        Returns:
+            (columns, truncated) - truncated when some requested points were
+            already evicted, or the cursor is ahead of the sequence (issued by
+            an earlier process) and everything buffered is returned
+        """
+        if since_seq > self.last_seq:
+            return self._tail(self.count), True
+        
+        wanted = self.last_seq - since_seq
+        return self._tail(min(wanted, self.count)), wanted > self.count
+    
+    def columns_since_timestamp(self, since_ts: int) -> Dict[str, np.ndarray]:
+        """Points with a timestamp greater than since_ts (timestamps never decrease)."""
+        timestamps = self._tail(self.count)["timestamp"]
+        start = int(np.searchsorted(timestamps, since_ts, side="right"))
+        return self._tail(self.count - start)
+    
+    def _tail(self, n: int) -> Dict[str, np.ndarray]:
+        """Newest n points as read-only column views."""
+        end = self.next_index + self.capacity
+        result = {}
+        for name, column in zip(self.FIELDS, (self.prices, self.volumes, self.timestamps, self.volatilities)):
+            view = column[end - n:end]
+            view.flags.writeable = False
+            result[name] = view
+        return result
+
+
 class MarketSimulator:
     """
     Market simulator with realistic price movements and volatility regimes.
@@ -83,8 +206,8 @@ class MarketSimulator:
         self.volatility_regime = VolatilityRegime.MEDIUM
         
         # Price history
-        self.price_history: List[PricePoint] = []
         self.max_history_size = 1000
+        self.price_history = PriceHistoryBuffer(self.max_history_size)
         
         # Market parameters
         self.drift = 0.0001  # Expected return
@@ -99,6 +222,13 @@ class MarketSimulator:
         self.pending_shocks = []
         self.pending_volume_spikes = []
         
+        # Tick subscribers (see subscribe_ticks) and long-poll waiters (see wait_for_tick)
+        self.tick_subscribers: List[asyncio.Queue] = []
+        self._tick_event = asyncio.Event()
+        
+        # Bumped on every state change; read endpoints cache responses per version
+        self.version = 0
+    
     async def run_simulation(self):
         """Run the market simulation loop."""
         self.is_running = True
@@ -114,7 +244,9 @@ class MarketSimulator:
         try:
             while self.is_running:
                 await asyncio.sleep(self.tick_interval)
-                await self._update_market()
+                with MARKET_TICK_SECONDS.time():
+                    await self._update_market()
+                MARKET_TICKS.inc()
                 
         except asyncio.CancelledError:
             self.is_running = False
@@ -123,6 +255,7 @@ class MarketSimulator:
     def stop_simulation(self):
         """Stop the market simulation."""
         self.is_running = False
+        self.version += 1
     
     def reset_simulation(self, new_initial_price: Optional[float] = None):
         """Reset simulation to initial state."""
@@ -136,26 +269,30 @@ class MarketSimulator:
         self.start_time = time.time()
         self.pending_shocks.clear()
         self.pending_volume_spikes.clear()
+        self.version += 1
     
     async def _update_market(self):
         """Update market state with new price and volume."""
         # Handle pending price shocks
-        self._process_price_shocks()
+        with PROFILER.stage("market", "shocks"):
+            self._process_price_shocks()
         
         # Generate new price based on current scenario
-        new_price = self._generate_next_price()
+        with PROFILER.stage("market", "price"):
+            new_price = self._generate_next_price()
         
         # Generate volume
-        volume = self._generate_volume()
-        
-        # Update volatility
-        self._update_volatility(new_price)
+        with PROFILER.stage("market", "volume"):
+            volume = self._generate_volume()
         
-        # Update regime if necessary
-        self._update_volatility_regime()
+        # Update volatility and regime if necessary
+        with PROFILER.stage("market", "volatility"):
+            self._update_volatility(new_price)
+            self._update_volatility_regime()
         
-        # Add to history
-        self._add_price_point(new_price, volume, self.current_volatility)
+        # Add to history (and notify tick subscribers)
+        with PROFILER.stage("market", "history"):
+            self._add_price_point(new_price, volume, self.current_volatility)
         
         # Update current price
         self.current_price = new_price
@@ -275,7 +412,7 @@ class MarketSimulator:
         
         # Price movement effect
         if self.price_history:
-            price_change = abs(self.current_price - self.price_history[-1].price) / self.current_price
+            price_change = abs(self.current_price - self.price_history.last_price()) / self.current_price
             movement_multiplier = 1 + 5 * price_change
         else:
             movement_multiplier = 1.0
@@ -304,7 +441,7 @@ class MarketSimulator:
             return
         
         # Calculate return
-        last_price = self.price_history[-1].price
+        last_price = self.price_history.last_price()
         if last_price > 0:
             return_val = (new_price - last_price) / last_price
             
@@ -335,9 +472,39 @@ class MarketSimulator:
         
         self.price_history.append(point)
         
-        # Maintain history size limit
-        if len(self.price_history) > self.max_history_size:
-            self.price_history.pop(0)
+        self.version += 1
+        self._publish_tick(point)
+        
+        # Wake long-pollers; later waiters get a fresh event
+        self._tick_event.set()
+        self._tick_event = asyncio.Event()
+    
+    def subscribe_ticks(self, max_queue_size: int = 1024) -> asyncio.Queue:
+        """
+        Subscribe to price ticks.
+        
+        Args:
+            max_queue_size: Ticks buffered for a slow consumer before the
+                oldest are dropped
+        
+        Returns:
+            Queue receiving every new PricePoint
+        """
+        queue = asyncio.Queue(maxsize=max_queue_size)
+        self.tick_subscribers.append(queue)
+        return queue
+    
+    def unsubscribe_ticks(self, queue: asyncio.Queue):
+        """Stop delivering ticks to a queue."""
+        if queue in self.tick_subscribers:
+            self.tick_subscribers.remove(queue)
+    
+    def _publish_tick(self, point: PricePoint):
+        """Deliver a tick to all subscribers without blocking the simulation."""
+        for queue in self.tick_subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(point)
     
     def _process_price_shocks(self):
         """Process any pending price shocks."""
@@ -383,8 +550,41 @@ class MarketSimulator:
     
     def get_price_history(self, window: int = 100) -> List[Tuple[float, float, int]]:
         """Get recent price history."""
-        recent_history = self.price_history[-window:] if window else self.price_history
-        return [(p.price, p.volume, p.timestamp) for p in recent_history]
+        columns = self.price_history.columns(window)
+        return list(zip(
+            columns["price"].tolist(), columns["volume"].tolist(), columns["timestamp"].tolist()
+        ))
+    
+    def get_price_columns(self, window: int = 100) -> Dict[str, np.ndarray]:
+        """Get recent price history as column arrays (oldest first)."""
+        return self.price_history.columns(window)
+    
+    @property
+    def tick_seq(self) -> int:
+        """Sequence number of the latest tick (monotonic, survives resets)."""
+        return self.price_history.last_seq
+    
+    async def wait_for_tick(self, after_seq: int, timeout: float) -> bool:
+        """
+        Wait until a tick newer than after_seq exists.
+        
+        Args:
+            after_seq: Sequence the caller already has
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            True if a newer tick is available, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        while self.tick_seq <= after_seq:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self._tick_event.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+        return True
     
     def set_scenario(self, scenario: str):
         """Set market scenario."""
@@ -392,6 +592,7 @@ class MarketSimulator:
             self.current_scenario = MarketScenario(scenario)
         except ValueError:
             self.current_scenario = MarketScenario.NORMAL
+        self.version += 1
     
     def set_volatility_regime(self, regime: str):
         """Set volatility regime."""
@@ -405,6 +606,7 @@ class MarketSimulator:
                 self.current_volatility = 0.08
                 
             self.volatility_regime = target_regime
+            self.version += 1
         except ValueError:
             pass
     
@@ -430,51 +632,57 @@ class MarketSimulator:
     
     def simulate_trade(self, size: float, direction: str = "buy") -> Tuple[float, float]:
         """Simulate a trade and its price impact."""
-        # Simple price impact model
-        impact_factor = min(size / (self.base_volume * 0.1), 0.05)  # Max 5% impact
+        execution_prices, slippage = self.simulate_trades(
+            np.array([size], dtype=np.float64), np.array([direction == "buy"])
+        )
+        return float(execution_prices[0]), float(slippage[0])
+    
+    def simulate_trades(self, sizes: np.ndarray, is_buy: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Simulate many candidate trades against the current market state.
         
-        if direction == "buy":
-            execution_price = self.current_price * (1 + impact_factor)
-        else:
-            execution_price = self.current_price * (1 - impact_factor)
+        All trades are priced independently from the same price and volume
+        (none of them moves the market for the others).
+        
+        Args:
+            sizes: Trade sizes
+            is_buy: True for buys, False for sells (same length as sizes)
+        
+        Returns:
+            Tuple of (execution prices, slippage) arrays
+        """
+        price = self.current_price
         
-        slippage = abs(execution_price - self.current_price) / self.current_price
+        # Simple price impact model
+        impact_factor = np.minimum(sizes / (self.base_volume * 0.1), 0.05)  # Max 5% impact
+        execution_prices = price * np.where(is_buy, 1 + impact_factor, 1 - impact_factor)
+        slippage = np.abs(execution_prices - price) / price
         
-        return execution_price, slippage
+        return execution_prices, slippage
     
     def get_metrics(self) -> Dict[str, float]:
         """Get simulation performance metrics."""
         if len(self.price_history) < 2:
             return {}
         
-        prices = [p.price for p in self.price_history]
-        volumes = [p.volume for p in self.price_history]
+        columns = self.price_history.columns()
+        prices = columns["price"]
+        volumes = columns["volume"]
         
         # Calculate realized volatility
-        returns = []
-        for i in range(1, len(prices)):
-            ret = math.log(prices[i] / prices[i-1])
-            returns.append(ret)
-        
-        realized_vol = math.sqrt(sum(r**2 for r in returns) / len(returns)) * math.sqrt(252)
+        returns = np.diff(np.log(prices))
+        realized_vol = math.sqrt(float(np.mean(returns ** 2))) * math.sqrt(252)
         
         # Calculate max drawdown
-        peak = prices[0]
-        max_drawdown = 0.0
-        
-        for price in prices:
-            if price > peak:
-                peak = price
-            else:
-                drawdown = (peak - price) / peak
-                max_drawdown = max(max_drawdown, drawdown)
+        peaks = np.maximum.accumulate(prices)
+        max_drawdown = float(np.max((peaks - prices) / peaks))
         
         # Volume-weighted price
-        total_volume = sum(volumes)
+        total_volume = float(volumes.sum())
         if total_volume > 0:
-            vwap = sum(p * v for p, v in zip(prices, volumes)) / total_volume
+            vwap = float(np.dot(prices, volumes)) / total_volume
         else:
-            vwap = sum(prices) / len(prices)
+            vwap = float(prices.mean())
         
         return {
             "realized_volatility": realized_vol,
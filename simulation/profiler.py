@@ -0,0 +1,322 @@
+"""
+Event-loop lag monitoring and per-stage tick profiling.
+
+A probe coroutine sleeps for a fixed interval and records how late it woke
+up (event-loop lag), refreshing a heartbeat each time. A watchdog thread
+checks the heartbeat; while the loop is blocked it samples the loop
+thread's Python stack, which shows exactly which code holds the loop.
+
+Simulation ticks wrap their stages in `PROFILER.stage(component, name)`.
+Stage times feed Prometheus histograms and rolling stats; a stage slower
+than its threshold is flagged together with the stack samples taken while
+it ran. Everything is served by the /debug/profile endpoint.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as FrameCounter, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from .telemetry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+# Probe period; lag resolution is about this fine
+DEFAULT_LAG_INTERVAL = 0.1
+
+# Loop stalls longer than this are counted and stack-sampled
+DEFAULT_BLOCK_THRESHOLD = 0.1
+
+# Stages slower than this are flagged
+DEFAULT_SLOW_STAGE_SECONDS = 0.25
+
+# Stack samples taken per stall (the first ones are the informative ones)
+MAX_SAMPLES_PER_BLOCK = 20
+
+# Frames kept per sample, innermost last
+MAX_STACK_DEPTH = 30
+
+# Recent slow stages / stack samples kept for the endpoint
+RECENT_SLOW_STAGES = 50
+RECENT_SAMPLES = 200
+
+# Durations kept per stage for percentiles
+RECENT_DURATIONS = 256
+
+LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "seltra_event_loop_lag_seconds", "Delay between a scheduled event-loop wakeup and when it ran"
+)
+LOOP_BLOCKED = REGISTRY.counter(
+    "seltra_event_loop_blocked_total", "Event-loop stalls longer than the block threshold"
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "seltra_stage_seconds", "Wall time of simulation tick stages", ["component", "stage"]
+)
+SLOW_STAGES = REGISTRY.counter(
+    "seltra_slow_stages_total", "Stage runs slower than their threshold", ["component", "stage"]
+)
+
+
+@dataclass
+class StackSample:
+    """Loop thread stack captured while the loop was blocked."""
+    taken_at: float
+    blocked_for: float
+    active_stages: List[str]
+    stack: List[str]            # "file:line in function", innermost last
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "taken_at": self.taken_at,
+            "blocked_for": self.blocked_for,
+            "active_stages": self.active_stages,
+            "stack": self.stack,
+        }
+
+
+@dataclass
+class DurationStats:
+    """Rolling statistics for one timed thing."""
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last: float = 0.0
+    recent: Deque[float] = field(default_factory=lambda: deque(maxlen=RECENT_DURATIONS))
+    
+    def observe(self, duration: float):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.last = duration
+        self.recent.append(duration)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+        
+        def percentile(q: float) -> Optional[float]:
+            return recent[min(len(recent) - 1, int(q * len(recent)))] if recent else None
+        
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max,
+            "last": self.last,
+            "p50": percentile(0.5),
+            "p99": percentile(0.99),
+        }
+
+
+@dataclass
+class SlowStage:
+    """A stage run that exceeded its threshold."""
+    stage: str
+    started_at: float
+    duration: float
+    threshold: float
+    samples: List[StackSample]
+    
+    def to_dict(self, include_samples: bool = True) -> Dict[str, Any]:
+        data = {
+            "stage": self.stage,
+            "started_at": self.started_at,
+            "duration": self.duration,
+            "threshold": self.threshold,
+            "blocked_samples": len(self.samples),
+        }
+        if include_samples:
+            data["samples"] = [sample.to_dict() for sample in self.samples]
+        return data
+
+
+def _format_stack(frame) -> List[str]:
+    """Format a frame's stack, innermost last."""
+    return [
+        f"{entry.filename}:{entry.lineno} in {entry.name}"
+        for entry in traceback.extract_stack(frame, limit=MAX_STACK_DEPTH)
+    ]
+
+
+class Profiler:
+    """
+    Event-loop lag probe, blocked-loop watchdog and stage timers.
+    """
+    
+    def __init__(
+        self,
+        lag_interval: float = DEFAULT_LAG_INTERVAL,
+        block_threshold: float = DEFAULT_BLOCK_THRESHOLD,
+        slow_stage_seconds: float = DEFAULT_SLOW_STAGE_SECONDS
+    ):
+        """
+        Initialize the profiler.
+        
+        Args:
+            lag_interval: Seconds between loop lag probes
+            block_threshold: Stall length that counts as blocked and is sampled
+            slow_stage_seconds: Default threshold for flagging slow stages
+        """
+        self.lag_interval = lag_interval
+        self.block_threshold = block_threshold
+        self.slow_stage_seconds = slow_stage_seconds
+        self.stage_thresholds: Dict[str, float] = {}
+        
+        self.stages: Dict[str, DurationStats] = {}
+        self.loop_lag = DurationStats()
+        self.blocked_count = 0
+        self.slow_stages: Deque[SlowStage] = deque(maxlen=RECENT_SLOW_STAGES)
+        self.samples: Deque[StackSample] = deque(maxlen=RECENT_SAMPLES)
+        
+        # Stages currently running (read by the watchdog thread)
+        self._active: Dict[int, str] = {}
+        
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    def set_threshold(self, component: str, stage: str, seconds: float):
+        """Override the slow threshold for one stage."""
+        self.stage_thresholds[f"{component}.{stage}"] = seconds
+    
+    @contextmanager
+    def stage(self, component: str, stage: str) -> Iterator[None]:
+        """
+        Time the with-block as one run of a stage.
+        
+        Args:
+            component: Owning component (e.g. "market", "blockchain")
+            stage: Stage name within the component
+        """
+        key = f"{component}.{stage}"
+        token = object()
+        self._active[id(token)] = key
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            del self._active[id(token)]
+            
+            stats = self.stages.get(key)
+            if stats is None:
+                stats = self.stages[key] = DurationStats()
+            stats.observe(duration)
+            STAGE_SECONDS.observe(duration, component=component, stage=stage)
+            
+            threshold = self.stage_thresholds.get(key, self.slow_stage_seconds)
+            if duration > threshold:
+                self._flag_slow(key, component, stage, started_at, duration, threshold)
+    
+    def _flag_slow(self, key: str, component: str, stage: str, started_at: float, duration: float, threshold: float):
+        """Record a slow stage run with the stack samples taken while it ran."""
+        samples = [
+            sample for sample in list(self.samples)
+            if sample.taken_at >= started_at and key in sample.active_stages
+        ]
+        self.slow_stages.append(SlowStage(key, started_at, duration, threshold, samples))
+        SLOW_STAGES.inc(component=component, stage=stage)
+        
+        where = f"; blocked in {samples[0].stack[-1]}" if samples else ""
+        logger.warning(f"Slow stage {key}: {duration * 1000:.0f} ms (threshold {threshold * 1000:.0f} ms){where}")
+    
+    async def monitor_loop(self):
+        """Probe event-loop lag until cancelled; runs the watchdog thread alongside."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        
+        try:
+            while True:
+                expected = time.monotonic() + self.lag_interval
+                await asyncio.sleep(self.lag_interval)
+                now = time.monotonic()
+                self._heartbeat = now
+                
+                lag = max(0.0, now - expected)
+                self.loop_lag.observe(lag)
+                LOOP_LAG_SECONDS.observe(lag)
+                if lag > self.block_threshold:
+                    self.blocked_count += 1
+                    LOOP_BLOCKED.inc()
+        finally:
+            self._stop.set()
+    
+    def _watch(self):
+        """Watchdog thread: sample the loop thread's stack while the loop is stalled."""
+        samples_this_block = 0
+        
+        while not self._stop.wait(self.block_threshold / 2):
+            # Time past the probe's expected wakeup
+            blocked_for = time.monotonic() - self._heartbeat - self.lag_interval
+            if blocked_for < self.block_threshold:
+                samples_this_block = 0
+                continue
+            if samples_this_block >= MAX_SAMPLES_PER_BLOCK:
+                continue
+            
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self.samples.append(StackSample(
+                taken_at=time.time(),
+                blocked_for=blocked_for,
+                active_stages=list(self._active.values()),
+                stack=_format_stack(frame)
+            ))
+            samples_this_block += 1
+    
+    def get_report(self, include_samples: bool = False) -> Dict[str, Any]:
+        """
+        Profile summary for the debug endpoint.
+        
+        Args:
+            include_samples: Include full stack samples (large)
+        
+        Returns:
+            Loop lag, per-stage stats, recent slow stages and hot frames
+        """
+        samples = list(self.samples)
+        
+        # Innermost frames seen while the loop was blocked, most frequent first
+        hot_frames = FrameCounter(sample.stack[-1] for sample in samples if sample.stack)
+        
+        report = {
+            "loop_lag": {
+                **self.loop_lag.to_dict(),
+                "blocked_count": self.blocked_count,
+                "monitoring": self._watchdog is not None and self._watchdog.is_alive(),
+            },
+            "stages": {key: stats.to_dict() for key, stats in sorted(self.stages.items())},
+            "slow_stages": [slow.to_dict(include_samples) for slow in reversed(self.slow_stages)],
+            "hot_frames": [{"frame": frame, "samples": count} for frame, count in hot_frames.most_common(10)],
+            "thresholds": {
+                "block_seconds": self.block_threshold,
+                "slow_stage_seconds": self.slow_stage_seconds,
+                **{f"{key}_seconds": value for key, value in self.stage_thresholds.items()},
+            },
+        }
+        if include_samples:
+            report["samples"] = [sample.to_dict() for sample in reversed(samples)]
+        return report
+    
+    def reset(self):
+        """Clear collected statistics (keeps monitoring)."""
+        self.stages.clear()
+        self.loop_lag = DurationStats()
+        self.blocked_count = 0
+        self.slow_stages.clear()
+        self.samples.clear()
+
+
+# Process-wide profiler used by the simulation services
+PROFILER = Profiler()
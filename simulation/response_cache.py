@@ -0,0 +1,142 @@
+"""
+Version-keyed response cache for read endpoints.
+
+The simulators bump a monotonic `version` counter on every state change.
+Read endpoints build their payload at most once per (key, version), keep the
+serialized bytes, and answer `If-None-Match` revalidations with 304 without
+touching the payload at all. Many dashboards polling the same endpoint then
+cost one serialization per simulator tick instead of one per request.
+"""
+
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from .serialization import dumps, JSON_MEDIA_TYPE
+
+
+# Distinct (endpoint, query) keys kept; wallet pages are the main contributor
+DEFAULT_MAX_ENTRIES = 256
+
+
+@dataclass
+class CachedResponse:
+    """Serialized payload for one key at one version."""
+    version: Tuple[int, ...]
+    etag: str
+    body: bytes
+    media_type: str = JSON_MEDIA_TYPE
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized JSON responses, invalidated by version change.
+    """
+    
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Keys retained before the least recently used is evicted
+        """
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        
+        # Versions restart at zero with the process; the epoch keeps old ETags from matching
+        self.epoch = f"{int(time.time() * 1000):x}"
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+    
+    def make_etag(self, key: str, version: Tuple[int, ...]) -> str:
+        """ETag for a key at a version (computable without building the payload)."""
+        return f'W/"{self.epoch}-{zlib.crc32(key.encode()):08x}-{"-".join(map(str, version))}"'
+    
+    def get(
+        self,
+        key: str,
+        version: Tuple[int, ...],
+        build: Callable[[], Any],
+        media_type: str = JSON_MEDIA_TYPE
+    ) -> CachedResponse:
+        """
+        Get the serialized payload for a key, building it if the version moved.
+        
+        Args:
+            key: Endpoint, normalized query parameters and response format
+            version: Current simulator version(s)
+            build: Returns the JSON-serializable payload, or already encoded bytes
+            media_type: Content type of the encoded body
+        
+        Returns:
+            CachedResponse
+        """
+        entry = self.entries.get(key)
+        if entry is not None and entry.version == version:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+        
+        self.misses += 1
+        payload = build()
+        body = payload if isinstance(payload, bytes) else dumps(payload)
+        entry = CachedResponse(
+            version=version, etag=self.make_etag(key, version), body=body, media_type=media_type
+        )
+        
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        
+        return entry
+    
+    def respond(
+        self,
+        request: Request,
+        key: str,
+        version: Tuple[int, ...],
+        build: Callable[[], Any],
+        media_type: str = JSON_MEDIA_TYPE,
+        extra_headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        """
+        Serve a read endpoint from the cache, honouring If-None-Match.
+        
+        Args:
+            request: Incoming request (for If-None-Match)
+            key: Endpoint, normalized query parameters and response format
+            version: Current simulator version(s)
+            build: Returns the JSON-serializable payload, or already encoded bytes
+            media_type: Content type of the encoded body
+            extra_headers: Headers added to both 200 and 304 responses
+        
+        Returns:
+            200 with cached bytes, or 304 when the client's copy is current
+        """
+        etag = self.make_etag(key, version)
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept", **(extra_headers or {})}
+        
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        
+        entry = self.get(key, version, build, media_type)
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache statistics."""
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
@@ -0,0 +1,131 @@
+"""
+Fast response encoding for large API payloads.
+
+Uses orjson when installed (native numpy support, bytes output) and falls
+back to the standard library otherwise. Table-shaped endpoints (price
+history, wallet pages) can be served in three formats chosen via `Accept`:
+
+- application/json: rows, the default and the historical format
+- application/vnd.seltra.columnar+json: one array per field
+- application/x-ndjson: one JSON row per line, for streaming consumers
+"""
+
+import json
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+JSON_MEDIA_TYPE = "application/json"
+COLUMNAR_MEDIA_TYPE = "application/vnd.seltra.columnar+json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+TABLE_MEDIA_TYPES = (JSON_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE, NDJSON_MEDIA_TYPE)
+
+
+def _default(value: Any) -> Any:
+    """Fallback conversions for the standard library encoder."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Encode a payload as compact JSON bytes.
+    
+    Args:
+        payload: JSON-serializable data; numpy arrays and scalars are accepted
+    
+    Returns:
+        UTF-8 JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            payload,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(payload, separators=(",", ":"), default=_default).encode()
+
+
+def loads(data: bytes) -> Any:
+    """Decode JSON bytes produced by dumps()."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def negotiate_table_format(accept: Optional[str]) -> str:
+    """
+    Pick a table format from an Accept header.
+    
+    Args:
+        accept: Accept header value (None/`*/*` selects rows JSON)
+    
+    Returns:
+        One of TABLE_MEDIA_TYPES
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+    
+    best, best_quality = JSON_MEDIA_TYPE, -1.0
+    for item in accept.split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        if media_type in ("*/*", "application/*"):
+            media_type = JSON_MEDIA_TYPE
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        # Earlier entries win ties, matching how clients list preferences
+        if media_type in TABLE_MEDIA_TYPES and quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def encode_table(
+    columns: Dict[str, Sequence[Any]],
+    media_type: str,
+    rows_key: str,
+    extra: Optional[Dict[str, Any]] = None
+) -> bytes:
+    """
+    Encode column data in the requested table format.
+    
+    Args:
+        columns: Field name -> equal-length sequence (lists or numpy arrays)
+        media_type: One of TABLE_MEDIA_TYPES
+        rows_key: Key holding the rows in the JSON format (e.g. "history")
+        extra: Additional top-level fields for the JSON formats (counts,
+            cursors); NDJSON carries rows only
+    
+    Returns:
+        Encoded body
+    """
+    extra = extra or {}
+    
+    if media_type == COLUMNAR_MEDIA_TYPE:
+        return dumps({"columns": columns, **extra})
+    
+    names = list(columns)
+    values = [col.tolist() if isinstance(col, np.ndarray) else col for col in columns.values()]
+    rows = [dict(zip(names, row)) for row in zip(*values)]
+    
+    if media_type == NDJSON_MEDIA_TYPE:
+        if not rows:
+            return b""
+        return b"\n".join(dumps(row) for row in rows) + b"\n"
+    
+    return dumps({rows_key: rows, **extra})
@@ -0,0 +1,583 @@
+"""
+Shared-memory state snapshot for multi-process serving.
+
+The simulation engine stays a single writer. SharedStatePublisher copies the
+price ring, headline market state, metrics and wallet summaries into one
+shared memory segment whenever a simulator version moves. Read-only API
+workers attach with SharedStateReader and serve the read endpoints from
+that snapshot, so read throughput scales with the number of workers.
+
+Consistency uses a seqlock: the writer makes the header sequence odd while
+it writes and even again when done; readers copy everything and retry when
+the sequence was odd or changed underneath them. Each worker decodes a given
+snapshot once and reuses it until the sequence moves.
+
+Private keys never leave the engine: wallets are published without them.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field, fields
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .market_simulator import MarketSimulator, PriceHistoryBuffer
+from .serialization import dumps, loads
+from .wallet_manager import (
+    ManagedWallet, WalletManager, ACTIVITY_BUCKETS, BALANCE_BUCKETS, _bucket_for
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Process roles (SELTRA_ROLE): one process runs everything, or one engine
+# publishes for any number of read-only workers
+STANDALONE_ROLE = "standalone"
+ENGINE_ROLE = "engine"
+READER_ROLE = "reader"
+
+DEFAULT_SHARED_STATE_NAME = "seltra_state"
+
+# How often the engine checks simulator versions for changes
+DEFAULT_PUBLISH_INTERVAL = 0.1
+
+# Space for the JSON part (metrics, wallet summaries)
+DEFAULT_BLOB_CAPACITY = 8 * 1024 * 1024
+
+# Readers re-attach when the engine stopped publishing (e.g. it restarted)
+STALE_AFTER_SECONDS = 5.0
+ATTACH_RETRY_SECONDS = 1.0
+
+# Seqlock read attempts before falling back to the previous snapshot
+MAX_READ_ATTEMPTS = 1000
+
+# Long-poll granularity for wait_for_tick on readers
+SNAPSHOT_POLL_INTERVAL = 0.05
+
+LAYOUT_VERSION = 1
+
+# Header slots (int64)
+_SEQ = 0
+_LAYOUT = 1
+_RING_CAPACITY = 2
+_BLOB_CAPACITY = 3
+_COUNT = 4
+_TICK_SEQ = 5
+_MARKET_VERSION = 6
+_BLOCKCHAIN_VERSION = 7
+_WALLET_VERSION = 8
+_BLOB_LENGTH = 9
+_PUBLISHED_AT_NS = 10
+_FLAGS = 11
+_HEADER_SLOTS = 16
+
+# Float slots
+_CURRENT_PRICE = 0
+_CURRENT_VOLATILITY = 1
+_BASE_VOLUME = 2
+_INITIAL_PRICE = 3
+_FLOAT_SLOTS = 8
+
+# Flag bits
+_MARKET_RUNNING = 1
+_BLOCKCHAIN_AVAILABLE = 2
+
+# Wallet fields that are safe to share
+PUBLIC_WALLET_FIELDS = tuple(
+    f.name for f in fields(ManagedWallet) if f.name not in ("private_key", "mnemonic_phrase")
+)
+
+
+def _segment_size(ring_capacity: int, blob_capacity: int) -> int:
+    return 8 * (_HEADER_SLOTS + _FLOAT_SLOTS + len(PriceHistoryBuffer.FIELDS) * ring_capacity) + blob_capacity
+
+
+class _SegmentLayout:
+    """Numpy views over the regions of a shared memory segment."""
+    
+    def __init__(self, buf, ring_capacity: int, blob_capacity: int):
+        offset = 0
+        self.header = np.ndarray(_HEADER_SLOTS, dtype=np.int64, buffer=buf, offset=offset)
+        offset += 8 * _HEADER_SLOTS
+        self.floats = np.ndarray(_FLOAT_SLOTS, dtype=np.float64, buffer=buf, offset=offset)
+        offset += 8 * _FLOAT_SLOTS
+        
+        self.ring: Dict[str, np.ndarray] = {}
+        for name in PriceHistoryBuffer.FIELDS:
+            dtype = np.int64 if name == "timestamp" else np.float64
+            self.ring[name] = np.ndarray(ring_capacity, dtype=dtype, buffer=buf, offset=offset)
+            offset += 8 * ring_capacity
+        
+        self.blob = np.ndarray(blob_capacity, dtype=np.uint8, buffer=buf, offset=offset)
+
+
+class SharedStatePublisher:
+    """
+    Engine side: writes simulator state into shared memory on every change.
+    """
+    
+    def __init__(
+        self,
+        market_simulator: MarketSimulator,
+        blockchain_simulator=None,
+        name: str = DEFAULT_SHARED_STATE_NAME,
+        interval: float = DEFAULT_PUBLISH_INTERVAL,
+        blob_capacity: int = DEFAULT_BLOB_CAPACITY
+    ):
+        """
+        Create the shared memory segment.
+        
+        Args:
+            market_simulator: Market simulator to publish
+            blockchain_simulator: Blockchain simulator to publish (optional)
+            name: Segment name readers attach to
+            interval: Seconds between version checks
+            blob_capacity: Bytes reserved for metrics and wallet summaries
+        """
+        self.market_simulator = market_simulator
+        self.blockchain_simulator = blockchain_simulator
+        self.name = name
+        self.interval = interval
+        self.ring_capacity = market_simulator.price_history.capacity
+        self.blob_capacity = blob_capacity
+        
+        size = _segment_size(self.ring_capacity, blob_capacity)
+        try:
+            self.segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by an engine that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        
+        self.layout = _SegmentLayout(self.segment.buf, self.ring_capacity, blob_capacity)
+        self.layout.header[:] = 0
+        self.layout.header[_LAYOUT] = LAYOUT_VERSION
+        self.layout.header[_RING_CAPACITY] = self.ring_capacity
+        self.layout.header[_BLOB_CAPACITY] = blob_capacity
+        
+        self.published_versions = None
+        self.publish_count = 0
+        self.is_running = False
+    
+    def _versions(self):
+        blockchain = self.blockchain_simulator
+        return (
+            self.market_simulator.version,
+            self.market_simulator.tick_seq,
+            blockchain.version if blockchain else 0,
+            blockchain.wallet_manager.version if blockchain and blockchain.wallet_manager else 0,
+        )
+    
+    def _encode_blob(self) -> bytes:
+        """Metrics, pending transaction plans and wallet summaries as JSON."""
+        blockchain = self.blockchain_simulator
+        wallet_manager = blockchain.wallet_manager if blockchain else None
+        payload = {
+            "market_metrics": self.market_simulator.get_metrics(),
+            "blockchain_metrics": blockchain.get_metrics() if blockchain else None,
+            "wallet_counts": wallet_manager.get_wallet_counts() if wallet_manager else None,
+            "pending_transactions": blockchain.get_pending_transactions() if blockchain else [],
+            "wallets": [
+                {name: getattr(wallet, name) for name in PUBLIC_WALLET_FIELDS}
+                for wallet in wallet_manager.wallets.values()
+            ] if wallet_manager else [],
+        }
+        blob = dumps(payload)
+        if len(blob) > self.blob_capacity:
+            logger.warning(f"Shared state blob ({len(blob)} bytes) exceeds capacity; publishing without wallets")
+            payload["wallets"] = []
+            blob = dumps(payload)
+        return blob
+    
+    def publish(self):
+        """Write the current state (no await inside, so it is one consistent tick)."""
+        market = self.market_simulator
+        blob = self._encode_blob()
+        if len(blob) > self.blob_capacity:
+            raise ValueError(f"Shared state blob ({len(blob)} bytes) exceeds capacity")
+        columns = market.price_history.columns()
+        count = len(columns["price"])
+        versions = self._versions()
+        market_version, tick_seq, blockchain_version, wallet_version = versions
+        header, floats = self.layout.header, self.layout.floats
+        
+        header[_SEQ] += 1  # odd: write in progress
+        
+        for name, column in columns.items():
+            self.layout.ring[name][:count] = column
+        self.layout.blob[:len(blob)] = np.frombuffer(blob, dtype=np.uint8)
+        
+        header[_COUNT] = count
+        header[_TICK_SEQ] = tick_seq
+        header[_MARKET_VERSION] = market_version
+        header[_BLOCKCHAIN_VERSION] = blockchain_version
+        header[_WALLET_VERSION] = wallet_version
+        header[_BLOB_LENGTH] = len(blob)
+        header[_PUBLISHED_AT_NS] = time.time_ns()
+        header[_FLAGS] = (
+            (_MARKET_RUNNING if market.is_running else 0) |
+            (_BLOCKCHAIN_AVAILABLE if self.blockchain_simulator else 0)
+        )
+        floats[_CURRENT_PRICE] = market.current_price
+        floats[_CURRENT_VOLATILITY] = market.current_volatility
+        floats[_BASE_VOLUME] = market.base_volume
+        floats[_INITIAL_PRICE] = market.initial_price
+        
+        header[_SEQ] += 1  # even: stable
+        
+        self.published_versions = versions
+        self.publish_count += 1
+    
+    async def run(self):
+        """Publish whenever a simulator version moves, until stopped."""
+        self.is_running = True
+        logger.info(f"Publishing shared state to '{self.name}'")
+        while self.is_running:
+            if self._versions() != self.published_versions:
+                try:
+                    self.publish()
+                except Exception as e:
+                    logger.error(f"Shared state publish failed: {e}")
+            else:
+                # Keep the timestamp fresh so readers can tell the engine is alive
+                self.layout.header[_PUBLISHED_AT_NS] = time.time_ns()
+            await asyncio.sleep(self.interval)
+    
+    def stop(self):
+        """Stop publishing."""
+        self.is_running = False
+    
+    def close(self):
+        """Release and remove the segment."""
+        self.layout = None
+        self.segment.close()
+        try:
+            self.segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class StateSnapshot:
+    """One consistent copy of the published state."""
+    seq: int
+    tick_seq: int
+    market_version: int
+    blockchain_version: int
+    wallet_version: int
+    published_at: float
+    market_running: bool
+    blockchain_available: bool
+    current_price: float
+    current_volatility: float
+    base_volume: float
+    initial_price: float
+    price_history: PriceHistoryBuffer
+    market_metrics: Dict[str, Any]
+    blockchain_metrics: Optional[Dict[str, Any]]
+    wallet_counts: Optional[Dict[str, Any]]
+    pending_transactions: List[Dict[str, Any]]
+    wallets: List[Dict[str, Any]]
+    _wallet_index: Optional["WalletSnapshotIndex"] = field(default=None, repr=False)
+    
+    @property
+    def wallet_index(self) -> "WalletSnapshotIndex":
+        """Wallet indexes, built on first use and shared by every request on this snapshot."""
+        if self._wallet_index is None:
+            self._wallet_index = WalletSnapshotIndex(self)
+        return self._wallet_index
+
+
+class SharedStateReader:
+    """
+    Worker side: attaches to the engine's segment and decodes snapshots.
+    """
+    
+    def __init__(self, name: str = DEFAULT_SHARED_STATE_NAME):
+        """
+        Initialize the reader (attaching happens on first use).
+        
+        Args:
+            name: Segment name the engine publishes to
+        """
+        self.name = name
+        self.segment: Optional[shared_memory.SharedMemory] = None
+        self.layout: Optional[_SegmentLayout] = None
+        self.cached: Optional[StateSnapshot] = None
+        self.last_attach_attempt = 0.0
+        self.stats = {"decoded": 0, "retries": 0, "reattached": 0}
+    
+    def _attach(self) -> bool:
+        """Attach (or re-attach) to the segment; rate limited."""
+        now = time.monotonic()
+        if now - self.last_attach_attempt < ATTACH_RETRY_SECONDS:
+            return self.segment is not None
+        self.last_attach_attempt = now
+        
+        try:
+            segment = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return self.segment is not None
+        # Only the engine owns the segment; don't let this process's tracker unlink it
+        resource_tracker.unregister(segment._name, "shared_memory")
+        
+        header = np.ndarray(_HEADER_SLOTS, dtype=np.int64, buffer=segment.buf)
+        layout_version, published_at = int(header[_LAYOUT]), int(header[_PUBLISHED_AT_NS])
+        ring_capacity, blob_capacity = int(header[_RING_CAPACITY]), int(header[_BLOB_CAPACITY])
+        del header
+        
+        # Wrong layout, or the same segment we already have (engine gone without a replacement)
+        same = self.layout is not None and published_at <= int(self.layout.header[_PUBLISHED_AT_NS])
+        if layout_version != LAYOUT_VERSION or same:
+            segment.close()
+            return self.segment is not None
+        
+        if self.segment is not None:
+            self.layout = None
+            self.segment.close()
+            self.stats["reattached"] += 1
+        self.segment = segment
+        self.layout = _SegmentLayout(segment.buf, ring_capacity, blob_capacity)
+        self.cached = None
+        logger.info(f"Attached to shared state '{self.name}' (pid {os.getpid()})")
+        return True
+    
+    def snapshot(self) -> Optional[StateSnapshot]:
+        """
+        Latest consistent snapshot.
+        
+        Returns:
+            StateSnapshot, or None before the engine published anything
+        """
+        if self.layout is None and not self._attach():
+            return None
+        
+        if time.time_ns() - int(self.layout.header[_PUBLISHED_AT_NS]) > STALE_AFTER_SECONDS * 1e9:
+            self._attach()
+        header = self.layout.header
+        
+        for _ in range(MAX_READ_ATTEMPTS):
+            seq = int(header[_SEQ])
+            if seq & 1:
+                self.stats["retries"] += 1
+                continue
+            if seq == 0:
+                # Nothing published yet
+                return None
+            if self.cached is not None and seq == self.cached.seq:
+                return self.cached
+            
+            snapshot = self._copy(seq)
+            if int(header[_SEQ]) == seq:
+                self.cached = self._decode(snapshot)
+                self.stats["decoded"] += 1
+                return self.cached
+            self.stats["retries"] += 1
+        
+        # Writer kept us out; serve the previous state rather than fail
+        return self.cached
+    
+    def _copy(self, seq: int) -> Dict[str, Any]:
+        """Copy everything out of the segment (validated by the caller)."""
+        layout = self.layout
+        header = layout.header.copy()
+        count = int(min(max(header[_COUNT], 0), len(layout.ring["price"])))
+        blob_length = int(min(max(header[_BLOB_LENGTH], 0), len(layout.blob)))
+        return {
+            "seq": seq,
+            "header": header,
+            "floats": layout.floats.copy(),
+            "columns": {name: column[:count].copy() for name, column in layout.ring.items()},
+            "blob": layout.blob[:blob_length].tobytes(),
+        }
+    
+    def _decode(self, raw: Dict[str, Any]) -> StateSnapshot:
+        """Build a StateSnapshot from a validated copy."""
+        header, floats = raw["header"], raw["floats"]
+        payload = loads(raw["blob"]) if raw["blob"] else {}
+        
+        price_history = PriceHistoryBuffer(int(header[_RING_CAPACITY]))
+        price_history.restore(raw["columns"], int(header[_TICK_SEQ]))
+        
+        return StateSnapshot(
+            seq=raw["seq"],
+            tick_seq=int(header[_TICK_SEQ]),
+            market_version=int(header[_MARKET_VERSION]),
+            blockchain_version=int(header[_BLOCKCHAIN_VERSION]),
+            wallet_version=int(header[_WALLET_VERSION]),
+            published_at=int(header[_PUBLISHED_AT_NS]) / 1e9,
+            market_running=bool(header[_FLAGS] & _MARKET_RUNNING),
+            blockchain_available=bool(header[_FLAGS] & _BLOCKCHAIN_AVAILABLE),
+            current_price=float(floats[_CURRENT_PRICE]),
+            current_volatility=float(floats[_CURRENT_VOLATILITY]),
+            base_volume=float(floats[_BASE_VOLUME]),
+            initial_price=float(floats[_INITIAL_PRICE]),
+            price_history=price_history,
+            market_metrics=payload.get("market_metrics") or {},
+            blockchain_metrics=payload.get("blockchain_metrics"),
+            wallet_counts=payload.get("wallet_counts"),
+            pending_transactions=payload.get("pending_transactions") or [],
+            wallets=payload.get("wallets") or []
+        )
+    
+    def market_view(self) -> Optional["MarketSnapshotView"]:
+        """Read-only market simulator view of the latest snapshot (None until published)."""
+        snapshot = self.snapshot()
+        return MarketSnapshotView(self, snapshot) if snapshot else None
+    
+    def blockchain_view(self) -> Optional["BlockchainSnapshotView"]:
+        """Read-only blockchain simulator view of the latest snapshot (None without one)."""
+        snapshot = self.snapshot()
+        return BlockchainSnapshotView(snapshot) if snapshot and snapshot.blockchain_available else None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reader statistics."""
+        return {
+            **self.stats,
+            "attached": self.segment is not None,
+            "seq": self.cached.seq if self.cached else None,
+            "tick_seq": self.cached.tick_seq if self.cached else None,
+        }
+    
+    def close(self):
+        """Detach from the segment."""
+        self.layout = None
+        if self.segment is not None:
+            self.segment.close()
+            self.segment = None
+
+
+class MarketSnapshotView:
+    """
+    Read-only stand-in for MarketSimulator, pinned to one snapshot.
+    
+    Routes get one view per request, so everything they read comes from the
+    same tick. Control methods are not available on readers.
+    """
+    
+    simulate_trade = MarketSimulator.simulate_trade
+    simulate_trades = MarketSimulator.simulate_trades
+    
+    def __init__(self, reader: SharedStateReader, snapshot: StateSnapshot):
+        self.reader = reader
+        self.snapshot = snapshot
+    
+    @property
+    def version(self) -> int:
+        return self.snapshot.market_version
+    
+    @property
+    def is_running(self) -> bool:
+        return self.snapshot.market_running
+    
+    @property
+    def current_price(self) -> float:
+        return self.snapshot.current_price
+    
+    @property
+    def base_volume(self) -> float:
+        return self.snapshot.base_volume
+    
+    @property
+    def initial_price(self) -> float:
+        return self.snapshot.initial_price
+    
+    @property
+    def price_history(self) -> PriceHistoryBuffer:
+        return self.snapshot.price_history
+    
+    @property
+    def tick_seq(self) -> int:
+        return self.snapshot.tick_seq
+    
+    def get_current_price(self) -> float:
+        return self.snapshot.current_price
+    
+    def get_current_volatility(self) -> float:
+        return self.snapshot.current_volatility
+    
+    def get_price_columns(self, window: int = 100) -> Dict[str, np.ndarray]:
+        return self.snapshot.price_history.columns(window)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        return self.snapshot.market_metrics
+    
+    async def wait_for_tick(self, after_seq: int, timeout: float) -> bool:
+        """Poll the segment until a newer tick is published; the view then moves to it."""
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self.reader.snapshot()
+            if snapshot and snapshot.tick_seq > after_seq:
+                self.snapshot = snapshot
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(SNAPSHOT_POLL_INTERVAL, remaining))
+
+
+class WalletSnapshotIndex:
+    """
+    Published wallets with the same secondary indexes and query semantics
+    as WalletManager (shares its query implementation).
+    """
+    
+    query_wallets = WalletManager.query_wallets
+    _select_wallets = WalletManager._select_wallets
+    _field_getters = staticmethod(WalletManager._field_getters)
+    _encode_cursor = staticmethod(WalletManager._encode_cursor)
+    _decode_cursor = staticmethod(WalletManager._decode_cursor)
+    
+    def __init__(self, snapshot: StateSnapshot):
+        self.version = snapshot.wallet_version
+        self.wallets: Dict[str, ManagedWallet] = {}
+        self._pattern_index: Dict[str, Dict[str, ManagedWallet]] = {}
+        self._balance_index: Dict[str, Dict[str, ManagedWallet]] = {}
+        self._activity_index: Dict[str, Dict[str, ManagedWallet]] = {}
+        
+        for row in snapshot.wallets:
+            wallet = ManagedWallet(private_key="", mnemonic_phrase="", **row)
+            self.wallets[wallet.address] = wallet
+            self._pattern_index.setdefault(wallet.pattern, {})[wallet.address] = wallet
+            self._balance_index.setdefault(
+                _bucket_for(wallet.algo_balance, BALANCE_BUCKETS), {}
+            )[wallet.address] = wallet
+            self._activity_index.setdefault(
+                _bucket_for(wallet.total_transactions, ACTIVITY_BUCKETS), {}
+            )[wallet.address] = wallet
+
+
+class BlockchainSnapshotView:
+    """Read-only stand-in for AlgorandTransactionSimulator, pinned to one snapshot."""
+    
+    pool_client = None
+    
+    def __init__(self, snapshot: StateSnapshot):
+        self.snapshot = snapshot
+        self.wallet_manager = snapshot.wallet_index
+    
+    @property
+    def version(self) -> int:
+        return self.snapshot.blockchain_version
+    
+    @property
+    def is_running(self) -> bool:
+        return bool((self.snapshot.blockchain_metrics or {}).get("is_running", False))
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        return self.snapshot.blockchain_metrics or {}
+    
+    def get_wallet_counts(self) -> Dict[str, Any]:
+        return self.snapshot.wallet_counts or {"total": 0, "by_pattern": {}}
+    
+    def get_pending_transactions(self) -> List[Dict[str, Any]]:
+        return self.snapshot.pending_transactions
+    
+    def query_wallets(self, **query) -> Dict:
+        return self.wallet_manager.query_wallets(**query)
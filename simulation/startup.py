@@ -0,0 +1,130 @@
+"""
+Startup phase tracking for background initialization.
+
+The service starts serving as soon as the market simulator runs; slower
+subsystems (algod connection, wallets, balances, funding) warm up in
+background tasks. Each one is a named phase whose state is reported by the
+readiness probe (/ready), so orchestrators route traffic only once the
+required phases are done.
+"""
+
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PhaseState(Enum):
+    """Lifecycle of a startup phase."""
+    PENDING = "pending"
+    RUNNING = "running"
+    READY = "ready"
+    FAILED = "failed"
+    SKIPPED = "skipped"         # Not applicable in this configuration
+
+
+@dataclass
+class StartupPhase:
+    """One subsystem warming up."""
+    name: str
+    required: bool = True       # Must be ready (or skipped) for the service to be ready
+    state: PhaseState = PhaseState.PENDING
+    detail: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    
+    @property
+    def done(self) -> bool:
+        return self.state in (PhaseState.READY, PhaseState.SKIPPED)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        duration = None
+        if self.started_at is not None:
+            duration = (self.finished_at or time.time()) - self.started_at
+        return {
+            "state": self.state.value,
+            "required": self.required,
+            "detail": self.detail,
+            "duration_seconds": duration,
+        }
+
+
+class StartupTracker:
+    """
+    Ordered set of startup phases and their states.
+    """
+    
+    def __init__(self):
+        """Initialize an empty tracker."""
+        self.phases: Dict[str, StartupPhase] = {}
+        self.started_at = time.time()
+    
+    def add(self, name: str, required: bool = True) -> StartupPhase:
+        """
+        Register a phase (pending until it runs).
+        
+        Args:
+            name: Phase name shown by /ready
+            required: Whether readiness waits for this phase
+        
+        Returns:
+            The registered phase
+        """
+        phase = StartupPhase(name=name, required=required)
+        self.phases[name] = phase
+        return phase
+    
+    @asynccontextmanager
+    async def phase(self, name: str) -> AsyncIterator[StartupPhase]:
+        """
+        Run the with-block as a phase: running, then ready or failed.
+        
+        Exceptions are recorded and re-raised; the block may set `detail`.
+        """
+        phase = self.phases.get(name) or self.add(name)
+        phase.state = PhaseState.RUNNING
+        phase.started_at = time.time()
+        phase.finished_at = None
+        try:
+            yield phase
+        except Exception as e:
+            phase.state = PhaseState.FAILED
+            phase.detail = str(e)
+            phase.finished_at = time.time()
+            logger.error(f"Startup phase '{name}' failed: {e}")
+            raise
+        phase.state = PhaseState.READY
+        phase.finished_at = time.time()
+        logger.info(f"Startup phase '{name}' ready in {phase.finished_at - phase.started_at:.2f}s")
+    
+    def mark_ready(self, name: str, detail: Optional[str] = None):
+        """Record a phase that completed without a with-block."""
+        phase = self.phases.get(name) or self.add(name)
+        now = time.time()
+        phase.state = PhaseState.READY
+        phase.detail = detail
+        phase.started_at = phase.started_at or now
+        phase.finished_at = now
+    
+    def skip(self, name: str, detail: str):
+        """Record a phase that does not apply (counts as done)."""
+        phase = self.phases.get(name) or self.add(name)
+        phase.state = PhaseState.SKIPPED
+        phase.detail = detail
+    
+    @property
+    def ready(self) -> bool:
+        """True when every required phase is done."""
+        return all(phase.done for phase in self.phases.values() if phase.required)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Readiness summary with per-phase states."""
+        return {
+            "ready": self.ready,
+            "uptime_seconds": time.time() - self.started_at,
+            "phases": {name: phase.to_dict() for name, phase in self.phases.items()},
+        }
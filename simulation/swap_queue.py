@@ -0,0 +1,318 @@
+"""
+Asynchronous swap submission.
+
+The API validates a swap, hands it to SwapSubmissionQueue and returns a
+ticket immediately. A bounded pool of submitter tasks builds, signs and
+broadcasts swaps; a single confirmer follows the chain one round at a time
+and resolves every in-flight swap with one pending-info lookup each, instead
+of each request polling algod for up to four rounds. Status changes are
+kept for lookup and pushed to stream subscribers.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from enum import Enum
+from typing import Dict, List, Optional
+
+from algosdk.error import AlgodHTTPError
+
+from .algod_client import AsyncAlgodClient
+from .broadcast import BroadcastHub, SWAP_CHANNEL
+from .contract_client import SeltraPoolClient, SwapSubmission, swap_amount_out
+from .telemetry import TRANSACTION_SUBMIT_SECONDS, TRANSACTION_CONFIRM_SECONDS, TRANSACTIONS
+from .wallet_manager import WalletManager
+
+logger = logging.getLogger(__name__)
+
+
+# Swaps accepted but not yet broadcast
+DEFAULT_MAX_QUEUED = 1000
+
+# Concurrent build/sign/broadcast operations
+DEFAULT_SUBMITTERS = 8
+
+# Finished tickets kept for status lookups
+DEFAULT_TICKET_RETENTION = 10000
+
+
+class SwapStatus(Enum):
+    """Lifecycle of a submitted swap."""
+    QUEUED = "queued"           # Accepted, waiting for a submitter
+    PENDING = "pending"         # Broadcast, waiting for confirmation
+    CONFIRMED = "confirmed"
+    FAILED = "failed"
+
+
+@dataclass
+class SwapTicket:
+    """Handle returned to the client and updated as the swap progresses."""
+    swap_id: str
+    sender: str
+    asset_in_id: int
+    asset_out_id: int
+    amount_in: int
+    min_amount_out: int
+    status: SwapStatus = SwapStatus.QUEUED
+    created_at: float = 0.0
+    submitted_at: Optional[float] = None
+    completed_at: Optional[float] = None
+    txn_id: Optional[str] = None
+    app_call_txn_id: Optional[str] = None
+    last_valid_round: Optional[int] = None
+    confirmed_round: Optional[int] = None
+    amount_out: Optional[int] = None
+    error: Optional[str] = None
+    
+    @property
+    def is_final(self) -> bool:
+        return self.status in (SwapStatus.CONFIRMED, SwapStatus.FAILED)
+    
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data["status"] = self.status.value
+        return data
+
+
+class SwapSubmissionQueue:
+    """
+    Accepts swaps for managed wallets and tracks them to confirmation.
+    """
+    
+    def __init__(
+        self,
+        algod_client: AsyncAlgodClient,
+        pool_client: SeltraPoolClient,
+        wallet_manager: WalletManager,
+        event_hub: Optional[BroadcastHub] = None,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+        submitters: int = DEFAULT_SUBMITTERS,
+        ticket_retention: int = DEFAULT_TICKET_RETENTION
+    ):
+        """
+        Initialize the queue.
+        
+        Args:
+            algod_client: Shared async algod client
+            pool_client: Pool client used to build and broadcast swaps
+            wallet_manager: Source of signers; only managed wallets can swap
+            event_hub: Hub receiving every status change
+            max_queued: Swaps waiting for a submitter before submit() refuses
+            submitters: Concurrent broadcast tasks
+            ticket_retention: Finished tickets kept for status lookups
+        """
+        self.algod_client = algod_client
+        self.pool_client = pool_client
+        self.wallet_manager = wallet_manager
+        self.event_hub = event_hub
+        self.submitters = submitters
+        self.ticket_retention = ticket_retention
+        
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self.tickets: "OrderedDict[str, SwapTicket]" = OrderedDict()
+        self.in_flight: Dict[str, SwapTicket] = {}
+        self._in_flight_changed = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.is_running = False
+        
+        self.stats = {"accepted": 0, "rejected": 0, "confirmed": 0, "failed": 0}
+    
+    def submit(
+        self,
+        sender: str,
+        asset_in_id: int,
+        asset_out_id: int,
+        amount_in: int,
+        min_amount_out: int = 0
+    ) -> SwapTicket:
+        """
+        Validate and queue a swap.
+        
+        Args:
+            sender: Managed wallet address
+            asset_in_id: Input asset ID (one side of the pool)
+            asset_out_id: Output asset ID (the other side)
+            amount_in: Input amount in base units
+            min_amount_out: Minimum output amount in base units
+        
+        Returns:
+            Queued ticket
+        
+        Raises:
+            ValueError: If the swap is invalid
+            asyncio.QueueFull: If too many swaps are waiting
+        """
+        pool_assets = {self.pool_client.asset_x_id or 0, self.pool_client.asset_y_id or 0}
+        if not self.pool_client.pool_app_id:
+            raise ValueError("Pool contract not configured")
+        if sender not in self.wallet_manager.wallets:
+            raise ValueError(f"Unknown wallet {sender}; swaps are signed with managed simulation wallets")
+        if asset_in_id == asset_out_id or {asset_in_id, asset_out_id} != pool_assets:
+            raise ValueError(f"Assets must be the pool pair {sorted(pool_assets)}")
+        if amount_in <= 0:
+            raise ValueError("amountIn must be positive")
+        if min_amount_out < 0:
+            raise ValueError("minAmountOut must not be negative")
+        
+        ticket = SwapTicket(
+            swap_id=uuid.uuid4().hex,
+            sender=sender,
+            asset_in_id=asset_in_id,
+            asset_out_id=asset_out_id,
+            amount_in=amount_in,
+            min_amount_out=min_amount_out,
+            created_at=time.time()
+        )
+        try:
+            self.queue.put_nowait(ticket)
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise
+        
+        self.stats["accepted"] += 1
+        self._remember(ticket)
+        self._publish(ticket)
+        return ticket
+    
+    def get(self, swap_id: str) -> Optional[SwapTicket]:
+        """Look up a ticket by ID."""
+        return self.tickets.get(swap_id)
+    
+    async def run(self):
+        """Run the submitters and the confirmer until stopped."""
+        self.is_running = True
+        self._tasks = [asyncio.create_task(self._submitter()) for _ in range(self.submitters)]
+        self._tasks.append(asyncio.create_task(self._confirmer()))
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            for task in self._tasks:
+                task.cancel()
+            self.is_running = False
+    
+    def stop(self):
+        """Stop processing; queued swaps stay queued."""
+        self.is_running = False
+        for task in self._tasks:
+            task.cancel()
+    
+    async def _submitter(self):
+        """Broadcast queued swaps."""
+        while self.is_running:
+            ticket = await self.queue.get()
+            started = time.time()
+            try:
+                submission: SwapSubmission = await self.pool_client.submit_swap(
+                    private_key=self.wallet_manager.get_signer(ticket.sender),
+                    asset_in_id=ticket.asset_in_id,
+                    asset_out_id=ticket.asset_out_id,
+                    amount_in=ticket.amount_in,
+                    min_amount_out=ticket.min_amount_out
+                )
+            except Exception as e:
+                self._finish(ticket, SwapStatus.FAILED, error=str(e))
+                continue
+            
+            ticket.status = SwapStatus.PENDING
+            ticket.submitted_at = time.time()
+            ticket.txn_id = submission.txn_id
+            ticket.app_call_txn_id = submission.app_call_txn_id
+            ticket.last_valid_round = submission.last_valid_round
+            TRANSACTION_SUBMIT_SECONDS.observe(ticket.submitted_at - started, type="swap")
+            
+            self.in_flight[ticket.swap_id] = ticket
+            self._in_flight_changed.set()
+            self._publish(ticket)
+    
+    async def _confirmer(self):
+        """Resolve in-flight swaps once per round."""
+        last_round = None
+        while self.is_running:
+            if not self.in_flight:
+                self._in_flight_changed.clear()
+                await self._in_flight_changed.wait()
+                continue
+            
+            try:
+                if last_round is None:
+                    last_round = (await self.algod_client.status())["last-round"]
+                else:
+                    status = await self.algod_client.status_after_block(last_round)
+                    last_round = status["last-round"]
+            except Exception as e:
+                logger.warning(f"Swap confirmer could not follow rounds: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            
+            self.pool_client.observe_round(last_round)
+            tickets = list(self.in_flight.values())
+            results = await asyncio.gather(
+                *(self.algod_client.pending_transaction_info(t.app_call_txn_id) for t in tickets),
+                return_exceptions=True
+            )
+            for ticket, info in zip(tickets, results):
+                self._resolve(ticket, info, last_round)
+    
+    def _resolve(self, ticket: SwapTicket, info, current_round: int):
+        """Update an in-flight ticket from its pending-info lookup."""
+        if isinstance(info, AlgodHTTPError) and info.code == 404:
+            # Dropped from the pool without confirming
+            if current_round > ticket.last_valid_round:
+                self._finish(ticket, SwapStatus.FAILED, error="Expired before confirmation")
+            return
+        if isinstance(info, Exception):
+            logger.debug(f"Pending info for swap {ticket.swap_id} failed: {info}")
+            return
+        
+        if info.get("pool-error"):
+            self._finish(ticket, SwapStatus.FAILED, error=info["pool-error"])
+        elif info.get("confirmed-round"):
+            ticket.confirmed_round = info["confirmed-round"]
+            ticket.amount_out = swap_amount_out(info, ticket.sender)
+            self._finish(ticket, SwapStatus.CONFIRMED)
+        elif current_round > ticket.last_valid_round:
+            self._finish(ticket, SwapStatus.FAILED, error="Expired before confirmation")
+    
+    def _finish(self, ticket: SwapTicket, status: SwapStatus, error: Optional[str] = None):
+        """Record a final status."""
+        ticket.status = status
+        ticket.error = error
+        ticket.completed_at = time.time()
+        self.in_flight.pop(ticket.swap_id, None)
+        
+        success = status == SwapStatus.CONFIRMED
+        self.stats["confirmed" if success else "failed"] += 1
+        TRANSACTIONS.inc(type="swap", outcome="success" if success else "failure")
+        if success and ticket.submitted_at:
+            TRANSACTION_CONFIRM_SECONDS.observe(ticket.completed_at - ticket.submitted_at, type="swap")
+        self.wallet_manager.update_wallet_stats(ticket.sender, success, ticket.amount_in / 1_000_000 if success else 0)
+        
+        if error:
+            logger.warning(f"Swap {ticket.swap_id} failed: {error}")
+        self._publish(ticket)
+    
+    def _remember(self, ticket: SwapTicket):
+        """Store a ticket, evicting the oldest finished ones past retention."""
+        self.tickets[ticket.swap_id] = ticket
+        while len(self.tickets) > self.ticket_retention:
+            oldest_id, oldest = next(iter(self.tickets.items()))
+            if not oldest.is_final:
+                break
+            del self.tickets[oldest_id]
+    
+    def _publish(self, ticket: SwapTicket):
+        """Push a status change to stream subscribers."""
+        if self.event_hub:
+            self.event_hub.publish(SWAP_CHANNEL, ticket.to_dict())
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get queue statistics."""
+        return {
+            **self.stats,
+            "queued": self.queue.qsize(),
+            "in_flight": len(self.in_flight),
+            "tracked": len(self.tickets),
+        }
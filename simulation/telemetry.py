@@ -0,0 +1,296 @@
+"""
+Metrics registry with Prometheus text exposition.
+
+Counters, gauges and bucketed histograms for the simulation hot paths
+(market ticks, transaction planning and execution, algod calls, queues and
+caches). Everything runs on the event loop thread, so no locking is needed.
+Histograms are cumulative; live percentiles come from the scraper, e.g.
+
+    histogram_quantile(0.99, rate(seltra_algod_request_seconds_bucket[1m]))
+"""
+
+import bisect
+import math
+import re
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+# Latency buckets in seconds: sub-millisecond ticks up to multi-round confirmations
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+CallbackValue = Union[float, Dict[LabelValues, float]]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    """Base class: a named metric family with fixed label names."""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+    
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def _label_text(self, values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+    
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+    
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+        self.callback: Optional[Callable[[], CallbackValue]] = None
+    
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+    
+    def set_function(self, callback: Callable[[], CallbackValue]):
+        """Read the value(s) from an existing counter at scrape time."""
+        self.callback = callback
+    
+    def samples(self) -> List[str]:
+        values = _resolve(self.callback) if self.callback else self.values
+        return [f"{self.name}{self._label_text(key)} {_format_value(v)}" for key, v in values.items()]
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+        self.callback: Optional[Callable[[], CallbackValue]] = None
+    
+    def set(self, value: float, **labels: str):
+        self.values[self._key(labels)] = value
+    
+    def set_function(self, callback: Callable[[], CallbackValue]):
+        """Compute the value(s) at scrape time (e.g. a queue length)."""
+        self.callback = callback
+    
+    def samples(self) -> List[str]:
+        values = _resolve(self.callback) if self.callback else self.values
+        return [f"{self.name}{self._label_text(key)} {_format_value(v)}" for key, v in values.items()]
+
+
+class Histogram(Metric):
+    """Bucketed distribution of observations (cumulative buckets, sum, count)."""
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> ([per-bucket counts..., +Inf count], sum)
+        self.series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+    
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        
+        # Non-cumulative internally (le semantics: first bound >= value); render() accumulates
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+    
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{self._label_text(key, ('le', _format_value(bound)))} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {cumulative}")
+        return lines
+
+
+def _resolve(callback: Callable[[], CallbackValue]) -> Dict[LabelValues, float]:
+    """Normalize a scrape-time callback result to {label values: value}."""
+    try:
+        value = callback()
+    except Exception:
+        return {}
+    if isinstance(value, dict):
+        return {key if isinstance(key, tuple) else (str(key),): float(v) for key, v in value.items()}
+    return {(): float(value)}
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together."""
+    
+    _NAME_PATTERN = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+    
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+    
+    def _register(self, metric: Metric) -> Metric:
+        if not self._NAME_PATTERN.match(metric.name):
+            raise ValueError(f"Invalid metric name: {metric.name}")
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            # Components may be re-created (e.g. simulator reset); share the family
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Metric {metric.name} already registered with a different shape")
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def render(self) -> str:
+        """Render every metric in Prometheus text format."""
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+# Process-wide registry used by the simulation services
+REGISTRY = MetricsRegistry()
+
+
+# Hot-path metrics
+
+MARKET_TICK_SECONDS = REGISTRY.histogram(
+    "seltra_market_tick_seconds", "Time to compute one market tick"
+)
+MARKET_TICKS = REGISTRY.counter(
+    "seltra_market_ticks_total", "Market ticks produced"
+)
+PLAN_GENERATION_SECONDS = REGISTRY.histogram(
+    "seltra_plan_generation_seconds", "Time to generate transaction plans for one simulation tick"
+)
+TRANSACTION_SUBMIT_SECONDS = REGISTRY.histogram(
+    "seltra_transaction_submit_seconds", "Time from build start until algod accepted the transaction",
+    ["type"]
+)
+TRANSACTION_CONFIRM_SECONDS = REGISTRY.histogram(
+    "seltra_transaction_confirm_seconds", "Time from submission until the transaction was confirmed",
+    ["type"]
+)
+TRANSACTIONS = REGISTRY.counter(
+    "seltra_transactions_total", "Executed transactions by type and outcome", ["type", "outcome"]
+)
+ALGOD_REQUEST_SECONDS = REGISTRY.histogram(
+    "seltra_algod_request_seconds", "Algod REST call latency", ["method", "endpoint", "status"]
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "seltra_queue_depth", "Items waiting in in-process queues", ["queue"]
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "seltra_cache_requests_total", "Cache lookups by cache and result", ["cache", "result"]
+)
+CACHE_ENTRIES = REGISTRY.gauge(
+    "seltra_cache_entries", "Entries held in in-process caches", ["cache"]
+)
+
+
+def queue_depth_sources(sources: Dict[str, Callable[[], int]]):
+    """
+    Report queue depths at scrape time.
+    
+    Args:
+        sources: Queue name -> callable returning its current length
+    """
+    QUEUE_DEPTH.set_function(lambda: {(name,): source() for name, source in sources.items()})
+
+
+def cache_stats_sources(sources: Dict[str, Callable[[], Dict[str, int]]]):
+    """
+    Report cache hit/miss counters at scrape time.
+    
+    Args:
+        sources: Cache name -> callable returning {result: count}
+    """
+    def collect() -> Dict[LabelValues, float]:
+        values = {}
+        for cache, source in sources.items():
+            for result, count in source().items():
+                values[(cache, result)] = count
+        return values
+    
+    CACHE_REQUESTS.set_function(collect)
+
+
+def cache_size_sources(sources: Dict[str, Callable[[], int]]):
+    """
+    Report cache sizes at scrape time.
+    
+    Args:
+        sources: Cache name -> callable returning its current entry count
+    """
+    CACHE_ENTRIES.set_function(lambda: {(name,): source() for name, source in sources.items()})
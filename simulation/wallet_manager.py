@@ -6,23 +6,52 @@ for the blockchain simulation system.
 """
 
 import asyncio
+import base64
+import bisect
 import logging
 import time
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
 import json
 import os
 
 from algosdk import account, mnemonic, encoding
-from algosdk.v2client import algod
-from algosdk.transaction import PaymentTxn, AssetTransferTxn, wait_for_confirmation
+from algosdk.transaction import PaymentTxn, AssetTransferTxn
 from algosdk.error import AlgodHTTPError
 
-from .contract_client import SeltraPoolClient
+from .algod_client import AsyncAlgodClient, wait_for_confirmation
+from .contract_client import SeltraPoolClient, WalletSigner
 
 logger = logging.getLogger(__name__)
 
 
+# Secondary index buckets: (name, exclusive upper bound)
+BALANCE_BUCKETS: List[Tuple[str, float]] = [
+    ("empty", 1_000_000),  # < 1 ALGO
+    ("low", 1_000_000_000),  # < 1,000 ALGO (refill territory)
+    ("medium", 10_000_000_000),  # < 10,000 ALGO
+    ("high", float("inf")),
+]
+
+ACTIVITY_BUCKETS: List[Tuple[str, float]] = [
+    ("idle", 1),  # no transactions yet
+    ("light", 10),
+    ("active", 100),
+    ("heavy", float("inf")),
+]
+
+# Wallets funded concurrently at startup
+FUNDING_CONCURRENCY = 4
+
+
+def _bucket_for(value: float, buckets: List[Tuple[str, float]]) -> str:
+    """Return the name of the first bucket whose upper bound exceeds value."""
+    for name, upper in buckets:
+        if value < upper:
+            return name
+    return buckets[-1][0]
+
+
 @dataclass
 class ManagedWallet:
     """A managed wallet with trading characteristics."""
@@ -50,6 +79,24 @@ class ManagedWallet:
     last_balance_update: float = 0
 
 
+# Projectable wallet fields for API responses
+WALLET_INFO_FIELDS: Dict[str, Callable[[ManagedWallet], Any]] = {
+    "address": lambda w: w.address,
+    "pattern": lambda w: w.pattern,
+    "algo_balance": lambda w: w.algo_balance / 1_000_000,  # Convert to ALGO
+    "asset_x_balance": lambda w: w.asset_x_balance,
+    "asset_y_balance": lambda w: w.asset_y_balance,
+    "trade_frequency": lambda w: w.trade_frequency,
+    "avg_trade_size": lambda w: w.avg_trade_size,
+    "volatility_sensitivity": lambda w: w.volatility_sensitivity,
+    "total_transactions": lambda w: w.total_transactions,
+    "successful_transactions": lambda w: w.successful_transactions,
+    "success_rate": lambda w: w.successful_transactions / max(1, w.total_transactions) * 100,
+    "total_volume": lambda w: w.total_volume,
+    "last_balance_update": lambda w: w.last_balance_update,
+}
+
+
 @dataclass
 class FundingConfig:
     """Configuration for wallet funding."""
@@ -74,7 +121,7 @@ class WalletManager:
     
     def __init__(
         self,
-        algod_client: algod.AlgodClient,
+        algod_client: AsyncAlgodClient,
         pool_client: SeltraPoolClient,
         funding_config: Optional[FundingConfig] = None,
         wallet_storage_path: str = "simulation_wallets.json"
@@ -96,6 +143,26 @@ class WalletManager:
         # Managed wallets
         self.wallets: Dict[str, ManagedWallet] = {}
         
+        # Secondary indexes (bucket -> address -> wallet), kept in sync on insert/update
+        self._pattern_index: Dict[str, Dict[str, ManagedWallet]] = {}
+        self._balance_index: Dict[str, Dict[str, ManagedWallet]] = {}
+        self._activity_index: Dict[str, Dict[str, ManagedWallet]] = {}
+        self._wallet_buckets: Dict[str, Tuple[str, str]] = {}
+        
+        # Long-lived signers (decoded key + cached address) reused by every transaction path
+        self._signers: Dict[str, WalletSigner] = {}
+        self._faucet_signer: Optional[WalletSigner] = None
+        
+        # Bumped whenever a wallet is added, removed or updated (see _reindex_wallet)
+        self.version = 0
+        
+        # Aggregate counters maintained alongside the indexes
+        self.counters = {
+            "total_transactions": 0,
+            "successful_transactions": 0,
+            "total_volume": 0.0
+        }
+        
         # Trading patterns configuration
         self.pattern_config = {
             "whale": {
@@ -130,8 +197,7 @@ class WalletManager:
                 wallet_data = json.load(f)
             
             for address, data in wallet_data.items():
-                wallet = ManagedWallet(**data)
-                self.wallets[address] = wallet
+                self._add_wallet(ManagedWallet(**data))
             
             logger.info(f"Loaded {len(self.wallets)} existing wallets")
             return len(self.wallets)
@@ -188,13 +254,13 @@ class WalletManager:
         for i in range(whale_count):
             wallet = await self._create_single_wallet("whale")
             created_wallets.append(wallet)
-            self.wallets[wallet.address] = wallet
+            self._add_wallet(wallet)
         
         # Create retail wallets
         for i in range(retail_count):
             wallet = await self._create_single_wallet("retail")
             created_wallets.append(wallet)
-            self.wallets[wallet.address] = wallet
+            self._add_wallet(wallet)
         
         # Save to storage
         await self.save_wallets()
@@ -202,6 +268,67 @@ class WalletManager:
         logger.info(f"Successfully created {len(created_wallets)} wallets")
         return created_wallets
     
+    def _add_wallet(self, wallet: ManagedWallet):
+        """Insert a wallet and register it in every secondary index."""
+        if wallet.address in self.wallets:
+            self._remove_wallet(wallet.address)
+        
+        self.wallets[wallet.address] = wallet
+        self._signers[wallet.address] = WalletSigner(wallet.private_key)
+        self._pattern_index.setdefault(wallet.pattern, {})[wallet.address] = wallet
+        
+        self.counters["total_transactions"] += wallet.total_transactions
+        self.counters["successful_transactions"] += wallet.successful_transactions
+        self.counters["total_volume"] += wallet.total_volume
+        
+        self._reindex_wallet(wallet)
+    
+    def _remove_wallet(self, address: str):
+        """Remove a wallet from storage, indexes and counters."""
+        wallet = self.wallets.pop(address)
+        self._signers.pop(address, None)
+        self._pattern_index.get(wallet.pattern, {}).pop(address, None)
+        
+        balance_bucket, activity_bucket = self._wallet_buckets.pop(address)
+        self._balance_index[balance_bucket].pop(address, None)
+        self._activity_index[activity_bucket].pop(address, None)
+        
+        self.counters["total_transactions"] -= wallet.total_transactions
+        self.counters["successful_transactions"] -= wallet.successful_transactions
+        self.counters["total_volume"] -= wallet.total_volume
+        self.version += 1
+    
+    def _reindex_wallet(self, wallet: ManagedWallet):
+        """Move a wallet between balance/activity buckets after its state changed."""
+        self.version += 1
+        
+        new_buckets = (
+            _bucket_for(wallet.algo_balance, BALANCE_BUCKETS),
+            _bucket_for(wallet.total_transactions, ACTIVITY_BUCKETS)
+        )
+        old_buckets = self._wallet_buckets.get(wallet.address)
+        
+        if old_buckets == new_buckets:
+            return
+        
+        if old_buckets:
+            self._balance_index[old_buckets[0]].pop(wallet.address, None)
+            self._activity_index[old_buckets[1]].pop(wallet.address, None)
+        
+        self._balance_index.setdefault(new_buckets[0], {})[wallet.address] = wallet
+        self._activity_index.setdefault(new_buckets[1], {})[wallet.address] = wallet
+        self._wallet_buckets[wallet.address] = new_buckets
+    
+    def get_signer(self, address: str) -> WalletSigner:
+        """Get the cached signer for a managed wallet."""
+        return self._signers[address]
+    
+    def _get_faucet_signer(self) -> WalletSigner:
+        """Get the cached signer for the funding faucet."""
+        if self._faucet_signer is None:
+            self._faucet_signer = WalletSigner(self.funding_config.faucet_private_key)
+        return self._faucet_signer
+    
     async def _create_single_wallet(self, pattern: str) -> ManagedWallet:
         """Create a single wallet with specified pattern."""
         import random
@@ -250,7 +377,7 @@ class WalletManager:
             # Fund with ALGO
             algo_amount = config["algo_funding"]
             success = await self._send_algo(
-                self.funding_config.faucet_private_key,
+                self._get_faucet_signer(),
                 wallet.address,
                 algo_amount
             )
@@ -266,7 +393,7 @@ class WalletManager:
                 # Fund with asset X
                 asset_x_amount = self.funding_config.initial_asset_x_amount * config["asset_funding_multiplier"]
                 await self._send_asset(
-                    self.funding_config.faucet_private_key,
+                    self._get_faucet_signer(),
                     wallet.address,
                     self.pool_client.asset_x_id,
                     asset_x_amount
@@ -278,7 +405,7 @@ class WalletManager:
                 # Fund with asset Y
                 asset_y_amount = self.funding_config.initial_asset_y_amount * config["asset_funding_multiplier"]
                 await self._send_asset(
-                    self.funding_config.faucet_private_key,
+                    self._get_faucet_signer(),
                     wallet.address,
                     self.pool_client.asset_y_id,
                     asset_y_amount
@@ -314,23 +441,61 @@ class WalletManager:
         logger.info(f"Successfully funded {success_count}/{len(self.wallets)} wallets")
         return success_count
     
-    async def _send_algo(self, sender_private_key: str, receiver: str, amount: int) -> bool:
+    async def fund_underfunded_wallets(self, max_concurrent: int = FUNDING_CONCURRENCY) -> int:
+        """
+        Fund wallets whose cached ALGO balance is below the refill threshold.
+        
+        Run after update_wallet_balances; wallets that are already funded
+        (e.g. loaded from storage) are left alone. Funding transfers run
+        concurrently.
+        
+        Args:
+            max_concurrent: Wallets funded at the same time
+        
+        Returns:
+            Number of successfully funded wallets
+        """
+        if not self.funding_config:
+            logger.error("Cannot fund wallets without funding configuration")
+            return 0
+        
+        wallets = [
+            wallet for wallet in self.wallets.values()
+            if wallet.algo_balance < self.funding_config.min_algo_balance
+        ]
+        if not wallets:
+            return 0
+        
+        semaphore = asyncio.Semaphore(max_concurrent)
+        
+        async def fund(wallet: ManagedWallet) -> bool:
+            async with semaphore:
+                return await self.fund_wallet(wallet)
+        
+        results = await asyncio.gather(*(fund(wallet) for wallet in wallets))
+        funded = [wallet.address for wallet, success in zip(wallets, results) if success]
+        if funded:
+            await self.update_wallet_balances(funded)
+        
+        logger.info(f"Successfully funded {len(funded)}/{len(wallets)} underfunded wallets")
+        return len(funded)
+    
+    async def _send_algo(self, sender: WalletSigner, receiver: str, amount: int) -> bool:
         """Send ALGO from sender to receiver."""
         try:
-            sender_address = account.address_from_private_key(sender_private_key)
-            params = self.algod_client.suggested_params()
+            params = await self.algod_client.suggested_params()
             
             txn = PaymentTxn(
-                sender=sender_address,
+                sender=sender.address,
                 sp=params,
                 receiver=receiver,
                 amt=amount
             )
             
-            signed_txn = txn.sign(sender_private_key)
-            txn_id = self.algod_client.send_transaction(signed_txn)
+            signed_txn = sender.sign(txn)
+            txn_id = await self.algod_client.send_transaction(signed_txn)
             
-            wait_for_confirmation(self.algod_client, txn_id, 4)
+            await wait_for_confirmation(self.algod_client, txn_id, 4)
             logger.debug(f"Sent {amount} microALGOs to {receiver[:12]}...")
             return True
             
@@ -340,28 +505,27 @@ class WalletManager:
     
     async def _send_asset(
         self, 
-        sender_private_key: str, 
+        sender: WalletSigner, 
         receiver: str, 
         asset_id: int, 
         amount: int
     ) -> bool:
         """Send ASA tokens from sender to receiver."""
         try:
-            sender_address = account.address_from_private_key(sender_private_key)
-            params = self.algod_client.suggested_params()
+            params = await self.algod_client.suggested_params()
             
             txn = AssetTransferTxn(
-                sender=sender_address,
+                sender=sender.address,
                 sp=params,
                 receiver=receiver,
                 amt=amount,
                 index=asset_id
             )
             
-            signed_txn = txn.sign(sender_private_key)
-            txn_id = self.algod_client.send_transaction(signed_txn)
+            signed_txn = sender.sign(txn)
+            txn_id = await self.algod_client.send_transaction(signed_txn)
             
-            wait_for_confirmation(self.algod_client, txn_id, 4)
+            await wait_for_confirmation(self.algod_client, txn_id, 4)
             logger.debug(f"Sent {amount} of asset {asset_id} to {receiver[:12]}...")
             return True
             
@@ -372,7 +536,7 @@ class WalletManager:
     async def _opt_in_to_asset(self, wallet: ManagedWallet, asset_id: int) -> bool:
         """Opt wallet into an ASA token."""
         try:
-            params = self.algod_client.suggested_params()
+            params = await self.algod_client.suggested_params()
             
             # Asset opt-in transaction (send 0 amount to self)
             txn = AssetTransferTxn(
@@ -383,10 +547,10 @@ class WalletManager:
                 index=asset_id
             )
             
-            signed_txn = txn.sign(wallet.private_key)
-            txn_id = self.algod_client.send_transaction(signed_txn)
+            signed_txn = self.get_signer(wallet.address).sign(txn)
+            txn_id = await self.algod_client.send_transaction(signed_txn)
             
-            wait_for_confirmation(self.algod_client, txn_id, 4)
+            await wait_for_confirmation(self.algod_client, txn_id, 4)
             logger.debug(f"Wallet {wallet.address[:12]}... opted into asset {asset_id}")
             return True
             
@@ -398,6 +562,8 @@ class WalletManager:
         """
         Update cached balances for wallets.
         
+        Wallets are refreshed concurrently (bounded by the algod connection pool).
+        
         Args:
             addresses: Specific addresses to update, or None for all
             
@@ -407,38 +573,40 @@ class WalletManager:
         if addresses is None:
             addresses = list(self.wallets.keys())
         
-        updated_count = 0
         current_time = time.time()
+        results = await asyncio.gather(*(
+            self._update_wallet_balance(self.wallets[address], current_time)
+            for address in addresses if address in self.wallets
+        ))
+        updated_count = sum(results)
         
-        for address in addresses:
-            if address not in self.wallets:
-                continue
+        logger.debug(f"Updated balances for {updated_count} wallets")
+        return updated_count
+    
+    async def _update_wallet_balance(self, wallet: ManagedWallet, current_time: float) -> bool:
+        """Refresh one wallet's cached balances."""
+        try:
+            # Update ALGO balance
+            wallet.algo_balance = await self.pool_client.get_asset_balance(wallet.address, 0)
             
-            wallet = self.wallets[address]
+            # Update ASA balances
+            if self.pool_client.asset_x_id:
+                wallet.asset_x_balance = await self.pool_client.get_asset_balance(
+                    wallet.address, self.pool_client.asset_x_id
+                )
             
-            try:
-                # Update ALGO balance
-                wallet.algo_balance = await self.pool_client.get_asset_balance(address, 0)
-                
-                # Update ASA balances
-                if self.pool_client.asset_x_id:
-                    wallet.asset_x_balance = await self.pool_client.get_asset_balance(
-                        address, self.pool_client.asset_x_id
-                    )
-                
-                if self.pool_client.asset_y_id:
-                    wallet.asset_y_balance = await self.pool_client.get_asset_balance(
-                        address, self.pool_client.asset_y_id
-                    )
-                
-                wallet.last_balance_update = current_time
-                updated_count += 1
-                
-            except Exception as e:
-                logger.error(f"Failed to update balance for {address[:12]}...: {e}")
+            if self.pool_client.asset_y_id:
+                wallet.asset_y_balance = await self.pool_client.get_asset_balance(
+                    wallet.address, self.pool_client.asset_y_id
+                )
+            
+            wallet.last_balance_update = current_time
+            self._reindex_wallet(wallet)
+            return True
         
-        logger.debug(f"Updated balances for {updated_count} wallets")
-        return updated_count
+        except Exception as e:
+            logger.error(f"Failed to update balance for {wallet.address[:12]}...: {e}")
+            return False
     
     async def check_and_refill_wallets(self) -> int:
         """
@@ -459,13 +627,14 @@ class WalletManager:
                 refill_amount = config["algo_funding"] // 4  # Refill with 1/4 of initial amount
                 
                 success = await self._send_algo(
-                    self.funding_config.faucet_private_key,
+                    self._get_faucet_signer(),
                     wallet.address,
                     refill_amount
                 )
                 
                 if success:
                     wallet.algo_balance += refill_amount
+                    self._reindex_wallet(wallet)
                     refilled_count += 1
                     logger.info(f"Refilled wallet {wallet.address[:12]}... with {refill_amount} microALGOs")
                 
@@ -476,7 +645,7 @@ class WalletManager:
     
     def get_wallet_by_pattern(self, pattern: str) -> List[ManagedWallet]:
         """Get all wallets matching a specific pattern."""
-        return [wallet for wallet in self.wallets.values() if wallet.pattern == pattern]
+        return list(self._pattern_index.get(pattern, {}).values())
     
     def get_whale_wallets(self) -> List[ManagedWallet]:
         """Get all whale wallets."""
@@ -486,31 +655,163 @@ class WalletManager:
         """Get all retail wallets."""
         return self.get_wallet_by_pattern("retail")
     
-    def get_wallet_info(self) -> List[Dict[str, Any]]:
+    def get_wallet_counts(self) -> Dict[str, Any]:
+        """Get wallet counts per index bucket plus aggregate counters."""
+        return {
+            "total": len(self.wallets),
+            "by_pattern": {key: len(bucket) for key, bucket in self._pattern_index.items()},
+            "by_balance_bucket": {key: len(bucket) for key, bucket in self._balance_index.items()},
+            "by_activity": {key: len(bucket) for key, bucket in self._activity_index.items()},
+            **self.counters
+        }
+    
+    def get_wallet_info(self, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """Get information about all wallets for API responses."""
-        wallet_info = []
+        getters = self._field_getters(fields)
+        return [
+            {name: getter(wallet) for name, getter in getters}
+            for wallet in self.wallets.values()
+        ]
+    
+    def query_wallets(
+        self,
+        pattern: Optional[str] = None,
+        balance_bucket: Optional[str] = None,
+        activity: Optional[str] = None,
+        sort_by: str = "address",
+        descending: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        fields: Optional[List[str]] = None,
+        columnar: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Query wallets through the secondary indexes with keyset pagination.
         
-        for wallet in self.wallets.values():
-            info = {
-                "address": wallet.address,
-                "pattern": wallet.pattern,
-                "algo_balance": wallet.algo_balance / 1_000_000,  # Convert to ALGO
-                "asset_x_balance": wallet.asset_x_balance,
-                "asset_y_balance": wallet.asset_y_balance,
-                "trade_frequency": wallet.trade_frequency,
-                "avg_trade_size": wallet.avg_trade_size,
-                "volatility_sensitivity": wallet.volatility_sensitivity,
-                "total_transactions": wallet.total_transactions,
-                "successful_transactions": wallet.successful_transactions,
-                "success_rate": (
-                    wallet.successful_transactions / max(1, wallet.total_transactions) * 100
-                ),
-                "total_volume": wallet.total_volume,
-                "last_balance_update": wallet.last_balance_update
+        Args:
+            pattern: Only wallets with this trading pattern
+            balance_bucket: Only wallets in this balance bucket
+            activity: Only wallets in this activity bucket
+            sort_by: Wallet field to sort on
+            descending: Sort direction
+            cursor: Opaque cursor returned by the previous page (same sort and direction)
+            limit: Maximum number of wallets to return
+            fields: Fields to include per wallet (None for all)
+            columnar: Return the page as "columns" (field -> values) instead
+                of "wallets" (one dict per wallet)
+        
+        Returns:
+            Dictionary with the page of wallets, match count and next cursor
+        
+        Raises:
+            ValueError: On unknown sort/projection fields, or a malformed cursor or
+                one issued for a different sort
+        """
+        if sort_by not in WALLET_INFO_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort_by}")
+        
+        getters = self._field_getters(fields)
+        sort_getter = WALLET_INFO_FIELDS[sort_by]
+        
+        candidates = self._select_wallets(pattern, balance_bucket, activity)
+        keyed = sorted(
+            ((sort_getter(wallet), wallet.address), wallet) for wallet in candidates
+        )
+        keys = [key for key, _ in keyed]
+        after = self._decode_cursor(cursor, sort_by, descending) if cursor else None
+        
+        if descending:
+            end = bisect.bisect_left(keys, after) if after else len(keyed)
+            page = keyed[max(0, end - limit):end][::-1]
+            has_more = end - limit > 0
+        else:
+            start = bisect.bisect_right(keys, after) if after else 0
+            page = keyed[start:start + limit]
+            has_more = start + limit < len(keyed)
+        
+        if columnar:
+            result = {
+                "columns": {name: [getter(wallet) for _, wallet in page] for name, getter in getters}
+            }
+        else:
+            result = {
+                "wallets": [
+                    {name: getter(wallet) for name, getter in getters}
+                    for _, wallet in page
+                ]
             }
-            wallet_info.append(info)
         
-        return wallet_info
+        return {
+            **result,
+            "matched_count": len(keyed),
+            "next_cursor": self._encode_cursor(page[-1][0], sort_by, descending) if page and has_more else None
+        }
+    
+    def _select_wallets(
+        self,
+        pattern: Optional[str],
+        balance_bucket: Optional[str],
+        activity: Optional[str]
+    ) -> List[ManagedWallet]:
+        """Intersect the requested secondary indexes, smallest bucket first."""
+        buckets = [
+            index.get(key, {})
+            for index, key in (
+                (self._pattern_index, pattern),
+                (self._balance_index, balance_bucket),
+                (self._activity_index, activity)
+            )
+            if key is not None
+        ]
+        
+        if not buckets:
+            return list(self.wallets.values())
+        
+        buckets.sort(key=len)
+        smallest, others = buckets[0], buckets[1:]
+        return [
+            wallet for address, wallet in smallest.items()
+            if all(address in bucket for bucket in others)
+        ]
+    
+    @staticmethod
+    def _field_getters(fields: Optional[List[str]]) -> List[Tuple[str, Callable[[ManagedWallet], Any]]]:
+        """Resolve a field projection into (name, getter) pairs."""
+        if not fields:
+            return list(WALLET_INFO_FIELDS.items())
+        
+        unknown = [name for name in fields if name not in WALLET_INFO_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown wallet fields: {unknown}")
+        
+        return [(name, WALLET_INFO_FIELDS[name]) for name in fields]
+    
+    @staticmethod
+    def _encode_cursor(key: Tuple[Any, str], sort_by: str, descending: bool) -> str:
+        """Encode a (sort value, address) key, bound to its sort, as an opaque cursor."""
+        order = "desc" if descending else "asc"
+        return base64.urlsafe_b64encode(json.dumps([sort_by, order, *key]).encode()).decode()
+    
+    @staticmethod
+    def _decode_cursor(cursor: str, sort_by: str, descending: bool) -> Tuple[Any, str]:
+        """
+        Decode a cursor produced by _encode_cursor for the same sort.
+        
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another
+                sort field or direction (its key would not compare)
+        """
+        try:
+            cursor_sort, order, value, address = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        
+        if (cursor_sort, order) != (sort_by, "desc" if descending else "asc"):
+            raise ValueError(
+                f"Cursor was issued for sort={cursor_sort}&order={order}; "
+                f"restart pagination without a cursor to change the sort"
+            )
+        return value, address
     
     def update_wallet_stats(
         self, 
@@ -524,12 +825,17 @@ class WalletManager:
         
         wallet = self.wallets[address]
         wallet.total_transactions += 1
+        self.counters["total_transactions"] += 1
         
         if transaction_success:
             wallet.successful_transactions += 1
+            self.counters["successful_transactions"] += 1
         
         if volume > 0:
             wallet.total_volume += volume
+            self.counters["total_volume"] += volume
+        
+        self._reindex_wallet(wallet)
     
     async def cleanup(self):
         """Clean up resources and save wallet state."""
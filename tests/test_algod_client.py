@@ -0,0 +1,310 @@
+"""
+Tests for the pooled, pipelining AsyncAlgodClient
+Runs the client against a local asyncio HTTP/1.1 server that reads pipelined
+requests as they arrive and answers them in order, like algod does
+"""
+
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from simulation.algod_client import AsyncAlgodClient, ConnectionLost
+
+LONG_POLL_PATH = "/v2/status/wait-for-block-after/"
+
+
+class FakeAlgod:
+    """Keep-alive HTTP/1.1 server logging which connection served which request"""
+    
+    def __init__(self, long_poll_delay: float = 0.3):
+        self.long_poll_delay = long_poll_delay
+        self.requests = []          # {"conn", "path", "arrived", "answered"}
+        self.active_long_polls = 0
+        self.max_active_long_polls = 0
+        self._server = None
+        self._connections = 0
+    
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self._server.close()
+        await self._server.wait_closed()
+    
+    @property
+    def address(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+    
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._connections += 1
+        conn_id = self._connections
+        queue: asyncio.Queue = asyncio.Queue()
+        reading = asyncio.create_task(self._read_requests(conn_id, reader, queue))
+        try:
+            while True:
+                record = await queue.get()
+                if record is None:
+                    return
+                if not await self._respond(record, writer):
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            reading.cancel()
+            writer.close()
+    
+    async def _read_requests(self, conn_id: int, reader: asyncio.StreamReader, queue: asyncio.Queue):
+        """Read requests as soon as they are written (before earlier ones are answered)"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                await reader.readexactly(int(headers.get("content-length", 0)))
+                
+                record = {
+                    "conn": conn_id,
+                    "path": request_line.split()[1].decode(),
+                    "arrived": time.monotonic(),
+                    "answered": None,
+                }
+                self.requests.append(record)
+                await queue.put(record)
+        finally:
+            await queue.put(None)
+    
+    async def _respond(self, record, writer: asyncio.StreamWriter) -> bool:
+        """Write one response; False once the connection was dropped"""
+        url = urlsplit(record["path"])
+        query = parse_qs(url.query)
+        delay = float(query.get("delay", ["0"])[0])
+        
+        if url.path.startswith(LONG_POLL_PATH):
+            self.active_long_polls += 1
+            self.max_active_long_polls = max(self.max_active_long_polls, self.active_long_polls)
+            try:
+                await asyncio.sleep(self.long_poll_delay)
+            finally:
+                self.active_long_polls -= 1
+            body = json.dumps({"last-round": int(url.path.rsplit("/", 1)[1]) + 1}).encode()
+        else:
+            await asyncio.sleep(delay)
+            if url.path == "/v2/drop":
+                writer.transport.abort()
+                return False
+            body = json.dumps({"path": url.path, "conn": record["conn"]}).encode()
+        
+        if url.path.startswith("/v2/chunked"):
+            chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+            encoded = b"".join(b"%x;ext=1\r\n%s\r\n" % (len(chunk), chunk) for chunk in chunks)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                b"Transfer-Encoding: chunked\r\n\r\n" + encoded + b"0\r\nX-Trailer: done\r\n\r\n"
+            )
+        else:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+            )
+        await writer.drain()
+        record["answered"] = time.monotonic()
+        return True
+
+
+def run(coro):
+    """Run a test coroutine on a fresh event loop"""
+    return asyncio.run(asyncio.wait_for(coro, 10))
+
+
+def test_pipelined_responses_are_returned_in_order():
+    """Each caller gets its own response when requests share one connection"""
+    async def scenario():
+        async with FakeAlgod() as server:
+            client = AsyncAlgodClient("token", server.address, pool_size=1, pipeline_depth=8)
+            await client.algod_request("GET", "/echo/warmup")  # Confirms keep-alive
+            
+            # Earlier requests take longer, so a mismatched pairing would show
+            results = await asyncio.gather(*(
+                client.algod_request("GET", f"/echo/{i}", params={"delay": (8 - i) * 0.01})
+                for i in range(8)
+            ))
+            await client.close()
+            return server, client, results
+    
+    server, client, results = run(scenario())
+    
+    assert [result["path"] for result in results] == [f"/v2/echo/{i}" for i in range(8)]
+    assert {record["conn"] for record in server.requests} == {1}
+    assert client.stats["pipelined"] == 7
+
+
+@pytest.mark.parametrize("endpoint", ["echo", "chunked"])
+def test_content_length_and_chunked_bodies(endpoint):
+    """Content-Length and chunked bodies (extensions, trailers) keep the stream in sync"""
+    async def scenario():
+        async with FakeAlgod() as server:
+            client = AsyncAlgodClient("token", server.address, pool_size=1, pipeline_depth=4)
+            first = await client.algod_request("GET", f"/{endpoint}/first")
+            rest = await asyncio.gather(*(
+                client.algod_request("GET", f"/{endpoint}/{i}") for i in range(4)
+            ))
+            raw = await client.algod_request("GET", f"/{endpoint}/raw", response_format="msgpack")
+            await client.close()
+            return server, [first] + rest, raw
+    
+    server, results, raw = run(scenario())
+    
+    assert [result["path"] for result in results] == [f"/v2/{endpoint}/{name}" for name in ["first", 0, 1, 2, 3]]
+    assert json.loads(raw) == {"path": f"/v2/{endpoint}/raw", "conn": 1}
+    assert {record["conn"] for record in server.requests} == {1}
+
+
+def test_connection_drop_fails_every_pipelined_request():
+    """A connection dropped mid-pipeline fails the request in progress and all behind it"""
+    async def scenario():
+        async with FakeAlgod() as server:
+            client = AsyncAlgodClient("token", server.address, pool_size=1, pipeline_depth=4, max_retries=0)
+            await client.algod_request("GET", "/echo/warmup")
+            
+            results = await asyncio.gather(
+                client.algod_request("GET", "/drop", params={"delay": 0.05}),
+                *(client.algod_request("GET", f"/echo/{i}") for i in range(3)),
+                return_exceptions=True
+            )
+            
+            # The pool replaces the dead connection
+            after = await client.algod_request("GET", "/echo/after")
+            await client.close()
+            return server, client, results, after
+    
+    server, client, results, after = run(scenario())
+    
+    assert all(isinstance(result, ConnectionLost) for result in results), results
+    assert client.stats["pipelined"] == 3
+    assert after == {"path": "/v2/echo/after", "conn": 2}
+
+
+def test_dropped_pipeline_is_retried_on_a_new_connection():
+    """Idempotent requests behind a dropped one are retried once by default"""
+    async def scenario():
+        async with FakeAlgod() as server:
+            client = AsyncAlgodClient("token", server.address, pool_size=1, pipeline_depth=4)
+            await client.algod_request("GET", "/echo/warmup")
+            
+            results = await asyncio.gather(
+                client.algod_request("GET", "/drop", params={"delay": 0.05}),
+                *(client.algod_request("GET", f"/echo/{i}") for i in range(3)),
+                return_exceptions=True
+            )
+            await client.close()
+            return client, results
+    
+    client, results = run(scenario())
+    
+    assert isinstance(results[0], ConnectionLost)  # Dropped again on retry
+    assert [result["path"] for result in results[1:]] == [f"/v2/echo/{i}" for i in range(3)]
+    assert client.stats["retries"] >= 3
+
+
+def test_long_polls_never_share_a_connection_with_short_requests():
+    """Nothing is pipelined onto, or behind, a connection held by a long-poll"""
+    async def scenario():
+        async with FakeAlgod(long_poll_delay=0.5) as server:
+            client = AsyncAlgodClient("token", server.address, pool_size=4, pipeline_depth=4, max_long_polls=2)
+            for _ in range(4):
+                await client.algod_request("GET", "/echo/warmup")
+            
+            started = time.monotonic()
+            long_polls = [
+                asyncio.create_task(client.status_after_block(round_number)) for round_number in (10, 20)
+            ]
+            await asyncio.sleep(0.05)
+            shorts = await asyncio.gather(*(
+                client.algod_request("GET", f"/echo/{i}", params={"delay": 0.01}) for i in range(20)
+            ))
+            short_elapsed = time.monotonic() - started
+            rounds = await asyncio.gather(*long_polls)
+            await client.close()
+            return server, shorts, short_elapsed, rounds
+    
+    server, shorts, short_elapsed, rounds = run(scenario())
+    
+    assert [r["last-round"] for r in rounds] == [11, 21]
+    assert [s["path"] for s in shorts] == [f"/v2/echo/{i}" for i in range(20)]
+    assert short_elapsed < 0.5  # Short requests did not wait behind a long-poll
+    
+    long_poll_records = [r for r in server.requests if r["path"].startswith(LONG_POLL_PATH)]
+    for held in long_poll_records:
+        overlapping = [
+            r for r in server.requests
+            if r is not held and r["conn"] == held["conn"]
+            and held["arrived"] <= r["arrived"] < held["answered"]
+        ]
+        assert overlapping == [], held
+
+
+def test_max_long_polls_is_enforced():
+    """At most max_long_polls are in flight; the rest wait for a slot"""
+    async def scenario():
+        async with FakeAlgod(long_poll_delay=0.1) as server:
+            client = AsyncAlgodClient("token", server.address, pool_size=6, max_long_polls=2)
+            rounds = await asyncio.gather(*(client.status_after_block(i) for i in range(5)))
+            short = await client.algod_request("GET", "/echo/short")
+            await client.close()
+            return server, client, rounds, short
+    
+    server, client, rounds, short = run(scenario())
+    
+    assert [r["last-round"] for r in rounds] == [1, 2, 3, 4, 5]
+    assert server.max_active_long_polls == 2
+    assert client.stats["long_polls"] == 5
+    assert short["path"] == "/v2/echo/short"
+
+
+def test_default_long_poll_cap_is_half_the_pool():
+    """Without max_long_polls, half the pool (at least one) is left for short requests"""
+    assert AsyncAlgodClient("token", "http://localhost:4001", pool_size=8).max_long_polls == 4
+    assert AsyncAlgodClient("token", "http://localhost:4001", pool_size=1).max_long_polls == 1
+
+
+def test_per_endpoint_timeouts():
+    """Timeouts follow the longest matching path prefix"""
+    async def scenario():
+        async with FakeAlgod() as server:
+            client = AsyncAlgodClient(
+                "token",
+                server.address,
+                endpoint_timeouts={"/v2/echo/slow": 0.1},
+                default_timeout=2.0
+            )
+            started = time.monotonic()
+            with pytest.raises(asyncio.TimeoutError):
+                await client.algod_request("GET", "/echo/slow", params={"delay": 1.0})
+            timed_out_after = time.monotonic() - started
+            
+            # Other paths keep the default timeout
+            result = await client.algod_request("GET", "/echo/other", params={"delay": 0.3})
+            await client.close()
+            return client, timed_out_after, result
+    
+    client, timed_out_after, result = run(scenario())
+    
+    assert timed_out_after < 0.5
+    assert client.stats["timeouts"] == 1
+    assert result["path"] == "/v2/echo/other"
+    
+    assert client.timeout_for("/v2/status/wait-for-block-after/5") == 65.0
+    assert client.timeout_for("/v2/status") == 5.0
+    assert client.timeout_for("/v2/transactions/pending/ABC") == 5.0
+    assert client.timeout_for("/v2/transactions") == 10.0
+    assert client.timeout_for("/v2/echo/slow/more") == 0.1
+    assert client.timeout_for("/v2/unknown") == 2.0
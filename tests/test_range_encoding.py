@@ -0,0 +1,133 @@
+"""
+Tests for the on-chain RangeArray codec (ARC-4 uint64[3][6])
+Validates round trips, slot padding and rejection of values the contract cannot hold
+"""
+
+import pytest
+from algosdk import abi
+
+from contracts.refactored.backend_service import (
+    MAX_CONTRACT_RANGES,
+    RANGE_ARRAY_BYTES,
+    RANGE_LIQUIDITY_SCALE,
+    RANGE_PRICE_SCALE,
+    RANGE_SLOT_BYTES,
+    Range,
+    SeltraBackendService,
+    UINT64_MAX,
+)
+
+RANGE_ARRAY_TYPE = abi.ABIType.from_string(f"uint64[3][{MAX_CONTRACT_RANGES}]")
+
+
+@pytest.fixture(scope="module")
+def backend():
+    """Backend service without contract integration (the codec needs none)"""
+    return SeltraBackendService()
+
+
+def test_round_trip_is_identity(backend):
+    """Encoded ranges decode to the same values, sorted by lower bound"""
+    ranges = [
+        Range(100.125, 104.5, 300000.25),
+        Range(90.0, 95.0, 200000.0),
+        Range(95.0, 100.125, 1.5),
+        Range(104.5, 120.0, 0.000001),
+        Range(0.000000001, 0.5, 12.0),
+        Range(120.0, 18_000_000_000.0, 18_000_000_000_000.0),
+    ]
+    
+    data = backend.format_ranges_for_contract(ranges)
+    
+    assert len(data) == RANGE_ARRAY_BYTES
+    assert backend.parse_range_slots(data) == sorted(ranges, key=lambda r: r.lower)
+    assert backend.format_ranges_for_contract(backend.parse_ranges_from_contract(data)) == data
+
+
+def test_encoding_matches_arc4(backend):
+    """The struct layout is exactly the ARC-4 uint64[3][6] encoding the contract reads"""
+    ranges = [Range(90.0, 95.0, 200000.0), Range(95.0, 100.0, 300000.0)]
+    
+    data = backend.format_ranges_for_contract(ranges)
+    
+    expected = [
+        [round(r.lower * RANGE_PRICE_SCALE), round(r.upper * RANGE_PRICE_SCALE), round(r.liquidity * RANGE_LIQUIDITY_SCALE)]
+        for r in ranges
+    ] + [[0, 0, 0]] * (MAX_CONTRACT_RANGES - len(ranges))
+    assert data == RANGE_ARRAY_TYPE.encode(expected)
+    assert RANGE_ARRAY_TYPE.decode(data) == expected
+
+
+@pytest.mark.parametrize("count", range(MAX_CONTRACT_RANGES + 1))
+def test_unused_slots_are_zero_padded(backend, count):
+    """Slots past the active ranges are all-zero and decode as None"""
+    ranges = [Range(90.0 + i, 91.0 + i, 1000.0) for i in range(count)]
+    
+    data = backend.format_ranges_for_contract(ranges)
+    slots = backend.parse_range_slots(data)
+    
+    assert data[count * RANGE_SLOT_BYTES:] == bytes((MAX_CONTRACT_RANGES - count) * RANGE_SLOT_BYTES)
+    assert slots[:count] == ranges
+    assert slots[count:] == [None] * (MAX_CONTRACT_RANGES - count)
+    assert backend.format_range_slot(None) == bytes(RANGE_SLOT_BYTES)
+
+
+def test_zero_liquidity_ranges_are_left_out(backend):
+    """Empty ranges do not take a slot (so seven with one empty still fit)"""
+    ranges = [Range(90.0 + i, 91.0 + i, 1000.0) for i in range(MAX_CONTRACT_RANGES)]
+    
+    data = backend.format_ranges_for_contract(ranges + [Range(50.0, 60.0, 0.0)])
+    
+    assert backend.parse_ranges_from_contract(data) == ranges
+
+
+def test_dust_liquidity_keeps_its_slot(backend):
+    """Liquidity that rounds to zero still marks the slot as used"""
+    data = backend.format_range_slot(Range(90.0, 95.0, 1e-9))
+    
+    assert RANGE_ARRAY_TYPE.child_type.decode(data) == [90 * RANGE_PRICE_SCALE, 95 * RANGE_PRICE_SCALE, 1]
+
+
+def test_more_than_max_ranges_are_rejected(backend):
+    """Only MAX_CONTRACT_RANGES ranges fit in the fixed-size box"""
+    ranges = [Range(90.0 + i, 91.0 + i, 1000.0) for i in range(MAX_CONTRACT_RANGES + 1)]
+    
+    with pytest.raises(ValueError):
+        backend.format_ranges_for_contract(ranges)
+
+
+@pytest.mark.parametrize("range_obj", [
+    Range(-1.0, 95.0, 1000.0),                                  # Negative lower bound
+    Range(0.0, 95.0, 1000.0),                                   # Zero lower bound
+    Range(95.0, 90.0, 1000.0),                                  # Inverted bounds
+    Range(-95.0, -90.0, 1000.0),                                # Negative bounds
+    Range(90.0, 95.0, -1000.0),                                 # Negative liquidity
+    Range(90.0, 95.0, float("nan")),
+    Range(90.0, UINT64_MAX / RANGE_PRICE_SCALE * 2, 1000.0),    # Upper bound overflows
+    Range(90.0, float("inf"), 1000.0),
+    Range(90.0, 95.0, UINT64_MAX / RANGE_LIQUIDITY_SCALE * 2),  # Liquidity overflows
+    Range(90.0, 95.0, float("inf")),
+])
+def test_values_outside_uint64_are_rejected(backend, range_obj):
+    """Slots that would not encode as positive uint64 raise ValueError"""
+    with pytest.raises(ValueError):
+        backend.format_range_slot(range_obj)
+    with pytest.raises(ValueError):
+        backend.format_ranges_for_contract([Range(1.0, 2.0, 1.0), range_obj])
+
+
+def test_largest_uint64_values_encode(backend):
+    """Values up to 2^64-1 once scaled are accepted"""
+    upper = (UINT64_MAX // RANGE_PRICE_SCALE) - 1
+    
+    data = backend.format_range_slot(Range(1.0, float(upper), 1.0))
+    
+    assert RANGE_ARRAY_TYPE.child_type.decode(data)[1] == upper * RANGE_PRICE_SCALE
+
+
+@pytest.mark.parametrize("length", [0, RANGE_SLOT_BYTES, RANGE_ARRAY_BYTES - 1, RANGE_ARRAY_BYTES + 1])
+def test_wrong_length_is_rejected(backend, length):
+    """Only a full RangeArray decodes"""
+    with pytest.raises(ValueError):
+        backend.parse_range_slots(bytes(length))
+    assert backend.parse_ranges_from_contract(bytes(length)) == []
@@ -0,0 +1,62 @@
+"""
+Tests for RebalancePlanner slot planning
+Validates minimal diffs and that planned layouts pass commit_ranges validation
+"""
+
+import pytest
+
+from contracts.refactored.backend_service import Range
+from contracts.refactored.rebalance_planner import OperationType, RebalancePlanner
+
+
+def assert_no_overlap(ranges):
+    """Same rule as RebalancingState._validate_ranges (touching bounds allowed)"""
+    ranges = sorted(ranges, key=lambda r: r.lower)
+    for left, right in zip(ranges, ranges[1:]):
+        assert left.upper <= right.lower, f"Ranges overlap: {left} and {right}"
+
+
+def test_unchanged_ranges_are_noop():
+    """Identical layouts need no operations"""
+    current = [Range(90.0, 95.0, 200000.0), Range(95.0, 100.0, 300000.0)]
+    
+    plan = RebalancePlanner().plan(current, current)
+    
+    assert plan.is_noop
+    assert plan.groups == []
+
+
+def test_single_moved_range_is_one_shift():
+    """Only the range that moved is rewritten"""
+    current = [Range(90.0, 95.0, 200000.0), Range(95.0, 100.0, 300000.0), Range(100.0, 105.0, 200000.0)]
+    target = current[:2] + [Range(100.0, 108.0, 200000.0)]
+    
+    plan = RebalancePlanner().plan(current, target)
+    
+    assert [(op.op, op.slot) for op in plan.operations] == [(OperationType.SHIFT, 2)]
+    assert plan.cost.transactions == 2
+    assert plan.cost.total < plan.full_replace_cost.total
+
+
+def test_untouched_neighbour_of_shifted_range_is_promoted():
+    """A range within tolerance that would overlap a shifted neighbour is shifted too"""
+    current = [Range(90.0, 95.0, 200000.0), Range(95.0, 100.0, 300000.0)]
+    target = [
+        Range(90.0 * 0.9997, 95.0 * 0.9997, 200000.0),
+        Range(95.0 * 0.9997, 100.0 * 0.9997, 250000.0),  # Liquidity changed
+    ]
+    
+    plan = RebalancePlanner().plan(current, target)
+    
+    assert {(op.op, op.slot) for op in plan.operations} == {(OperationType.SHIFT, 0), (OperationType.SHIFT, 1)}
+    assert plan.final_ranges == sorted(target, key=lambda r: r.lower)
+    assert_no_overlap(plan.final_ranges)
+
+
+def test_overlapping_targets_are_rejected():
+    """Targets that overlap each other can never pass commit_ranges"""
+    current = [Range(90.0, 95.0, 200000.0)]
+    target = [Range(90.0, 96.0, 200000.0), Range(95.0, 100.0, 300000.0)]
+    
+    with pytest.raises(ValueError):
+        RebalancePlanner().plan(current, target)
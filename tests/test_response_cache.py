@@ -0,0 +1,136 @@
+"""
+Tests for the version-keyed ResponseCache
+Validates ETag revalidation (304), version invalidation and LRU eviction
+"""
+
+import asyncio
+import time
+
+from fastapi import Request
+
+from simulation.market_simulator import MarketSimulator
+from simulation.response_cache import ResponseCache
+from simulation.serialization import loads
+
+
+def make_request(path="/api/v1/metrics", query="", headers=None):
+    """Bare ASGI request (no server needed)"""
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()],
+    })
+
+
+class Builder:
+    """Payload builder counting how often the cache had to call it"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        return {"build": self.calls}
+
+
+def test_if_none_match_returns_304_without_building():
+    """A current ETag is answered with an empty 304 and the payload is not rebuilt"""
+    cache, build = ResponseCache(), Builder()
+    
+    first = cache.respond(make_request(), "metrics", (1,), build)
+    etag = first.headers["etag"]
+    revalidated = cache.respond(make_request(headers={"If-None-Match": etag}), "metrics", (1,), build)
+    listed = cache.respond(make_request(headers={"If-None-Match": f'W/"other", {etag}'}), "metrics", (1,), build)
+    
+    assert first.status_code == 200
+    assert loads(first.body) == {"build": 1}
+    assert revalidated.status_code == 304
+    assert revalidated.body == b""
+    assert revalidated.headers["etag"] == etag
+    assert listed.status_code == 304
+    assert build.calls == 1
+    assert cache.get_stats() == {"entries": 1, "hits": 0, "misses": 1, "not_modified": 2}
+
+
+def test_same_version_is_served_from_cache():
+    """Requests without a validator reuse the serialized bytes"""
+    cache, build = ResponseCache(), Builder()
+    
+    first = cache.respond(make_request(), "metrics", (1, 4), build)
+    second = cache.respond(make_request(), "metrics", (1, 4), build)
+    
+    assert second.body == first.body
+    assert second.headers["etag"] == first.headers["etag"]
+    assert build.calls == 1
+    assert cache.hits == 1
+
+
+def test_version_bump_invalidates_cached_entry():
+    """A new version changes the ETag, so old validators get a fresh 200"""
+    cache, build = ResponseCache(), Builder()
+    
+    old = cache.respond(make_request(), "metrics", (1, 4), build)
+    new = cache.respond(make_request(headers={"If-None-Match": old.headers["etag"]}), "metrics", (1, 5), build)
+    
+    assert new.status_code == 200
+    assert new.headers["etag"] != old.headers["etag"]
+    assert loads(new.body) == {"build": 2}
+    assert cache.entries["metrics"].version == (1, 5)
+    assert len(cache.entries) == 1
+    
+    # The previous version is gone, not just shadowed
+    again = cache.respond(make_request(), "metrics", (1, 4), build)
+    assert loads(again.body) == {"build": 3}
+
+
+def test_etags_do_not_survive_a_restart():
+    """Versions restart at zero, so a new process never matches an old ETag"""
+    etag = ResponseCache().respond(make_request(), "metrics", (1,), Builder()).headers["etag"]
+    time.sleep(0.002)  # The epoch has millisecond resolution
+    
+    response = ResponseCache().respond(make_request(headers={"If-None-Match": etag}), "metrics", (1,), Builder())
+    
+    assert response.status_code == 200
+
+
+def test_least_recently_used_key_is_evicted():
+    """At most max_entries keys are kept"""
+    cache = ResponseCache(max_entries=2)
+    
+    cache.get("a", (1,), Builder())
+    cache.get("b", (1,), Builder())
+    cache.get("a", (1,), Builder())  # Touch a
+    cache.get("c", (1,), Builder())
+    
+    assert list(cache.entries) == ["a", "c"]
+
+
+def test_history_endpoint_revalidates_per_market_tick(monkeypatch):
+    """/history answers 304 until the next tick, then the new payload"""
+    from simulation import main
+    from simulation.api import routes
+    
+    simulator = MarketSimulator(initial_price=100.0)
+    simulator._add_price_point(100.0, 10.0, 0.02)
+    monkeypatch.setattr(main, "simulator", simulator)
+    monkeypatch.setattr(main, "shared_state_reader", None)
+    monkeypatch.setattr(routes, "response_cache", ResponseCache())
+    
+    def get(headers=None):
+        request = make_request("/api/v1/history", "window=10", headers)
+        return asyncio.run(routes.get_price_history(request, window=10))
+    
+    first = get()
+    unchanged = get({"If-None-Match": first.headers["etag"]})
+    simulator._add_price_point(101.0, 12.0, 0.02)
+    after_tick = get({"If-None-Match": first.headers["etag"]})
+    
+    assert first.status_code == 200
+    assert loads(first.body)["count"] == 1
+    assert unchanged.status_code == 304
+    assert unchanged.headers["x-next-seq"] == first.headers["x-next-seq"]
+    assert after_tick.status_code == 200
+    assert loads(after_tick.body)["count"] == 2
+    assert after_tick.headers["etag"] != first.headers["etag"]
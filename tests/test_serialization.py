@@ -0,0 +1,168 @@
+"""
+Tests for table content negotiation and encoding
+Validates that every negotiated media type decodes to the same rows
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from algosdk import account
+from fastapi import Request
+
+from simulation import serialization
+from simulation.blockchain_simulator import AlgorandTransactionSimulator
+from simulation.market_simulator import MarketSimulator
+from simulation.response_cache import ResponseCache
+from simulation.serialization import (
+    COLUMNAR_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    TABLE_MEDIA_TYPES,
+    encode_table,
+    loads,
+    negotiate_table_format,
+)
+from simulation.wallet_manager import ManagedWallet
+
+
+def decode_rows(body, media_type, rows_key):
+    """Rows from a table body in any of the supported formats"""
+    if media_type == NDJSON_MEDIA_TYPE:
+        return [loads(line) for line in body.splitlines()]
+    
+    payload = loads(body)
+    if media_type == COLUMNAR_MEDIA_TYPE:
+        columns = payload["columns"]
+        return [dict(zip(columns, row)) for row in zip(*columns.values())]
+    return payload[rows_key]
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON_MEDIA_TYPE),
+    ("", JSON_MEDIA_TYPE),
+    ("*/*", JSON_MEDIA_TYPE),
+    ("text/html", JSON_MEDIA_TYPE),
+    (COLUMNAR_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE),
+    (NDJSON_MEDIA_TYPE, NDJSON_MEDIA_TYPE),
+    (f"text/html, {COLUMNAR_MEDIA_TYPE}", COLUMNAR_MEDIA_TYPE),
+    (f"{JSON_MEDIA_TYPE};q=0.5, {NDJSON_MEDIA_TYPE}", NDJSON_MEDIA_TYPE),
+    (f"{COLUMNAR_MEDIA_TYPE};q=0.2, */*;q=0.8", JSON_MEDIA_TYPE),
+    (f"{COLUMNAR_MEDIA_TYPE}, {NDJSON_MEDIA_TYPE}", COLUMNAR_MEDIA_TYPE),  # Earlier entry wins a tie
+    (f"{NDJSON_MEDIA_TYPE};q=bogus, {COLUMNAR_MEDIA_TYPE};q=0.1", COLUMNAR_MEDIA_TYPE),
+])
+def test_negotiate_table_format(accept, expected):
+    """Accept headers pick the highest-quality supported format, rows JSON otherwise"""
+    assert negotiate_table_format(accept) == expected
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_every_format_decodes_to_the_same_rows(monkeypatch, use_orjson):
+    """Rows, columnar and NDJSON carry identical rows (numpy or list columns)"""
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "ORJSON_AVAILABLE", False)
+    elif not serialization.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    
+    columns = {
+        "price": np.array([100.0, 100.5, 99.25]),
+        "volume": np.array([10, 0, 7], dtype=np.int64),
+        "timestamp": [1700000000, 1700000001, 1700000002],
+        "pattern": ["retail", "whale", "retail"],
+    }
+    expected = [
+        {"price": 100.0, "volume": 10, "timestamp": 1700000000, "pattern": "retail"},
+        {"price": 100.5, "volume": 0, "timestamp": 1700000001, "pattern": "whale"},
+        {"price": 99.25, "volume": 7, "timestamp": 1700000002, "pattern": "retail"},
+    ]
+    
+    for media_type in TABLE_MEDIA_TYPES:
+        body = encode_table(columns, media_type, rows_key="history", extra={"count": 3})
+        
+        assert decode_rows(body, media_type, "history") == expected, media_type
+        if media_type != NDJSON_MEDIA_TYPE:
+            assert loads(body)["count"] == 3
+
+
+def test_empty_tables():
+    """No rows encodes as an empty list, empty columns or an empty NDJSON body"""
+    columns = {"price": np.array([]), "timestamp": []}
+    
+    assert encode_table(columns, NDJSON_MEDIA_TYPE, rows_key="history") == b""
+    for media_type in TABLE_MEDIA_TYPES:
+        body = encode_table(columns, media_type, rows_key="history")
+        assert decode_rows(body, media_type, "history") == []
+
+
+def make_request(path, query="", accept=None):
+    """Bare ASGI request (no server needed)"""
+    headers = [(b"accept", accept.encode())] if accept else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": headers})
+
+
+@pytest.fixture
+def app_state(monkeypatch):
+    """Market and blockchain simulators wired into the API as on the engine"""
+    from simulation import main
+    from simulation.api import routes
+    
+    market = MarketSimulator(initial_price=100.0)
+    for i in range(5):
+        market._add_price_point(100.0 + i, 10.0 * i, 0.02)
+    
+    blockchain = AlgorandTransactionSimulator(num_wallets=0)
+    for i in range(7):
+        private_key, address = account.generate_account()
+        blockchain.wallet_manager._add_wallet(ManagedWallet(
+            address=address,
+            private_key=private_key,
+            mnemonic_phrase="",
+            pattern="whale" if i % 3 == 0 else "retail",
+            trade_frequency=1.0,
+            avg_trade_size=50.0,
+            volatility_sensitivity=1.0,
+            algo_balance=1_000_000 * i
+        ))
+    
+    monkeypatch.setattr(main, "simulator", market)
+    monkeypatch.setattr(main, "blockchain_simulator", blockchain)
+    monkeypatch.setattr(main, "shared_state_reader", None)
+    monkeypatch.setattr(routes, "response_cache", ResponseCache())
+    return routes
+
+
+def test_history_formats_agree(app_state):
+    """/history rows are the same whichever format is negotiated (one cache entry each)"""
+    routes = app_state
+    bodies = {}
+    for media_type in (JSON_MEDIA_TYPE, COLUMNAR_MEDIA_TYPE, NDJSON_MEDIA_TYPE, JSON_MEDIA_TYPE):
+        request = make_request("/api/v1/history", "window=3", accept=media_type)
+        response = asyncio.run(routes.get_price_history(request, window=3))
+        
+        assert response.media_type == media_type
+        assert response.headers["vary"] == "Accept"
+        bodies[media_type] = decode_rows(response.body, media_type, "history")
+    
+    assert len(bodies[JSON_MEDIA_TYPE]) == 3
+    assert bodies[COLUMNAR_MEDIA_TYPE] == bodies[JSON_MEDIA_TYPE]
+    assert bodies[NDJSON_MEDIA_TYPE] == bodies[JSON_MEDIA_TYPE]
+    assert routes.response_cache.get_stats()["entries"] == 3
+    assert routes.response_cache.hits == 1
+
+
+def test_wallet_page_formats_agree(app_state):
+    """/blockchain/wallets pages are the same whichever format is negotiated"""
+    routes = app_state
+    bodies = {}
+    for media_type in TABLE_MEDIA_TYPES:
+        request = make_request("/api/v1/blockchain/wallets", "sort=algo_balance&fields=address,pattern,algo_balance", accept=media_type)
+        response = asyncio.run(routes.get_blockchain_wallets(
+            request, sort="algo_balance", fields="address,pattern,algo_balance"
+        ))
+        
+        assert response.media_type == media_type
+        bodies[media_type] = decode_rows(response.body, media_type, "wallets")
+    
+    assert [row["algo_balance"] for row in bodies[JSON_MEDIA_TYPE]] == [float(i) for i in range(7)]
+    assert bodies[COLUMNAR_MEDIA_TYPE] == bodies[JSON_MEDIA_TYPE]
+    assert bodies[NDJSON_MEDIA_TYPE] == bodies[JSON_MEDIA_TYPE]
@@ -0,0 +1,306 @@
+"""
+Tests for the shared-memory state snapshot read by API worker processes
+Validates cross-process reads, seqlock consistency under concurrent publishes
+and segment cleanup
+"""
+
+import itertools
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import pytest
+from algosdk import account
+
+from simulation import shared_state
+from simulation.blockchain_simulator import AlgorandTransactionSimulator
+from simulation.market_simulator import MarketSimulator
+from simulation.shared_state import SharedStatePublisher, SharedStateReader
+from simulation.wallet_manager import ManagedWallet
+
+_names = itertools.count()
+
+# Child processes start clean, like uvicorn workers
+SPAWN = multiprocessing.get_context("spawn")
+
+
+def make_engine(num_wallets=3):
+    """Market and blockchain simulators with a little state to publish"""
+    market = MarketSimulator(initial_price=100.0)
+    blockchain = AlgorandTransactionSimulator(num_wallets=0)
+    for i in range(num_wallets):
+        private_key, address = account.generate_account()
+        blockchain.wallet_manager._add_wallet(ManagedWallet(
+            address=address,
+            private_key=private_key,
+            mnemonic_phrase="secret words",
+            pattern="whale" if i % 3 == 0 else "retail",
+            trade_frequency=1.0,
+            avg_trade_size=50.0,
+            volatility_sensitivity=1.0
+        ))
+    return market, blockchain
+
+
+def tick(market, blockchain, value: float):
+    """
+    Advance every published field to `value`, so a consistent snapshot has
+    it everywhere and a torn one mixes two values
+    """
+    market._add_price_point(value, value, 0.02)
+    market.current_price = value
+    market.current_volatility = value
+    for wallet in blockchain.wallet_manager.wallets.values():
+        wallet.total_volume = value
+    blockchain.wallet_manager.version += 1
+
+
+def snapshot_values(snapshot):
+    """Every place a tick() value lands in a decoded snapshot"""
+    return {
+        snapshot.current_price,
+        snapshot.current_volatility,
+        float(snapshot.price_history.columns()["price"][-1]),
+        float(snapshot.price_history.columns()["volume"][-1]),
+        snapshot.market_metrics["current_volatility"],
+        *(wallet["total_volume"] for wallet in snapshot.wallets),
+    }
+
+
+# Readers started from the test process share its resource tracker with the
+# publisher (separately launched workers have their own), so they must not
+# drop its registration of the segment
+SHARED_TRACKER = SimpleNamespace(unregister=lambda name, rtype: None)
+
+
+def read_once(name, results):
+    """Child process: attach, read one snapshot, report what it saw"""
+    shared_state.resource_tracker = SHARED_TRACKER
+    reader = SharedStateReader(name)
+    snapshot = reader.snapshot()
+    view = reader.blockchain_view()
+    results.put({
+        "tick_seq": snapshot.tick_seq,
+        "prices": snapshot.price_history.columns()["price"].tolist(),
+        "current_price": snapshot.current_price,
+        "wallets": sorted(wallet["address"] for wallet in snapshot.wallets),
+        "private_fields": sorted({key for wallet in snapshot.wallets for key in wallet} & {"private_key", "mnemonic_phrase"}),
+        "wallet_count": view.get_wallet_counts()["total"],
+        "page": [w["address"] for w in view.query_wallets(sort_by="address", limit=100)["wallets"]],
+    })
+    reader.close()
+
+
+def read_continuously(name, ready, results, duration):
+    """Child process: read snapshots while the parent publishes, checking each one"""
+    shared_state.resource_tracker = SHARED_TRACKER
+    reader = SharedStateReader(name)
+    ready.set()
+    seen, torn, last_seq = 0, [], None
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        snapshot = reader.snapshot()
+        if snapshot is None or snapshot.seq == last_seq:
+            continue
+        last_seq = snapshot.seq
+        seen += 1
+        values = snapshot_values(snapshot)
+        history_length = len(snapshot.price_history.columns()["price"])
+        if len(values) != 1 or history_length != min(snapshot.tick_seq, snapshot.price_history.capacity):
+            torn.append((snapshot.seq, sorted(values), snapshot.tick_seq, history_length))
+    results.put({"seen": seen, "torn": torn[:5], "stats": reader.stats})
+    reader.close()
+
+
+@pytest.fixture
+def segment_name(monkeypatch):
+    """Unique segment name; removes the segment if a test left it behind"""
+    monkeypatch.setattr(shared_state, "resource_tracker", SHARED_TRACKER)
+    name = f"seltra_test_{os.getpid()}_{next(_names)}"
+    yield name
+    try:
+        leftover = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    leftover.close()
+    leftover.unlink()
+
+
+def test_snapshot_is_read_from_another_process(segment_name):
+    """A reader in a separate process sees exactly what the engine published"""
+    market, blockchain = make_engine()
+    for value in (100.0, 101.0, 102.5):
+        tick(market, blockchain, value)
+    publisher = SharedStatePublisher(market, blockchain, segment_name)
+    try:
+        publisher.publish()
+        
+        results = SPAWN.Queue()
+        child = SPAWN.Process(target=read_once, args=(segment_name, results))
+        child.start()
+        seen = results.get(timeout=60)
+        child.join(timeout=60)
+        
+        assert child.exitcode == 0
+        assert seen["tick_seq"] == 3
+        assert seen["prices"] == [100.0, 101.0, 102.5]
+        assert seen["current_price"] == 102.5
+        assert seen["wallets"] == sorted(blockchain.wallet_manager.wallets)
+        assert seen["private_fields"] == []
+        assert seen["wallet_count"] == 3
+        assert seen["page"] == sorted(blockchain.wallet_manager.wallets)
+        
+        # The reader's exit did not remove the engine's segment
+        reader = SharedStateReader(segment_name)
+        assert reader.snapshot().tick_seq == 3
+        reader.close()
+    finally:
+        publisher.close()
+
+
+def test_reads_during_concurrent_publishes_are_never_torn(segment_name):
+    """A reader process racing a publishing engine only ever decodes whole snapshots"""
+    market, blockchain = make_engine(num_wallets=200)  # A larger blob widens each write
+    tick(market, blockchain, 1.0)
+    tick(market, blockchain, 2.0)
+    publisher = SharedStatePublisher(market, blockchain, segment_name)
+    try:
+        publisher.publish()
+        
+        ready, results = SPAWN.Event(), SPAWN.Queue()
+        child = SPAWN.Process(target=read_continuously, args=(segment_name, ready, results, 2.0))
+        child.start()
+        assert ready.wait(timeout=60)
+        
+        value = 2.0
+        while results.empty():
+            value += 1.0
+            tick(market, blockchain, value)
+            publisher.publish()
+        outcome = results.get(timeout=60)
+        child.join(timeout=60)
+        
+        assert child.exitcode == 0
+        assert outcome["torn"] == []
+        assert outcome["seen"] > 10
+    finally:
+        publisher.close()
+
+
+def test_publish_during_copy_is_retried(monkeypatch, segment_name):
+    """A snapshot copied while the sequence moved is discarded and read again"""
+    market, blockchain = make_engine()
+    tick(market, blockchain, 1.0)
+    tick(market, blockchain, 2.0)
+    publisher = SharedStatePublisher(market, blockchain, segment_name)
+    reader = SharedStateReader(segment_name)
+    try:
+        publisher.publish()
+        assert reader.snapshot().tick_seq == 2
+        
+        copy = reader._copy
+        calls = []
+        
+        def copy_racing_a_publish(seq):
+            raw = copy(seq)
+            if not calls:
+                tick(market, blockchain, 3.0)
+                publisher.publish()
+            calls.append(seq)
+            return raw
+        
+        monkeypatch.setattr(reader, "_copy", copy_racing_a_publish)
+        tick(market, blockchain, 2.5)
+        publisher.publish()
+        snapshot = reader.snapshot()
+        
+        assert len(calls) == 2
+        assert reader.stats["retries"] == 1
+        assert snapshot.tick_seq == 4
+        assert snapshot_values(snapshot) == {3.0}
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_write_in_progress_serves_previous_snapshot(segment_name):
+    """While the sequence is odd (engine mid-write) readers keep the last whole snapshot"""
+    market, blockchain = make_engine()
+    tick(market, blockchain, 1.0)
+    tick(market, blockchain, 2.0)
+    publisher = SharedStatePublisher(market, blockchain, segment_name)
+    reader = SharedStateReader(segment_name)
+    try:
+        publisher.publish()
+        before = reader.snapshot()
+        
+        publisher.layout.header[shared_state._SEQ] += 1  # Writer stalled mid-write
+        publisher.layout.floats[shared_state._CURRENT_PRICE] = -1.0
+        
+        assert reader.snapshot() is before
+        assert reader.stats["retries"] == shared_state.MAX_READ_ATTEMPTS
+        
+        publisher.layout.header[shared_state._SEQ] += 1
+        assert reader.snapshot().current_price == -1.0
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_nothing_published_yet(segment_name):
+    """Readers report no snapshot until the engine publishes, and none without an engine"""
+    market, blockchain = make_engine()
+    assert SharedStateReader(segment_name).snapshot() is None  # No segment to attach to
+    
+    publisher = SharedStatePublisher(market, blockchain, segment_name)
+    reader = SharedStateReader(segment_name)
+    try:
+        assert reader.snapshot() is None
+        assert reader.market_view() is None
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_close_unlinks_the_segment(segment_name):
+    """The engine removes its segment on shutdown; readers only detach"""
+    market, blockchain = make_engine()
+    tick(market, blockchain, 1.0)
+    publisher = SharedStatePublisher(market, blockchain, segment_name)
+    publisher.publish()
+    
+    reader = SharedStateReader(segment_name)
+    assert reader.snapshot() is not None
+    reader.close()
+    assert reader.segment is None
+    
+    other = SharedStateReader(segment_name)
+    assert other.snapshot() is not None  # Still there
+    other.close()
+    
+    publisher.close()
+    
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=segment_name)
+
+
+def test_stale_segment_is_replaced(segment_name):
+    """A segment left by an engine that did not shut down cleanly is recreated"""
+    market, blockchain = make_engine()
+    tick(market, blockchain, 1.0)
+    stale = SharedStatePublisher(market, blockchain, segment_name)
+    stale.publish()
+    stale.layout = None
+    stale.segment.close()  # Crashed: closed without unlink
+    
+    publisher = SharedStatePublisher(market, blockchain, segment_name)
+    try:
+        reader = SharedStateReader(segment_name)
+        assert reader.snapshot() is None  # Fresh segment, nothing published yet
+        publisher.publish()
+        assert reader.snapshot().tick_seq == 1
+        reader.close()
+    finally:
+        publisher.close()
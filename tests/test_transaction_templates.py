@@ -0,0 +1,74 @@
+"""
+Tests for SeltraPoolClient transaction templates
+Validates that templated fees never undershoot algosdk's own fee calculation
+"""
+
+import pytest
+from algosdk import account
+from algosdk.transaction import ApplicationCallTxn, AssetTransferTxn, PaymentTxn, SuggestedParams
+
+from simulation.contract_client import MAX_UINT64, SeltraPoolClient
+
+POOL_APP_ID = 1234567
+ASSET_ID = 7654321
+GENESIS_HASH = "SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI="
+
+# (operation, asset_a, asset_b, deposit count, variable arg count)
+OPERATIONS = [
+    ("swap", ASSET_ID, 0, 1, 3),
+    ("swap", 0, ASSET_ID, 1, 3),
+    ("add_liquidity", 0, ASSET_ID, 2, 6),
+    ("remove_liquidity", 0, ASSET_ID, 0, 5),
+]
+
+
+def algosdk_fee(txn, params):
+    """Fee algosdk assigns to the same transaction built from suggested params"""
+    if isinstance(txn, PaymentTxn):
+        reference = PaymentTxn(txn.sender, params, txn.receiver, txn.amt)
+    elif isinstance(txn, AssetTransferTxn):
+        reference = AssetTransferTxn(txn.sender, params, txn.receiver, txn.amount, txn.index)
+    else:
+        reference = ApplicationCallTxn(
+            txn.sender,
+            params,
+            txn.index,
+            txn.on_complete,
+            app_args=txn.app_args,
+            foreign_assets=txn.foreign_assets,
+            foreign_apps=txn.foreign_apps
+        )
+    return reference.fee
+
+
+@pytest.mark.parametrize("fee_per_byte", [0, 1, 7, 10, 100, 1000, 25_000, 1_000_000])
+@pytest.mark.parametrize("operation, asset_a, asset_b, deposit_count, arg_count", OPERATIONS)
+@pytest.mark.parametrize("amount", [1, 5_000_000, MAX_UINT64])
+def test_templated_fee_covers_algosdk_fee(fee_per_byte, operation, asset_a, asset_b, deposit_count, arg_count, amount):
+    """Every templated transaction pays at least algosdk's size-based fee"""
+    client = SeltraPoolClient(None, pool_app_id=POOL_APP_ID, asset_x_id=0, asset_y_id=ASSET_ID)
+    _, sender = account.generate_account()
+    # The template is built at an early round and filled much later
+    build_params = SuggestedParams(1000, 1, 1001, GENESIS_HASH, "testnet-v1.0", flat_fee=False)
+    params = SuggestedParams(fee_per_byte, 2**40, 2**40 + 1000, GENESIS_HASH, "testnet-v1.0", flat_fee=False)
+    
+    template = client._get_template(operation, asset_a, asset_b, build_params)
+    txns = client._fill_template(
+        template, sender, params, deposits=[amount] * deposit_count, args=[amount] * arg_count
+    )
+    
+    assert len(txns) == deposit_count + 1
+    for txn in txns:
+        assert txn.fee >= algosdk_fee(txn, params), type(txn).__name__
+
+
+def test_flat_fee_is_passed_through():
+    """Flat-fee params pay exactly the requested fee"""
+    client = SeltraPoolClient(None, pool_app_id=POOL_APP_ID, asset_x_id=0, asset_y_id=ASSET_ID)
+    _, sender = account.generate_account()
+    params = SuggestedParams(2000, 100, 1100, GENESIS_HASH, "testnet-v1.0", flat_fee=True)
+    
+    template = client._get_template("swap", ASSET_ID, 0, params)
+    txns = client._fill_template(template, sender, params, deposits=[10], args=[10, 1, 2])
+    
+    assert [txn.fee for txn in txns] == [2000, 2000]
@@ -0,0 +1,182 @@
+"""
+Tests for keyset-cursor pagination of simulated wallets
+Validates stable paging over ties, sort-bound cursors and index consistency
+"""
+
+import asyncio
+
+import pytest
+from algosdk import account
+from fastapi import HTTPException, Request
+
+from simulation.blockchain_simulator import AlgorandTransactionSimulator
+from simulation.wallet_manager import ACTIVITY_BUCKETS, BALANCE_BUCKETS, ManagedWallet, _bucket_for
+
+
+def make_wallet(pattern="retail", algo_balance=0, total_transactions=0):
+    """A managed wallet with a real key (signers decode it on insert)"""
+    private_key, address = account.generate_account()
+    return ManagedWallet(
+        address=address,
+        private_key=private_key,
+        mnemonic_phrase="",
+        pattern=pattern,
+        trade_frequency=1.0,
+        avg_trade_size=50.0,
+        volatility_sensitivity=1.0,
+        algo_balance=algo_balance,
+        total_transactions=total_transactions
+    )
+
+
+def collect_pages(manager, limit=3, **query):
+    """Follow next_cursor until exhausted, returning every address in page order"""
+    addresses, cursor = [], None
+    while True:
+        page = manager.query_wallets(cursor=cursor, limit=limit, fields=["address"], **query)
+        addresses.extend(wallet["address"] for wallet in page["wallets"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return addresses
+
+
+@pytest.fixture
+def simulator():
+    """Simulation-only blockchain simulator (no contracts, no network calls)"""
+    return AlgorandTransactionSimulator(num_wallets=0)
+
+
+@pytest.fixture
+def manager(simulator):
+    """Wallet manager with 17 wallets sharing a handful of sort values"""
+    wallet_manager = simulator.wallet_manager
+    for i in range(17):
+        wallet_manager._add_wallet(make_wallet(
+            pattern="whale" if i % 4 == 0 else "retail",
+            algo_balance=[500_000, 2_000_000_000, 20_000_000_000][i % 3],
+            total_transactions=i % 2
+        ))
+    return wallet_manager
+
+
+@pytest.mark.parametrize("sort_by", ["pattern", "algo_balance", "total_transactions"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_paging_is_stable_across_ties(manager, sort_by, descending):
+    """Pages cover every wallet exactly once in (sort value, address) order"""
+    getter = {
+        "pattern": lambda w: w.pattern,
+        "algo_balance": lambda w: w.algo_balance,
+        "total_transactions": lambda w: w.total_transactions,
+    }[sort_by]
+    expected = [
+        wallet.address for wallet in sorted(
+            manager.wallets.values(), key=lambda w: (getter(w), w.address), reverse=descending
+        )
+    ]
+    
+    addresses = collect_pages(manager, sort_by=sort_by, descending=descending)
+    
+    assert addresses == expected
+
+
+def test_cursor_for_another_sort_is_rejected(manager):
+    """A cursor only continues the sort field and direction it was issued for"""
+    cursor = manager.query_wallets(sort_by="pattern", limit=2)["next_cursor"]
+    
+    with pytest.raises(ValueError):
+        manager.query_wallets(sort_by="algo_balance", cursor=cursor)
+    with pytest.raises(ValueError):
+        manager.query_wallets(sort_by="pattern", descending=True, cursor=cursor)
+    with pytest.raises(ValueError):
+        manager.query_wallets(cursor="not-a-cursor")
+
+
+@pytest.mark.parametrize("query", [
+    "sort=algo_balance",
+    "sort=pattern&order=desc",
+    "cursor=not-a-cursor",
+])
+def test_reused_cursor_returns_400(monkeypatch, simulator, manager, query):
+    """/blockchain/wallets answers a mismatched or malformed cursor with 400"""
+    from simulation import main
+    from simulation.api import routes
+    
+    monkeypatch.setattr(main, "blockchain_simulator", simulator)
+    monkeypatch.setattr(main, "shared_state_reader", None)
+    cursor = manager.query_wallets(sort_by="pattern", limit=2)["next_cursor"]
+    params = dict(item.split("=") for item in query.split("&"))
+    params.setdefault("cursor", cursor)
+    request = Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/v1/blockchain/wallets",
+        "query_string": "&".join(f"{k}={v}" for k, v in params.items()).encode(),
+        "headers": [],
+    })
+    
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(routes.get_blockchain_wallets(
+            request,
+            sort=params.get("sort", "pattern"),
+            order=params.get("order", "asc"),
+            cursor=params["cursor"]
+        ))
+    
+    assert exc_info.value.status_code == 400
+    assert "cursor" in exc_info.value.detail.lower()
+
+
+def test_indexes_follow_add_remove_and_reindex(manager):
+    """Filtered pages match a full scan after wallets are added, removed and moved"""
+    balance_bucket = lambda w: _bucket_for(w.algo_balance, BALANCE_BUCKETS)
+    activity_bucket = lambda w: _bucket_for(w.total_transactions, ACTIVITY_BUCKETS)
+    wallets = sorted(manager.wallets.values(), key=lambda w: w.address)
+    
+    manager._remove_wallet(wallets[0].address)
+    manager._remove_wallet(wallets[5].address)
+    wallets[3].algo_balance = 0
+    wallets[3].total_transactions = 50
+    manager._reindex_wallet(wallets[3])
+    manager._add_wallet(make_wallet(pattern="whale", algo_balance=0, total_transactions=50))
+    manager._add_wallet(wallets[7])  # Re-adding an existing address replaces it
+    
+    for query in [
+        {},
+        {"pattern": "whale"},
+        {"balance_bucket": "empty"},
+        {"activity": "active"},
+        {"pattern": "retail", "balance_bucket": "medium", "activity": "light"},
+    ]:
+        expected = sorted(
+            wallet.address for wallet in manager.wallets.values()
+            if query.get("pattern", wallet.pattern) == wallet.pattern
+            and query.get("balance_bucket", balance_bucket(wallet)) == balance_bucket(wallet)
+            and query.get("activity", activity_bucket(wallet)) == activity_bucket(wallet)
+        )
+        
+        assert collect_pages(manager, **query) == expected, query
+    
+    assert len(manager.wallets) == 16
+    assert manager.get_wallet_counts()["total"] == 16
+
+
+def test_pages_stay_consistent_when_wallets_change_mid_pagination(manager):
+    """Keyset cursors neither repeat nor skip wallets that survive between pages"""
+    first = manager.query_wallets(limit=5, fields=["address"])
+    seen = [wallet["address"] for wallet in first["wallets"]]
+    
+    manager._remove_wallet(seen[0])  # Already returned
+    remaining = sorted(address for address in manager.wallets if address > seen[-1])
+    manager._remove_wallet(remaining[0])  # Not yet returned
+    added = make_wallet()
+    manager._add_wallet(added)
+    
+    rest, cursor = [], first["next_cursor"]
+    while cursor:
+        page = manager.query_wallets(cursor=cursor, limit=5, fields=["address"])
+        rest.extend(wallet["address"] for wallet in page["wallets"])
+        cursor = page["next_cursor"]
+    
+    assert not set(seen) & set(rest)
+    assert rest == sorted(address for address in manager.wallets if address > seen[-1])
+    assert (added.address in rest) == (added.address > seen[-1])